@@ -1,7 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users
+from app.api.v1 import auth, users, roles, permissions, system
 
 api_router = APIRouter()
  
 api_router.include_router(auth.router, prefix="/auth", tags=["认证"])
-api_router.include_router(users.router, prefix="/users", tags=["用户"]) 
\ No newline at end of file
+api_router.include_router(users.router, prefix="/users", tags=["用户"])
+api_router.include_router(roles.router, prefix="/roles", tags=["角色"])
+api_router.include_router(permissions.router, prefix="/permissions", tags=["权限"])
+api_router.include_router(system.router, prefix="/system", tags=["系统"]) 
\ No newline at end of file
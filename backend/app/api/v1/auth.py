@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.schemas.user import UserCreate, UserResponse, Token, UserLogin
 from app.services.auth_service import AuthService
+from app.core.exceptions import DatabaseTimeoutException, ExpectedAuthError, INVALID_REFRESH_TOKEN
 from app.utils.log_server import logServer
 from pydantic import BaseModel
 
@@ -59,6 +60,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             "token_type": "bearer",
             "expires_in": expires_in
         }
+    except ExpectedAuthError:
+        raise
     except Exception as e:
         logger.error(f"登录接口异常: {str(e)}")
         raise
@@ -78,13 +81,11 @@ async def refresh_token(request: RefreshTokenRequest):
             "token_type": "bearer",
             "expires_in": expires_in
         }
+    except (ExpectedAuthError, DatabaseTimeoutException):
+        raise
     except Exception as e:
         logger.error(f"刷新令牌失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无效的刷新令牌",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
+        raise INVALID_REFRESH_TOKEN.exception()
 
 @router.post("/logout")
 async def logout(token: str = Depends(oauth2_scheme)):
@@ -102,6 +103,8 @@ async def logout(token: str = Depends(oauth2_scheme)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="登出失败"
         )
+    except (HTTPException, DatabaseTimeoutException):
+        raise
     except Exception as e:
         logger.error(f"登出接口异常: {str(e)}")
         raise HTTPException(
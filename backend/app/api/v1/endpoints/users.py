@@ -5,6 +5,7 @@ from app.schemas.user import UserCreate, UserResponse, TokenResponse
 from app.services.auth_service import AuthService
 from app.core.deps import get_current_user, get_current_active_user
 from app.core.exceptions import AuthenticationException, ServerException
+from app.core.user_cache import user_response_cache
 from app.utils.log_server import logger
 
 router = APIRouter()
@@ -83,6 +84,7 @@ async def update_user_me(
         if user_data.password:
             current_user.hashed_password = AuthService.get_password_hash(user_data.password)
         await current_user.save()
+        await user_response_cache.invalidate(current_user.id)
         return UserResponse.from_orm(current_user)
     except Exception as e:
         logger.error(f"更新用户信息失败: {str(e)}")
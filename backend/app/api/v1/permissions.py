@@ -0,0 +1,87 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from app.schemas.permission import PermissionCreate, PermissionUpdate, PermissionResponse
+from app.schemas.response import ResponseModel
+from app.models.user import User
+from app.models.permission import Permission
+from app.core.deps import AdminRequired
+from app.crud.permission import (
+    get_all_permissions, get_permission_by_id,
+    create_permission, update_permission, delete_permission
+)
+
+router = APIRouter()
+
+def _permission_response(permission: Permission) -> PermissionResponse:
+    """
+    权限对象转换为响应模型
+    @param: permission 权限对象
+    @return: PermissionResponse 权限响应
+    """
+    return PermissionResponse(
+        id=permission.id,
+        name=permission.name,
+        code=permission.code,
+        description=permission.description,
+        created_at=permission.created_at,
+        updated_at=permission.updated_at
+    )
+
+@router.get("/", response_model=ResponseModel[List[PermissionResponse]])
+async def read_permissions(current_user: User = Depends(AdminRequired)):
+    """
+    获取所有权限
+    @param: current_user 当前用户对象
+    @return: ResponseModel[List[PermissionResponse]] 权限列表
+    """
+    permissions = await get_all_permissions()
+    return ResponseModel(data=[_permission_response(p) for p in permissions])
+
+@router.post("/", response_model=ResponseModel[PermissionResponse])
+async def create_permission_endpoint(permission_in: PermissionCreate, current_user: User = Depends(AdminRequired)):
+    """
+    创建权限
+    @param: permission_in 权限数据
+    @param: current_user 当前用户对象
+    @return: ResponseModel[PermissionResponse] 权限信息
+    """
+    permission = await create_permission(permission_in)
+    return ResponseModel(data=_permission_response(permission))
+
+@router.get("/{permission_id}", response_model=ResponseModel[PermissionResponse])
+async def read_permission(permission_id: int, current_user: User = Depends(AdminRequired)):
+    """
+    获取权限详情
+    @param: permission_id 权限ID
+    @param: current_user 当前用户对象
+    @return: ResponseModel[PermissionResponse] 权限信息
+    """
+    permission = await get_permission_by_id(permission_id)
+    return ResponseModel(data=_permission_response(permission))
+
+@router.put("/{permission_id}", response_model=ResponseModel[PermissionResponse])
+async def update_permission_endpoint(
+    permission_id: int,
+    permission_in: PermissionUpdate,
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    更新权限
+    @param: permission_id 权限ID
+    @param: permission_in 权限数据
+    @param: current_user 当前用户对象
+    @return: ResponseModel[PermissionResponse] 权限信息
+    """
+    permission = await update_permission(permission_id, permission_in)
+    return ResponseModel(data=_permission_response(permission))
+
+@router.delete("/{permission_id}", response_model=ResponseModel)
+async def delete_permission_endpoint(permission_id: int, current_user: User = Depends(AdminRequired)):
+    """
+    删除权限
+    @param: permission_id 权限ID
+    @param: current_user 当前用户对象
+    @return: ResponseModel 操作结果
+    """
+    await delete_permission(permission_id)
+    return ResponseModel(message="权限已删除")
@@ -0,0 +1,140 @@
+from typing import List, Sequence
+from fastapi import APIRouter, Depends
+from app.schemas.role import (
+    RoleCreate, RoleUpdate, RoleResponse,
+    UserRoleAssignment, RolePermissionAssignment, AssignmentResult
+)
+from app.schemas.response import ResponseModel
+from app.models.user import User
+from app.models.role import Role
+from app.core.deps import AdminRequired
+from app.crud.role import (
+    get_all_roles, get_role_by_id, get_role_permission_codes,
+    create_role, update_role, delete_role,
+    assign_roles_to_users, unassign_roles_from_users,
+    assign_permissions_to_roles, unassign_permissions_from_roles
+)
+
+router = APIRouter()
+
+def _role_response(role: Role, permissions: Sequence[str] = ()) -> RoleResponse:
+    """
+    角色对象转换为响应模型
+    @param: role 角色对象
+    @param: permissions 权限编码列表
+    @return: RoleResponse 角色响应
+    """
+    return RoleResponse(
+        id=role.id,
+        name=role.name,
+        code=role.code,
+        description=role.description,
+        created_at=role.created_at,
+        updated_at=role.updated_at,
+        permissions=list(permissions)
+    )
+
+@router.get("/", response_model=ResponseModel[List[RoleResponse]])
+async def read_roles(current_user: User = Depends(AdminRequired)):
+    """
+    获取所有角色
+    @param: current_user 当前用户对象
+    @return: ResponseModel[List[RoleResponse]] 角色列表
+    """
+    roles = await get_all_roles()
+    return ResponseModel(data=[_role_response(role) for role in roles])
+
+@router.post("/", response_model=ResponseModel[RoleResponse])
+async def create_role_endpoint(role_in: RoleCreate, current_user: User = Depends(AdminRequired)):
+    """
+    创建角色
+    @param: role_in 角色数据
+    @param: current_user 当前用户对象
+    @return: ResponseModel[RoleResponse] 角色信息
+    """
+    role = await create_role(role_in)
+    return ResponseModel(data=_role_response(role))
+
+@router.post("/users/assign", response_model=ResponseModel[AssignmentResult])
+async def assign_roles_endpoint(assignment: UserRoleAssignment, current_user: User = Depends(AdminRequired)):
+    """
+    批量为用户分配角色
+    @param: assignment 用户ID和角色ID列表
+    @param: current_user 当前用户对象
+    @return: ResponseModel[AssignmentResult] 新增的关联数
+    """
+    affected = await assign_roles_to_users(assignment.user_ids, assignment.role_ids)
+    return ResponseModel(data=AssignmentResult(affected=affected))
+
+@router.post("/users/unassign", response_model=ResponseModel[AssignmentResult])
+async def unassign_roles_endpoint(assignment: UserRoleAssignment, current_user: User = Depends(AdminRequired)):
+    """
+    批量移除用户的角色
+    @param: assignment 用户ID和角色ID列表
+    @param: current_user 当前用户对象
+    @return: ResponseModel[AssignmentResult] 删除的关联数
+    """
+    affected = await unassign_roles_from_users(assignment.user_ids, assignment.role_ids)
+    return ResponseModel(data=AssignmentResult(affected=affected))
+
+@router.post("/permissions/assign", response_model=ResponseModel[AssignmentResult])
+async def assign_permissions_endpoint(
+    assignment: RolePermissionAssignment,
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    批量为角色分配权限
+    @param: assignment 角色ID和权限ID列表
+    @param: current_user 当前用户对象
+    @return: ResponseModel[AssignmentResult] 新增的关联数
+    """
+    affected = await assign_permissions_to_roles(assignment.role_ids, assignment.permission_ids)
+    return ResponseModel(data=AssignmentResult(affected=affected))
+
+@router.post("/permissions/unassign", response_model=ResponseModel[AssignmentResult])
+async def unassign_permissions_endpoint(
+    assignment: RolePermissionAssignment,
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    批量移除角色的权限
+    @param: assignment 角色ID和权限ID列表
+    @param: current_user 当前用户对象
+    @return: ResponseModel[AssignmentResult] 删除的关联数
+    """
+    affected = await unassign_permissions_from_roles(assignment.role_ids, assignment.permission_ids)
+    return ResponseModel(data=AssignmentResult(affected=affected))
+
+@router.get("/{role_id}", response_model=ResponseModel[RoleResponse])
+async def read_role(role_id: int, current_user: User = Depends(AdminRequired)):
+    """
+    获取角色详情，包含权限编码
+    @param: role_id 角色ID
+    @param: current_user 当前用户对象
+    @return: ResponseModel[RoleResponse] 角色信息
+    """
+    role = await get_role_by_id(role_id)
+    return ResponseModel(data=_role_response(role, await get_role_permission_codes(role.id)))
+
+@router.put("/{role_id}", response_model=ResponseModel[RoleResponse])
+async def update_role_endpoint(role_id: int, role_in: RoleUpdate, current_user: User = Depends(AdminRequired)):
+    """
+    更新角色
+    @param: role_id 角色ID
+    @param: role_in 角色数据
+    @param: current_user 当前用户对象
+    @return: ResponseModel[RoleResponse] 角色信息
+    """
+    role = await update_role(role_id, role_in)
+    return ResponseModel(data=_role_response(role, await get_role_permission_codes(role.id)))
+
+@router.delete("/{role_id}", response_model=ResponseModel)
+async def delete_role_endpoint(role_id: int, current_user: User = Depends(AdminRequired)):
+    """
+    删除角色
+    @param: role_id 角色ID
+    @param: current_user 当前用户对象
+    @return: ResponseModel 操作结果
+    """
+    await delete_role(role_id)
+    return ResponseModel(message="角色已删除")
@@ -0,0 +1,64 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.schemas.response import ResponseModel
+from app.models.user import User
+from app.core.config import settings
+from app.core.deps import AdminRequired
+from app.core.exceptions import NotFoundException
+from app.utils.metrics import metrics
+from app.utils.profiler import profiler
+from app.middlewares.admission_middleware import request_tracker
+
+router = APIRouter()
+
+@router.get("/metrics", response_model=ResponseModel[dict])
+async def read_metrics(current_user: User = Depends(AdminRequired)):
+    """
+    获取当前进程的运行指标
+    @param: current_user 当前用户对象
+    @return: ResponseModel[dict] 指标快照
+    """
+    return ResponseModel(data=metrics.snapshot())
+
+@router.get("/ready", response_model=ResponseModel[dict])
+async def read_readiness(request: Request):
+    """
+    就绪检查，供负载均衡器和部署平台探测，无需认证
+    启动预热完成前和关闭排空期间返回 503
+    @param: request 请求对象
+    @return: ResponseModel[dict] 就绪状态
+    """
+    ready = getattr(request.app.state, "ready", False) and not request_tracker.draining
+    if not ready:
+        return JSONResponse(status_code=503, content=ResponseModel(code=503, message="未就绪", data={"ready": False}).dict())
+    return ResponseModel(data={"ready": True})
+
+@router.post("/profile", response_model=ResponseModel[dict])
+async def run_profiler(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER.MAX_SECONDS, description="采样时长(秒)"),
+    interval_ms: float = Query(settings.PROFILER.INTERVAL_MS, ge=1, le=1000, description="调用栈采样间隔(毫秒)"),
+    all_threads: bool = Query(True, description="是否采样所有线程，否则只采样事件循环线程"),
+    format: Literal["json", "collapsed"] = Query("json", description="collapsed 时只返回折叠栈文本"),
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    在处理本请求的 worker 进程中按需性能分析，期间请求保持等待
+    返回折叠栈(可直接生成火焰图)、事件循环延迟直方图和结束时的 asyncio 任务快照
+    @param: seconds 采样时长(秒)
+    @param: interval_ms 调用栈采样间隔(毫秒)
+    @param: all_threads 是否采样所有线程
+    @param: format 返回格式
+    @param: current_user 当前用户对象
+    @return: ResponseModel[dict] 分析结果
+    @exception: NotFoundException 未启用性能分析
+    @exception: HTTPException 已有分析在进行
+    """
+    if not settings.PROFILER.ENABLED:
+        raise NotFoundException(message="未启用性能分析")
+    result = await profiler.profile(seconds, interval_ms / 1000, all_threads=all_threads)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="已有性能分析在进行")
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"] + "\n")
+    return ResponseModel(data=result)
@@ -1,42 +1,221 @@
-from typing import List
-from fastapi import APIRouter, Depends
-from app.schemas.user import UserResponse
+import codecs
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from app.schemas.user import (
+    UserImportResult, UserResponse, UserSearchItem, UserSearchPage, UserStatsResponse
+)
 from app.schemas.response import ResponseModel
+from app.core.exceptions import ValidationException
 from app.models.user import User
-from app.core.deps import LoginRequired, AdminRequired
-from app.crud.user import get_user_by_id, get_all_users, activate_user, deactivate_user
+from app.core.deps import AdminRequired, get_current_active_user
+from app.core.user_stats import user_stats
+from app.core.user_cache import (
+    CachedUserResponse, user_response_cache, render_user_response, etag_matches
+)
+from app.crud.user import (
+    EXPORT_COLUMNS, SEARCH_FIELDS, get_user_by_id, get_all_users, get_users_by_ids, search_users,
+    export_users, activate_user, deactivate_user
+)
+from app.services.user_import import detect_format, import_users, read_rows
+from app.utils.export import CsvEncoder, ParquetEncoder, parquet_available
 
 router = APIRouter()
 
+def _cached_user_response(request: Request, entry: CachedUserResponse) -> Response:
+    """
+    根据缓存生成响应，If-None-Match 命中时返回304
+    @param: request 请求对象
+    @param: entry 缓存的用户响应
+    @return: Response 响应对象
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 @router.get("/me", response_model=ResponseModel[UserResponse])
-async def read_users_me(current_user: User = Depends(LoginRequired)):
+async def read_users_me(request: Request, current_user: User = Depends(get_current_active_user)):
     """
     获取当前用户信息
+    每次都确认用户存在且未禁用(并发的相同查询合并)，缓存命中时不再查询角色和序列化响应；
+    缓存失效失败时资料最多滞后 CACHE_DEFAULT_TTL 秒，但不会放行已禁用的用户
+    @param: request 请求对象
     @param: current_user 当前用户对象
     @return: ResponseModel[UserResponse] 用户信息
     """
-    return ResponseModel(data=current_user)
+    entry = await user_response_cache.get(current_user.id)
+    if entry is None:
+        entry = await user_response_cache.set(current_user, await render_user_response(current_user))
+    return _cached_user_response(request, entry)
+
+# 批量获取用户时一次最多的ID数
+MAX_BATCH_IDS = 100
+
+def parse_ids(ids: str) -> List[int]:
+    """
+    解析逗号分隔的用户ID
+    @param: ids 如 "1,2,3"
+    @return: List[int] 用户ID列表
+    @exception: ValidationException ID无效或数量超过上限
+    """
+    try:
+        user_ids = [int(item) for item in ids.split(",") if item.strip()]
+    except ValueError:
+        raise ValidationException(message="用户ID无效", detail=ids)
+    if not user_ids or len(user_ids) > MAX_BATCH_IDS:
+        raise ValidationException(message=f"用户ID数量必须在 1 到 {MAX_BATCH_IDS} 之间")
+    return user_ids
 
 @router.get("/", response_model=ResponseModel[List[UserResponse]])
-async def read_users(current_user: User = Depends(AdminRequired)):
+async def read_users(
+    ids: Optional[str] = Query(None, description=f"逗号分隔的用户ID，最多 {MAX_BATCH_IDS} 个，为空时返回所有用户"),
+    current_user: User = Depends(AdminRequired)
+):
     """
-    获取所有用户列表
+    获取用户列表，指定 ids 时批量获取这些用户(一次 IN 查询，包含角色)，不存在的ID跳过
+    @param: ids 逗号分隔的用户ID
     @param: current_user 当前用户对象
     @return: ResponseModel[List[UserResponse]] 用户列表
     """
+    if ids is not None:
+        return ResponseModel(data=await get_users_by_ids(parse_ids(ids)))
     users = await get_all_users()
     return ResponseModel(data=users)
 
+@router.get("/search", response_model=ResponseModel[UserSearchPage])
+async def search_users_endpoint(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索词"),
+    field: Optional[Literal["username", "email", "full_name"]] = Query(None, description="搜索字段，为空时搜索全部"),
+    mode: Literal["prefix", "contains"] = Query("prefix", description="匹配方式"),
+    limit: int = Query(20, ge=1, le=100, description="每页条数"),
+    after_id: Optional[int] = Query(None, ge=0, description="上一页返回的 next_after_id"),
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    搜索用户(不区分大小写)，按ID游标分页
+    @param: q 搜索词
+    @param: field 搜索字段
+    @param: mode 匹配方式
+    @param: limit 每页条数
+    @param: after_id 分页游标
+    @param: current_user 当前用户对象
+    @return: ResponseModel[UserSearchPage] 搜索结果
+    """
+    rows, next_after_id = await search_users(
+        q,
+        fields=(field,) if field else SEARCH_FIELDS,
+        prefix=mode == "prefix",
+        limit=limit,
+        after_id=after_id
+    )
+    page = UserSearchPage(items=[UserSearchItem(**row) for row in rows], next_after_id=next_after_id)
+    return ResponseModel(data=page)
+
+def parse_columns(columns: Optional[str]) -> List[str]:
+    """
+    解析逗号分隔的导出列
+    @param: columns 如 "id,username"，为空时导出全部列
+    @return: List[str] 列名列表
+    @exception: ValidationException 列名无效
+    """
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    selected = list(dict.fromkeys(item.strip() for item in columns.split(",") if item.strip()))
+    unknown = [item for item in selected if item not in EXPORT_COLUMNS]
+    if not selected or unknown:
+        raise ValidationException(message="导出列无效", detail=",".join(unknown))
+    return selected
+
+@router.get("/export")
+async def export_users_endpoint(
+    format: Literal["csv", "parquet"] = Query("csv", description="导出格式"),
+    columns: Optional[str] = Query(None, description=f"逗号分隔的导出列，可选 {','.join(EXPORT_COLUMNS)}，为空时全部导出"),
+    is_active: Optional[bool] = Query(None, description="按激活状态过滤"),
+    role: Optional[str] = Query(None, max_length=50, description="按角色编码过滤"),
+    created_after: Optional[datetime] = Query(None, description="创建时间下限(含)"),
+    created_before: Optional[datetime] = Query(None, description="创建时间上限(不含)"),
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    导出用户，按ID分批查询并边查边编码输出，内存占用与行数无关
+    @param: format 导出格式，parquet 需要安装 pyarrow
+    @param: columns 导出列
+    @param: is_active 按激活状态过滤
+    @param: role 按角色编码过滤
+    @param: created_after 创建时间下限
+    @param: created_before 创建时间上限
+    @param: current_user 当前用户对象
+    @return: StreamingResponse 导出文件
+    @exception: ValidationException 列名无效或不支持 Parquet
+    """
+    selected = parse_columns(columns)
+    if format == "parquet":
+        if not parquet_available():
+            raise ValidationException(message="未安装 pyarrow，不支持 Parquet 导出")
+        encoder = ParquetEncoder(selected, EXPORT_COLUMNS)
+    else:
+        encoder = CsvEncoder(selected)
+    filename = f"users-{datetime.now():%Y%m%d%H%M%S}.{encoder.extension}"
+    return StreamingResponse(
+        export_users(
+            encoder,
+            is_active=is_active,
+            role=role,
+            created_after=created_after,
+            created_before=created_before
+        ),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import", response_model=ResponseModel[UserImportResult])
+async def import_users_endpoint(
+    file: UploadFile = File(..., description="CSV(表头 username,email,password[,full_name])或 NDJSON 文件"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="文件格式，默认按扩展名判断"),
+    batch_size: int = Query(500, ge=1, le=5000, description="每批处理的行数"),
+    current_user: User = Depends(AdminRequired)
+):
+    """
+    批量导入用户，逐批校验、去重、在进程池中计算密码哈希后批量写入
+    失败的行(格式错误、用户名或邮箱已存在、文件内重复)不影响其他行，返回行号和原因；
+    文件中途出现编码或格式错误时返回已导入部分的结果，出错位置记为失败的行
+    @param: file 上传的文件
+    @param: format 文件格式
+    @param: batch_size 每批行数
+    @param: current_user 当前用户对象
+    @return: ResponseModel[UserImportResult] 导入结果
+    """
+    # 上传文件已暂存在临时文件中，在线程池中按行解码读取
+    text = codecs.getreader("utf-8-sig")(file.file)
+    report = await import_users(read_rows(text, detect_format(file.filename, format)), batch_size)
+    return ResponseModel(data=UserImportResult(**report.to_dict()))
+
+@router.get("/stats", response_model=ResponseModel[UserStatsResponse])
+async def read_user_stats(current_user: User = Depends(AdminRequired)):
+    """
+    仪表盘用户统计(管理员)：用户总数、激活/禁用数、各角色用户数
+    读取 Redis 中增量维护的计数，不扫描用户表；计数定期用 SQL 聚合校正
+    @param: current_user 当前用户对象
+    @return: ResponseModel[UserStatsResponse] 用户统计
+    """
+    return ResponseModel(data=UserStatsResponse(**await user_stats.get()))
+
 @router.get("/{user_id}", response_model=ResponseModel[UserResponse])
-async def read_user(user_id: int,current_user: User = Depends(AdminRequired)):
+async def read_user(request: Request, user_id: int, current_user: User = Depends(AdminRequired)):
     """
     获取指定用户信息
+    @param: request 请求对象
     @param: user_id 用户ID
     @param: current_user 当前用户对象
     @return: ResponseModel[UserResponse] 用户信息
     """
-    user = await get_user_by_id(user_id)
-    return ResponseModel(data=user)
+    entry = await user_response_cache.get(user_id)
+    if entry is None:
+        user = await get_user_by_id(user_id)
+        entry = await user_response_cache.set(user, await render_user_response(user))
+    return _cached_user_response(request, entry)
 
 @router.put("/{user_id}/activate", response_model=ResponseModel)
 async def activate_user_endpoint(user_id: int,current_user: User = Depends(AdminRequired)):
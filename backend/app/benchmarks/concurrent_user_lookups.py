@@ -0,0 +1,104 @@
+"""
+并发用户查询基准测试
+
+模拟同一个管理员令牌并行请求多个接口：每个请求都会执行 get_current_user 和 get_admin_user
+- baseline: 旧实现，每个请求各自查询用户和角色
+- single_flight: 当前实现，同一进程内并发的相同查询合并为一次
+每轮并发发出 --burst 个请求，统计数据库查询次数和每轮耗时
+
+用法: python -m app.benchmarks.concurrent_user_lookups --burst 50 --rounds 200
+默认使用内存 SQLite，可用 --db-url 指定 PostgreSQL 测试库(会建表并写入数据，勿用于生产库)
+不需要 Redis
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+from tortoise import Tortoise
+from app.models.user import User
+from app.models.role import Role
+from app.core.deps import decode_token_subject, get_admin_user, get_current_user
+from app.services.auth_service import AuthService
+from app.utils.db_monitor import instrument_connections
+from app.utils.metrics import metrics
+
+MODELS = ["app.models.user", "app.models.role", "app.models.permission"]
+
+
+async def baseline_request(token: str) -> User:
+    """
+    旧实现：各自查询用户，再遍历用户角色判断是否为管理员
+    """
+    user = await User.get_or_none(username=decode_token_subject(token))
+    for role in await user.roles.all():
+        if role.code == "admin":
+            return user
+    raise RuntimeError("不是管理员")
+
+
+async def single_flight_request(token: str) -> User:
+    return await get_admin_user(await get_current_user(token))
+
+
+def query_count() -> int:
+    summary = metrics.snapshot()["summaries"].get("db.query_ms")
+    return summary["count"] if summary else 0
+
+
+async def measure(request: Callable[[str], Awaitable[User]], token: str, burst: int, rounds: int) -> Tuple[List[float], int]:
+    """
+    逐轮并发发出请求
+    @return: Tuple[List[float], int] (每轮耗时(毫秒), 数据库查询次数)
+    """
+    samples = []
+    before = query_count()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        users = await asyncio.gather(*(request(token) for _ in range(burst)))
+        samples.append((time.perf_counter() - start) * 1000)
+        assert all(user.username == "bench_admin" for user in users)
+    return samples, query_count() - before
+
+
+def report(label: str, samples: List[float], queries: int, requests: int) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<16} {queries:>10} {queries / requests:>12.3f} "
+        f"{statistics.mean(samples):>10.3f} {p95:>10.3f}"
+    )
+
+
+async def main(args) -> None:
+    await Tortoise.init(db_url=args.db_url, modules={"models": MODELS})
+    await Tortoise.generate_schemas()
+    # 数据库查询次数取自查询监控的耗时统计
+    instrument_connections()
+    try:
+        admin_role = await Role.create(name="管理员", code="admin")
+        admin = await User.create(username="bench_admin", email="bench_admin@example.com", hashed_password="x")
+        await admin.roles.add(admin_role)
+        token = AuthService.create_access_token({"sub": admin.username})
+
+        requests = args.burst * args.rounds
+        print(f"每轮并发 {args.burst} 个请求, 共 {args.rounds} 轮")
+        print(f"{'方式':<16} {'查询次数':>10} {'每请求查询':>12} {'平均(ms)':>10} {'P95(ms)':>10}")
+        for label, request in (("baseline", baseline_request), ("single_flight", single_flight_request)):
+            samples, queries = await measure(request, token, args.burst, args.rounds)
+            report(label, samples, queries, requests)
+        coalesced = metrics.snapshot()["counters"]
+        print(
+            f"合并的查询: 用户 {coalesced.get('users.lookup.coalesced', 0):.0f}, "
+            f"管理员角色 {coalesced.get('users.admin_check.coalesced', 0):.0f}"
+        )
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="并发用户查询基准测试")
+    parser.add_argument("--db-url", default="sqlite://:memory:", help="测试数据库URL")
+    parser.add_argument("--burst", type=int, default=50, help="每轮并发请求数")
+    parser.add_argument("--rounds", type=int, default=200, help="轮数")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,172 @@
+"""
+权限解析基准测试
+
+对比几种解析用户有效权限的方式，以及中间表有无联合索引时的耗时：
+- nested: 旧实现，先查用户角色，再逐个角色查权限(1 + 角色数 次查询)
+- orm_join: ORM 反向关系过滤，经过 users/roles 表连接
+- through_join: 只连接两张中间表和权限表
+- bitmask: 当前实现，查询用户角色ID后合并预计算的角色权限掩码
+最后对比单次权限检查：字符串集合 all(in) 与整数掩码与运算
+
+用法: python -m app.benchmarks.permission_resolution --users 2000 --iterations 500
+默认使用内存 SQLite，可用 --db-url 指定 PostgreSQL 测试库(会建表并写入数据，勿用于生产库)
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+from app.models.user import User
+from app.models.role import Role
+from app.models.permission import Permission
+from app.core.permission_cache import load_user_permissions, load_user_role_ids
+from app.core.permission_registry import permission_registry
+from app.crud.role import link_many
+from app.db_migrations.rbac_relations import index_statements
+
+MODELS = ["app.models.user", "app.models.role", "app.models.permission"]
+
+
+async def seed(users: int, roles: int, permissions: int, roles_per_user: int, permissions_per_role: int) -> List[int]:
+    """
+    写入测试数据
+    @return: List[int] 用户ID列表
+    """
+    rng = random.Random(42)
+    await User.bulk_create(
+        [User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password="x") for i in range(users)],
+        batch_size=1000
+    )
+    await Role.bulk_create([Role(name=f"角色{i}", code=f"bench_role_{i}") for i in range(roles)])
+    await Permission.bulk_create([Permission(name=f"权限{i}", code=f"bench_perm_{i}") for i in range(permissions)])
+    user_ids = await User.all().order_by("id").values_list("id", flat=True)
+    role_ids = await Role.all().order_by("id").values_list("id", flat=True)
+    permission_ids = await Permission.all().order_by("id").values_list("id", flat=True)
+
+    async with in_transaction() as connection:
+        for role_id in role_ids:
+            await link_many(
+                connection, Role._meta.fields_map["permissions"],
+                [role_id], rng.sample(permission_ids, min(permissions_per_role, len(permission_ids)))
+            )
+        for user_id in user_ids:
+            await link_many(
+                connection, User._meta.fields_map["roles"],
+                [user_id], rng.sample(role_ids, min(roles_per_user, len(role_ids)))
+            )
+    return user_ids
+
+
+async def resolve_nested(user_id: int) -> frozenset:
+    user = await User.get(id=user_id)
+    codes = set()
+    for role in await user.roles.all():
+        for permission in await role.permissions.all():
+            codes.add(permission.code)
+    return frozenset(codes)
+
+
+async def resolve_orm_join(user_id: int) -> frozenset:
+    codes = await Permission.filter(roles__users__id=user_id).distinct().values_list("code", flat=True)
+    return frozenset(codes)
+
+
+async def resolve_bitmask(user_id: int) -> frozenset:
+    return permission_registry.codes(permission_registry.role_mask(await load_user_role_ids(user_id)))
+
+
+STRATEGIES: Dict[str, Callable[[int], Awaitable[frozenset]]] = {
+    "nested": resolve_nested,
+    "orm_join": resolve_orm_join,
+    "through_join": load_user_permissions,
+    "bitmask": resolve_bitmask,
+}
+
+
+async def measure_checks(user_ids: List[int], iterations: int) -> None:
+    """
+    对比单次权限检查的耗时和缓存条目大小
+    """
+    user_id = user_ids[len(user_ids) // 2]
+    codes = await load_user_permissions(user_id)
+    mask = permission_registry.role_mask(await load_user_role_ids(user_id))
+    required = tuple(sorted(codes))[:3]
+    required_mask = permission_registry.required_mask(required)
+    loops = iterations * 1000
+
+    start = time.perf_counter()
+    for _ in range(loops):
+        all(code in codes for code in required)
+    set_ns = (time.perf_counter() - start) / loops * 1e9
+    start = time.perf_counter()
+    for _ in range(loops):
+        mask & required_mask == required_mask
+    mask_ns = (time.perf_counter() - start) / loops * 1e9
+
+    set_bytes = sys.getsizeof(codes) + sum(sys.getsizeof(code) for code in codes)
+    print(f"\n单次检查(所需 {len(required)} 个权限): 集合 {set_ns:.0f} ns, 掩码 {mask_ns:.0f} ns")
+    print(f"缓存条目大小: 集合 {set_bytes} 字节, 掩码 {sys.getsizeof(mask)} 字节")
+
+
+async def measure(func: Callable[[int], Awaitable[frozenset]], user_ids: List[int], iterations: int) -> List[float]:
+    """
+    逐次测量解析耗时
+    @return: List[float] 每次耗时(毫秒)
+    """
+    rng = random.Random(7)
+    samples = []
+    for _ in range(iterations):
+        user_id = rng.choice(user_ids)
+        start = time.perf_counter()
+        await func(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<28} {statistics.mean(samples):>9.3f} {statistics.median(samples):>9.3f} {p95:>9.3f}")
+
+
+async def main(args) -> None:
+    await Tortoise.init(db_url=args.db_url, modules={"models": MODELS})
+    await Tortoise.generate_schemas()
+    connection = Tortoise.get_connection("default")
+    try:
+        user_ids = await seed(args.users, args.roles, args.permissions, args.roles_per_user, args.permissions_per_role)
+        # 基准测试不依赖 Redis，直接按版本0加载注册表
+        await permission_registry.load(version=0)
+
+        # 结果一致性检查
+        sample_id = user_ids[len(user_ids) // 2]
+        results = {name: await func(sample_id) for name, func in STRATEGIES.items()}
+        assert len(set(results.values())) == 1, "各实现解析结果不一致"
+
+        print(f"用户 {args.users}, 角色 {args.roles}, 权限 {args.permissions}, 每次测量 {args.iterations} 次")
+        print(f"{'方式':<28} {'平均(ms)':>9} {'P50(ms)':>9} {'P95(ms)':>9}")
+        for name, func in STRATEGIES.items():
+            report(f"{name} (无索引)", await measure(func, user_ids, args.iterations))
+        for sql in index_statements(connection.capabilities.dialect):
+            await connection.execute_script(sql)
+        for name, func in STRATEGIES.items():
+            report(f"{name} (联合索引)", await measure(func, user_ids, args.iterations))
+        await measure_checks(user_ids, args.iterations)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="权限解析基准测试")
+    parser.add_argument("--db-url", default="sqlite://:memory:", help="测试数据库URL")
+    parser.add_argument("--users", type=int, default=2000, help="用户数")
+    parser.add_argument("--roles", type=int, default=50, help="角色数")
+    parser.add_argument("--permissions", type=int, default=300, help="权限数")
+    parser.add_argument("--roles-per-user", type=int, default=3, help="每个用户的角色数")
+    parser.add_argument("--permissions-per-role", type=int, default=20, help="每个角色的权限数")
+    parser.add_argument("--iterations", type=int, default=500, help="每种方式的测量次数")
+    asyncio.run(main(parser.parse_args()))
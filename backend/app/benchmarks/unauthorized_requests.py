@@ -0,0 +1,135 @@
+"""
+未认证请求吞吐基准测试
+
+对比预期内认证失败的两种处理方式：
+- legacy: 抛出 HTTPException，经 http_exception_handler 构造 ErrorResponse 并以 ERROR 级别记录日志
+- fast: 抛出预先序列化的 ExpectedAuthError，经 expected_auth_error_handler 直接返回响应体，按采样记录 DEBUG 日志
+分别测量异常处理器本身的耗时，以及经过完整中间件栈的请求吞吐；
+最后测量真实接口 /users/me 在缺少令牌和令牌无效时的吞吐
+
+用法: python -m app.benchmarks.unauthorized_requests --requests 5000
+不需要数据库和 Redis，失败发生在访问数据库之前
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import statistics
+import time
+from logging.handlers import QueueHandler
+from typing import Awaitable, Callable, List
+import httpx
+from fastapi import Depends, HTTPException, status
+from starlette.requests import Request
+from app.core.exceptions import INVALID_CREDENTIALS
+from app.core.handlers import expected_auth_error_handler, http_exception_handler
+from app.main import app
+from app.utils.log_server import logServer
+
+
+def legacy_dependency():
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="无效的认证凭据",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def fast_dependency():
+    raise INVALID_CREDENTIALS.exception()
+
+
+@app.get("/__bench__/legacy")
+async def legacy_endpoint(_=Depends(legacy_dependency)):
+    return {}
+
+
+@app.get("/__bench__/fast")
+async def fast_endpoint(_=Depends(fast_dependency)):
+    return {}
+
+
+def silence_logger() -> None:
+    """
+    日志仍经过队列处理器(保留事件循环线程上的开销)，但不写入文件和控制台
+    """
+    logger = logServer().run()
+    logger.handlers = [QueueHandler(queue.SimpleQueue())]
+
+
+async def measure_handler(handler: Callable[[], Awaitable], iterations: int) -> float:
+    """
+    测量异常处理器单次耗时
+    @return: float 平均耗时(微秒)
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await handler()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def measure_requests(client: httpx.AsyncClient, path: str, headers: dict, requests: int, concurrency: int) -> List[float]:
+    """
+    并发发送请求，确认全部返回 401
+    @return: List[float] 每个请求的耗时(毫秒)，总耗时附在最后
+    """
+    samples: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 401, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label: str, samples: List[float]) -> None:
+    total = samples.pop()
+    ordered = sorted(samples)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"{label:<32} {len(samples) / total:>10.0f} {statistics.median(samples):>9.3f} {p99:>9.3f}")
+
+
+async def main(args) -> None:
+    silence_logger()
+    logging.getLogger("uvicorn.access").disabled = True
+    request = Request({"type": "http", "method": "GET", "path": "/api/v1/users/me", "headers": [], "query_string": b""})
+
+    legacy_us = await measure_handler(
+        lambda: http_exception_handler(request, HTTPException(
+            status_code=401, detail="无效的认证凭据", headers={"WWW-Authenticate": "Bearer"}
+        )),
+        args.iterations
+    )
+    fast_us = await measure_handler(
+        lambda: expected_auth_error_handler(request, INVALID_CREDENTIALS.exception()),
+        args.iterations
+    )
+    print(f"异常处理器单次耗时: legacy {legacy_us:.1f} us, fast {fast_us:.1f} us")
+
+    print(f"\n请求 {args.requests} 次, 并发 {args.concurrency}")
+    print(f"{'场景':<32} {'吞吐(req/s)':>10} {'P50(ms)':>9} {'P99(ms)':>9}")
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        # 预热中间件栈
+        await client.get("/__bench__/fast")
+        for label, path, headers in (
+            ("legacy 处理器", "/__bench__/legacy", {}),
+            ("fast 处理器", "/__bench__/fast", {}),
+            ("/users/me 缺少令牌", "/api/v1/users/me", {}),
+            ("/users/me 令牌无效", "/api/v1/users/me", {"Authorization": "Bearer invalid.token.value"}),
+        ):
+            report(label, await measure_requests(client, path, headers, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="未认证请求吞吐基准测试")
+    parser.add_argument("--requests", type=int, default=5000, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发数")
+    parser.add_argument("--iterations", type=int, default=20000, help="异常处理器测量次数")
+    asyncio.run(main(parser.parse_args()))
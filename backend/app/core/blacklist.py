@@ -1,35 +1,89 @@
-from datetime import datetime, timedelta
+import hashlib
+import math
+import time
 from typing import Optional
 from app.utils.redis import RedisClient
 from app.core.config import settings
+from app.utils.lazy_import import lazy_import
 from app.utils.log_server import logServer
 
 logger = logServer().run()
 
+# 只读取令牌的 exp，不验证签名
+jwt = lazy_import("jose.jwt")
+
 class TokenBlacklist:
     """
     令牌黑名单管理类
+    黑名单条目在令牌的 exp 时刻过期，保存的是令牌摘要而不是完整令牌。两种存储方式：
+    - AUTH_BLACKLIST_BUCKETS=0：每个令牌一个键，依赖键的过期时间
+    - AUTH_BLACKLIST_BUCKETS>0：按摘要分桶的有序集合，成员为摘要、分数为 exp，
+      大量吊销时键数量固定，内存更紧凑；过期成员由后台维护任务清理，检查时按分数判断是否过期
     """
-    def __init__(self):
+    def __init__(self, buckets: int = 0):
         """
         初始化令牌黑名单
+        @param: buckets 有序集合分桶数，0 表示每个令牌一个键
         """
         self.redis = RedisClient()
         self.prefix = "token_blacklist:"
+        self.buckets = buckets
+
+    @staticmethod
+    def fingerprint(token: str) -> str:
+        """
+        令牌摘要(SHA-256 前128位)
+        @param: token JWT令牌
+        @return: str 32位十六进制摘要
+        """
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+    def _bucket_key(self, fingerprint: str) -> str:
+        return f"{self.prefix}b:{int(fingerprint[:8], 16) % self.buckets}"
+
+    @staticmethod
+    def token_expiry(token: str) -> Optional[float]:
+        """
+        令牌的过期时间
+        @param: token JWT令牌
+        @return: Optional[float] exp(Unix时间戳)，令牌无法解析或没有 exp 时为None
+        """
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except Exception:
+            return None
+        return float(exp) if isinstance(exp, (int, float)) else None
 
     async def add_to_blacklist(self, token: str, expire_seconds: Optional[int] = None) -> bool:
         """
-        将令牌添加到黑名单
+        将令牌添加到黑名单，条目在令牌过期时一并过期
         @param: token JWT令牌
-        @param: expire_seconds 过期时间(秒)
+        @param: expire_seconds 过期时间(秒)，默认取令牌剩余有效期；令牌没有 exp 时为访问令牌有效期
         @return: bool 是否成功
         """
         try:
-            key = f"{self.prefix}{token}"
+            now = time.time()
             if expire_seconds is None:
-                expire_seconds = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-            
-            success = await self.redis.set(key, "1", expire=expire_seconds)
+                exp = self.token_expiry(token)
+                if exp is None:
+                    exp = now + settings.ACCESS_TOKEN_EXPIRE_MINUTE * 60
+            else:
+                exp = now + expire_seconds
+            if exp <= now:
+                # 令牌已过期，无需加入黑名单
+                return True
+
+            fingerprint = self.fingerprint(token)
+            if self.buckets:
+                key = self._bucket_key(fingerprint)
+                success = await self.redis.zadd(key, {fingerprint: exp})
+                # 分桶键至少保留到其中最晚过期的令牌
+                lifetime = math.ceil(exp - now)
+                remaining = await self.redis.ttl(key)
+                if success and remaining is not None and remaining < lifetime:
+                    await self.redis.expire(key, lifetime)
+            else:
+                success = await self.redis.set(f"{self.prefix}{fingerprint}", "1", expire=math.ceil(exp - now))
             if success:
                 logger.info(f"令牌已加入黑名单: {token[:10]}...")
             return success
@@ -44,8 +98,11 @@ class TokenBlacklist:
         @return: bool 是否在黑名单中
         """
         try:
-            key = f"{self.prefix}{token}"
-            return await self.redis.exists(key)
+            fingerprint = self.fingerprint(token)
+            if self.buckets:
+                exp = await self.redis.zscore(self._bucket_key(fingerprint), fingerprint)
+                return exp is not None and exp > time.time()
+            return await self.redis.exists(f"{self.prefix}{fingerprint}")
         except Exception as e:
             logger.error(f"检查令牌黑名单失败: {str(e)}")
             return False
@@ -57,8 +114,11 @@ class TokenBlacklist:
         @return: bool 是否成功
         """
         try:
-            key = f"{self.prefix}{token}"
-            success = await self.redis.delete(key)
+            fingerprint = self.fingerprint(token)
+            if self.buckets:
+                success = await self.redis.zrem(self._bucket_key(fingerprint), fingerprint)
+            else:
+                success = await self.redis.delete(f"{self.prefix}{fingerprint}")
             if success:
                 logger.info(f"令牌已从黑名单移除: {token[:10]}...")
             return success
@@ -66,5 +126,18 @@ class TokenBlacklist:
             logger.error(f"从黑名单移除令牌失败: {str(e)}")
             return False
 
+    async def purge_expired(self) -> int:
+        """
+        清理分桶中已过期的成员，由后台维护任务定期调用；每个令牌一个键时依赖键过期，无需清理
+        @return: int 清理的成员数
+        """
+        if not self.buckets:
+            return 0
+        now = time.time()
+        removed = 0
+        for bucket in range(self.buckets):
+            removed += await self.redis.zremrangebyscore(f"{self.prefix}b:{bucket}", "-inf", now)
+        return removed
+
 # 创建黑名单管理器实例
-token_blacklist = TokenBlacklist() 
\ No newline at end of file
+token_blacklist = TokenBlacklist(buckets=settings.AUTH.BLACKLIST_BUCKETS)
@@ -1,37 +1,543 @@
+import ipaddress
+import json
 import os
-from dotenv import load_dotenv
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+from dotenv import dotenv_values
 
 
-# 加载 .env 文件
-env_path = Path(__file__).resolve().parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
+# .env 文件所在目录
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+
+class SettingsError(ValueError):
+    """
+    配置项解析或校验失败
+    """
+
+
+def _env(*names: str) -> Dict[str, Any]:
+    """
+    声明配置项对应的环境变量名(支持别名，按顺序取第一个存在的)
+    @param: names 环境变量名
+    @return: Dict[str, Any] dataclass field metadata
+    """
+    return {"env": names}
+
+
+def _parse_bool(name: str, raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off", ""):
+        return False
+    raise SettingsError(f"配置项 {name} 不是有效的布尔值: {raw!r}")
+
+
+def _parse_sequence(name: str, raw: str) -> Tuple[str, ...]:
+    """
+    解析列表配置，支持 JSON 数组或逗号分隔字符串
+    @param: name 配置项名称
+    @param: raw 原始字符串
+    @return: Tuple[str, ...] 不可变的字符串元组
+    """
+    raw = raw.strip()
+    if not raw:
+        return ()
+    if raw.startswith("["):
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            raise SettingsError(f"配置项 {name} 不是有效的JSON数组: {e}")
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise SettingsError(f"配置项 {name} 必须是字符串数组")
+        return tuple(value)
+    return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+
+def _parse_value(name: str, raw: str, annotation: Any) -> Any:
+    """
+    按类型注解解析环境变量字符串
+    @param: name 配置项名称
+    @param: raw 原始字符串
+    @param: annotation 类型注解
+    @return: Any 解析后的值
+    @exception: SettingsError 解析失败
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args:
+        if raw.strip() == "":
+            return None
+        annotation = next(a for a in args if a is not type(None))
+        origin = typing.get_origin(annotation)
+    if origin is tuple:
+        return _parse_sequence(name, raw)
+    if annotation is bool:
+        return _parse_bool(name, raw)
+    if annotation in (int, float):
+        try:
+            return annotation(raw.strip())
+        except ValueError:
+            raise SettingsError(f"配置项 {name} 不是有效的{annotation.__name__}: {raw!r}")
+    return raw
+
+
+def _check_positive(group: str, **values: float) -> None:
+    for key, value in values.items():
+        if value <= 0:
+            raise SettingsError(f"配置项 {group}_{key} 必须大于0: {value}")
+
+
+@dataclass(frozen=True)
+class DBPoolSettings:
+    """
+    数据库连接池配置，环境变量前缀 DB_POOL_
+    """
+    MIN_SIZE: int = 1
+    MAX_SIZE: int = 5
+    MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0
+
+    def __post_init__(self):
+        _check_positive("DB_POOL", MAX_SIZE=self.MAX_SIZE)
+        if not 0 <= self.MIN_SIZE <= self.MAX_SIZE:
+            raise SettingsError("配置项 DB_POOL_MIN_SIZE 必须在 0 和 DB_POOL_MAX_SIZE 之间")
+
+
+@dataclass(frozen=True)
+class DBQuerySettings:
+    """
+    数据库查询超时配置，环境变量前缀 DB_QUERY_
+    时间单位为秒，0 表示不限制
+    """
+    # 服务端语句超时，建立连接时设置(PostgreSQL statement_timeout)
+    STATEMENT_TIMEOUT: float = 30.0
+    # 服务端等锁超时(PostgreSQL lock_timeout / SQLite busy_timeout)
+    LOCK_TIMEOUT: float = 5.0
+    # 客户端单次查询超时
+    TIMEOUT: float = 10.0
+    # 单个请求内数据库查询的截止时间，从请求开始计算
+    REQUEST_DEADLINE: float = 20.0
+    # 慢查询日志阈值(毫秒)
+    SLOW_THRESHOLD_MS: int = 200
+
+    def __post_init__(self):
+        for key in ("STATEMENT_TIMEOUT", "LOCK_TIMEOUT", "TIMEOUT", "REQUEST_DEADLINE", "SLOW_THRESHOLD_MS"):
+            if getattr(self, key) < 0:
+                raise SettingsError(f"配置项 DB_QUERY_{key} 不能为负数")
+
+
+@dataclass(frozen=True)
+class RedisPoolSettings:
+    """
+    Redis连接池配置，环境变量前缀 REDIS_POOL_
+    """
+    MAX_CONNECTIONS: int = 50
+    SOCKET_TIMEOUT: float = 5.0
+    SOCKET_CONNECT_TIMEOUT: float = 5.0
+    HEALTH_CHECK_INTERVAL: int = 30
+
+    def __post_init__(self):
+        _check_positive(
+            "REDIS_POOL",
+            MAX_CONNECTIONS=self.MAX_CONNECTIONS,
+            SOCKET_TIMEOUT=self.SOCKET_TIMEOUT,
+            SOCKET_CONNECT_TIMEOUT=self.SOCKET_CONNECT_TIMEOUT
+        )
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    """
+    认证相关配置，环境变量前缀 AUTH_
+    """
+    BCRYPT_ROUNDS: int = 12
+    # 预期内的认证失败(401/403)每 N 次记录一条 DEBUG 日志
+    FAILURE_LOG_SAMPLE: int = 100
+    # 令牌黑名单分桶数，0 表示每个令牌一个键；吊销量大时使用分桶的有序集合更节省内存
+    BLACKLIST_BUCKETS: int = 0
+
+    def __post_init__(self):
+        if not 4 <= self.BCRYPT_ROUNDS <= 31:
+            raise SettingsError("配置项 AUTH_BCRYPT_ROUNDS 必须在 4 到 31 之间")
+        _check_positive("AUTH", FAILURE_LOG_SAMPLE=self.FAILURE_LOG_SAMPLE)
+        if not 0 <= self.BLACKLIST_BUCKETS <= 65536:
+            raise SettingsError("配置项 AUTH_BLACKLIST_BUCKETS 必须在 0 到 65536 之间")
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """
+    缓存配置，环境变量前缀 CACHE_
+    """
+    ENABLED: bool = True
+    # Redis(L2)缓存过期时间(秒)
+    DEFAULT_TTL: int = 60
+    # 进程内(L1)缓存过期时间(秒)，多进程部署时决定其他进程缓存失效的最大延迟
+    LOCAL_TTL: int = 5
+    LOCAL_MAX_ENTRIES: int = 10000
+    # 过期后仍返回旧值并在后台刷新的时间(秒)，0 表示不返回过期数据
+    STALE_TTL: int = 30
+    # 按标签失效时通知其他进程的 Redis 频道
+    INVALIDATION_CHANNEL: str = "cache:invalidate"
+    # 批量用户查询(DataLoader)跨请求缓存的过期时间(秒)，0 表示只在请求内合并
+    LOADER_TTL: int = 0
+
+    def __post_init__(self):
+        _check_positive(
+            "CACHE",
+            DEFAULT_TTL=self.DEFAULT_TTL,
+            LOCAL_TTL=self.LOCAL_TTL,
+            LOCAL_MAX_ENTRIES=self.LOCAL_MAX_ENTRIES
+        )
+        if self.STALE_TTL < 0 or self.LOADER_TTL < 0:
+            raise SettingsError("配置项 CACHE_STALE_TTL 和 CACHE_LOADER_TTL 不能为负数")
+
+
+@dataclass(frozen=True)
+class CorsSettings:
+    """
+    CORS配置，环境变量前缀 CORS_
+    允许的源仍使用 BACKEND_CORS_ORIGINS，支持 https://*.example.com 通配子域名
+    """
+    ALLOW_CREDENTIALS: bool = True
+    ALLOW_METHODS: Tuple[str, ...] = ("*",)
+    ALLOW_HEADERS: Tuple[str, ...] = ("*",)
+    EXPOSE_HEADERS: Tuple[str, ...] = ()
+    MAX_AGE: int = 600
+
+    def __post_init__(self):
+        if self.MAX_AGE < 0:
+            raise SettingsError("配置项 CORS_MAX_AGE 不能为负数")
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """
+    响应压缩配置，环境变量前缀 COMPRESSION_
+    brotli 需要安装可选依赖 Brotli，未安装时只使用 gzip
+    """
+    ENABLED: bool = True
+    MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_ENABLED: bool = True
+    BROTLI_QUALITY: int = 4
+    # 超过该大小(字节)的数据块在线程池中压缩
+    OFFLOAD_THRESHOLD: int = 256 * 1024
+
+    def __post_init__(self):
+        if not 1 <= self.GZIP_LEVEL <= 9:
+            raise SettingsError("配置项 COMPRESSION_GZIP_LEVEL 必须在 1 到 9 之间")
+        if not 0 <= self.BROTLI_QUALITY <= 11:
+            raise SettingsError("配置项 COMPRESSION_BROTLI_QUALITY 必须在 0 到 11 之间")
+        _check_positive("COMPRESSION", MINIMUM_SIZE=self.MINIMUM_SIZE, OFFLOAD_THRESHOLD=self.OFFLOAD_THRESHOLD)
+
+
+@dataclass(frozen=True)
+class WorkerSettings:
+    """
+    后台工作线程/进程池配置，环境变量前缀 WORKERS_
+    0 表示按CPU核数自动选择
+    """
+    THREAD_POOL_SIZE: int = 0
+    PROCESS_POOL_SIZE: int = 0
+
+    def __post_init__(self):
+        if self.THREAD_POOL_SIZE < 0 or self.PROCESS_POOL_SIZE < 0:
+            raise SettingsError("配置项 WORKERS_THREAD_POOL_SIZE / WORKERS_PROCESS_POOL_SIZE 不能为负数")
+
+
+@dataclass(frozen=True)
+class AdmissionSettings:
+    """
+    准入控制配置，环境变量前缀 ADMISSION_
+    路径以 * 结尾时按前缀匹配，否则精确匹配
+    """
+    ENABLED: bool = True
+    # 单进程最大并发请求数
+    MAX_IN_FLIGHT: int = 256
+    # 为高优先级请求保留的并发比例
+    RESERVED_RATIO: float = 0.2
+    # 低优先级请求可使用的普通并发比例
+    LOW_PRIORITY_RATIO: float = 0.5
+    # 事件循环延迟超过该值(毫秒)时只接受高优先级请求
+    MAX_LOOP_LAG_MS: int = 250
+    # 事件循环延迟采样间隔(秒)
+    LAG_CHECK_INTERVAL: float = 0.5
+    # 请求截止时间(秒)，应略小于负载均衡器超时；请求头 X-Request-Timeout 只能缩短
+    REQUEST_TIMEOUT: float = 30.0
+    # 拒绝时返回的 Retry-After(秒)
+    RETRY_AFTER: int = 1
+    # 拒绝日志的最小间隔(秒)，期间的拒绝只计入 admission.rejected.* 指标
+    REJECT_LOG_INTERVAL: float = 10.0
+    HIGH_PRIORITY_PATHS: Tuple[str, ...] = ("/api/v1/auth/refresh", "/api/v1/users/me")
+    LOW_PRIORITY_PATHS: Tuple[str, ...] = (
+        "/api/v1/users/",
+        "/api/v1/users/search",
+        "/api/v1/users/export",
+        "/api/v1/users/import",
+        "/api/v1/roles/users/*",
+        "/api/v1/roles/permissions/*",
+    )
+
+    def __post_init__(self):
+        _check_positive(
+            "ADMISSION",
+            MAX_IN_FLIGHT=self.MAX_IN_FLIGHT,
+            MAX_LOOP_LAG_MS=self.MAX_LOOP_LAG_MS,
+            LAG_CHECK_INTERVAL=self.LAG_CHECK_INTERVAL,
+            REQUEST_TIMEOUT=self.REQUEST_TIMEOUT,
+            REJECT_LOG_INTERVAL=self.REJECT_LOG_INTERVAL
+        )
+        if not 0 <= self.RESERVED_RATIO < 1 or not 0 < self.LOW_PRIORITY_RATIO <= 1:
+            raise SettingsError("配置项 ADMISSION_RESERVED_RATIO 必须在 [0, 1) 之间，ADMISSION_LOW_PRIORITY_RATIO 必须在 (0, 1] 之间")
+        if self.RETRY_AFTER < 0:
+            raise SettingsError("配置项 ADMISSION_RETRY_AFTER 不能为负数")
+
+
+@dataclass(frozen=True)
+class AccessLogSettings:
+    """
+    访问日志配置，环境变量前缀 ACCESS_LOG_
+    按状态码分别采样，5xx 和慢请求全部记录；采样率为 0~1
+    """
+    ENABLED: bool = True
+    # 2xx/3xx 采样率
+    SUCCESS_SAMPLE_RATE: float = 0.01
+    # 4xx 采样率
+    CLIENT_ERROR_SAMPLE_RATE: float = 0.1
+    # 超过该耗时(毫秒)的请求全部记录
+    SLOW_THRESHOLD_MS: int = 1000
+
+    def __post_init__(self):
+        for key in ("SUCCESS_SAMPLE_RATE", "CLIENT_ERROR_SAMPLE_RATE"):
+            if not 0 <= getattr(self, key) <= 1:
+                raise SettingsError(f"配置项 ACCESS_LOG_{key} 必须在 0 到 1 之间")
+        _check_positive("ACCESS_LOG", SLOW_THRESHOLD_MS=self.SLOW_THRESHOLD_MS)
+
+
+@dataclass(frozen=True)
+class WarmupSettings:
+    """
+    启动预热配置，环境变量前缀 WARMUP_
+    """
+    ENABLED: bool = True
+    # 预先建立的 Redis 连接数
+    REDIS_CONNECTIONS: int = 4
+
+    def __post_init__(self):
+        if self.REDIS_CONNECTIONS < 0:
+            raise SettingsError("配置项 WARMUP_REDIS_CONNECTIONS 不能为负数")
+
+
+@dataclass(frozen=True)
+class ShutdownSettings:
+    """
+    优雅关闭配置，环境变量前缀 SHUTDOWN_
+    """
+    # lifespan 关闭时等待进行中请求完成的最长时间(秒)
+    # 使用 uvicorn 时请求由 --timeout-graceful-shutdown 等待，这里只等待被取消请求的收尾
+    DRAIN_TIMEOUT: float = 20.0
+
+    def __post_init__(self):
+        if self.DRAIN_TIMEOUT < 0:
+            raise SettingsError("配置项 SHUTDOWN_DRAIN_TIMEOUT 不能为负数")
+
+
+@dataclass(frozen=True)
+class TracingSettings:
+    """
+    链路追踪配置，环境变量前缀 TRACING_
+    在请求入口按采样率决定是否追踪，可信代理传入 traceparent 时沿用其采样标记
+    """
+    ENABLED: bool = False
+    # 采样率 0~1
+    SAMPLE_RATE: float = 0.01
+    # 导出器：file(写入 链路追踪_*.jsonl) 或 memory(测试用)
+    EXPORTER: str = "file"
+    # 沿用其 traceparent 采样标记的上游地址(IP 或 CIDR，逗号分隔)，其他来源只沿用 trace_id，按采样率决定是否采样
+    TRUSTED_PROXIES: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if not 0 <= self.SAMPLE_RATE <= 1:
+            raise SettingsError("配置项 TRACING_SAMPLE_RATE 必须在 0 到 1 之间")
+        for proxy in self.TRUSTED_PROXIES:
+            try:
+                ipaddress.ip_network(proxy, strict=False)
+            except ValueError:
+                raise SettingsError(f"配置项 TRACING_TRUSTED_PROXIES 不是有效的IP或网段: {proxy!r}")
+        if self.EXPORTER not in ("file", "memory"):
+            raise SettingsError(f"配置项 TRACING_EXPORTER 必须是 file 或 memory: {self.EXPORTER!r}")
+
+
+@dataclass(frozen=True)
+class ProfilerSettings:
+    """
+    按需性能分析配置，环境变量前缀 PROFILER_
+    """
+    # 分析期间会拖慢所在 worker，默认关闭，排查问题时再开启
+    ENABLED: bool = False
+    # 单次分析的最长时间(秒)
+    MAX_SECONDS: int = 60
+    # 默认调用栈采样间隔(毫秒)
+    INTERVAL_MS: int = 5
+
+    def __post_init__(self):
+        _check_positive("PROFILER", MAX_SECONDS=self.MAX_SECONDS, INTERVAL_MS=self.INTERVAL_MS)
+
+
+@dataclass(frozen=True)
+class RedisMaintenanceSettings:
+    """
+    Redis 维护任务配置，环境变量前缀 REDIS_MAINTENANCE_
+    定期用 SCAN 统计各前缀的键数量和内存，并清理令牌黑名单分桶中的过期成员
+    """
+    ENABLED: bool = True
+    # 执行间隔(秒)，多个进程中同一时间只有一个执行
+    INTERVAL: int = 300
+    # 每次 SCAN 的建议数量
+    SCAN_COUNT: int = 1000
+    # 单次最多遍历的键数，超过时按比例估算
+    MAX_KEYS: int = 100000
+    # 每个前缀抽样计算内存的键数
+    SAMPLE_SIZE: int = 50
+    # 最多统计的前缀数，超出的前缀和无法归类的键计入 other
+    MAX_PREFIXES: int = 50
+
+    def __post_init__(self):
+        _check_positive(
+            "REDIS_MAINTENANCE",
+            INTERVAL=self.INTERVAL,
+            SCAN_COUNT=self.SCAN_COUNT,
+            MAX_KEYS=self.MAX_KEYS,
+            SAMPLE_SIZE=self.SAMPLE_SIZE,
+            MAX_PREFIXES=self.MAX_PREFIXES
+        )
+
+
+@dataclass(frozen=True)
+class UserStatsSettings:
+    """
+    仪表盘用户统计配置，环境变量前缀 USER_STATS_
+    统计保存在 Redis 中随用户变更增量更新，并定期用 SQL 聚合校正
+    """
+    # 校正间隔(秒)，多个进程中同一时间只有一个执行
+    RECONCILE_INTERVAL: int = 600
+
+    def __post_init__(self):
+        _check_positive("USER_STATS", RECONCILE_INTERVAL=self.RECONCILE_INTERVAL)
+
+
+@dataclass(frozen=True)
 class Settings:
+    """
+    应用配置
+    实例创建后不可修改，热路径可以在模块加载时把需要的值绑定为局部常量
+    """
+    # 运行环境，决定叠加加载的 .env.{APP_ENV} 文件
+    APP_ENV: str = "development"
+
     # 数据库配置
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
-    TORTOISE_ORM_DATABASE_URL: str = os.getenv("TORTOISE_ORM_DATABASE_URL")
+    DATABASE_URL: Optional[str] = None
+    TORTOISE_ORM_DATABASE_URL: Optional[str] = None
 
     # Redis 配置
-    REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
-    REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
-    REDIS_DB: int = int(os.getenv("REDIS_DB", 0))
-    REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str = field(default="", repr=False)
 
     # JWT 配置
-    SECRET_KEY: str = os.getenv("SECRET_KEY")
-    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTE: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTE", 30))
-    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+    SECRET_KEY: Optional[str] = field(default=None, repr=False)
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTE: int = field(
+        default=30, metadata=_env("ACCESS_TOKEN_EXPIRE_MINUTE", "ACCESS_TOKEN_EXPIRE_MINUTES")
+    )
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
     # 应用配置
-    APP_NAME: str = os.getenv("APP_NAME", "FastAPI Full Stack Template")
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    API_V1_PREFIX: str = os.getenv("API_V1_PREFIX", "/api/v1")
-    BACKEND_CORS_ORIGINS: list = eval(os.getenv("BACKEND_CORS_ORIGINS", "[]"))
+    APP_NAME: str = "FastAPI Full Stack Template"
+    DEBUG: bool = False
+    API_V1_PREFIX: str = "/api/v1"
+    BACKEND_CORS_ORIGINS: Tuple[str, ...] = ()
 
     # 初始管理员信息
-    FIRST_SUPERUSER: str = os.getenv("FIRST_SUPERUSER")
-    FIRST_SUPERUSER_PASSWORD: str = os.getenv("FIRST_SUPERUSER_PASSWORD")
+    FIRST_SUPERUSER: Optional[str] = None
+    FIRST_SUPERUSER_PASSWORD: Optional[str] = field(default=None, repr=False)
+
+    # 分组配置
+    DB_POOL: DBPoolSettings = field(default_factory=DBPoolSettings)
+    DB_QUERY: DBQuerySettings = field(default_factory=DBQuerySettings)
+    REDIS_POOL: RedisPoolSettings = field(default_factory=RedisPoolSettings)
+    AUTH: AuthSettings = field(default_factory=AuthSettings)
+    CACHE: CacheSettings = field(default_factory=CacheSettings)
+    CORS: CorsSettings = field(default_factory=CorsSettings)
+    COMPRESSION: CompressionSettings = field(default_factory=CompressionSettings)
+    WORKERS: WorkerSettings = field(default_factory=WorkerSettings)
+    ADMISSION: AdmissionSettings = field(default_factory=AdmissionSettings)
+    ACCESS_LOG: AccessLogSettings = field(default_factory=AccessLogSettings)
+    WARMUP: WarmupSettings = field(default_factory=WarmupSettings)
+    SHUTDOWN: ShutdownSettings = field(default_factory=ShutdownSettings)
+    TRACING: TracingSettings = field(default_factory=TracingSettings)
+    PROFILER: ProfilerSettings = field(default_factory=ProfilerSettings)
+    REDIS_MAINTENANCE: RedisMaintenanceSettings = field(default_factory=RedisMaintenanceSettings)
+    USER_STATS: UserStatsSettings = field(default_factory=UserStatsSettings)
+
+
+def _build(cls: type, source: Mapping[str, str], prefix: str = "") -> Any:
+    """
+    根据 dataclass 字段的类型注解从配置源构建实例
+    @param: cls 配置类
+    @param: source 环境变量映射
+    @param: prefix 分组环境变量前缀
+    @return: Any 配置实例
+    @exception: SettingsError 配置项无效
+    """
+    hints = typing.get_type_hints(cls)
+    kwargs: Dict[str, Any] = {}
+    for f in fields(cls):
+        annotation = hints[f.name]
+        if is_dataclass(annotation):
+            kwargs[f.name] = _build(annotation, source, prefix=f"{f.name}_")
+            continue
+        for env_name in f.metadata.get("env", (prefix + f.name,)):
+            if env_name in source:
+                kwargs[f.name] = _parse_value(env_name, source[env_name], annotation)
+                break
+    return cls(**kwargs)
+
+
+def load_settings(env_file: Optional[Path] = None, environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """
+    加载配置
+    优先级：.env.{APP_ENV} > .env > 进程环境变量
+    @param: env_file 基础 .env 文件路径
+    @param: environ 进程环境变量，默认 os.environ
+    @return: Settings 不可变配置实例
+    @exception: SettingsError 配置项无效
+    """
+    env_file = env_file or BASE_DIR / ".env"
+    source: Dict[str, str] = dict(os.environ if environ is None else environ)
+    source.update({k: v for k, v in dotenv_values(env_file).items() if v is not None})
+
+    # 叠加环境配置文件，如 .env.production
+    profile = source.get("APP_ENV", Settings.APP_ENV)
+    profile_file = env_file.with_name(f"{env_file.name}.{profile}")
+    if profile_file.exists():
+        source.update({k: v for k, v in dotenv_values(profile_file).items() if v is not None})
+    return _build(Settings, source)
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    获取配置单例，只解析一次
+    @return: Settings 配置实例
+    """
+    return load_settings()
+
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
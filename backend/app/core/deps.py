@@ -1,49 +1,77 @@
 from typing import Optional, List
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.exceptions import (
+    ADMIN_REQUIRED,
+    INVALID_CREDENTIALS,
+    NOT_AUTHENTICATED,
+    PERMISSION_DENIED,
+    USER_DISABLED
+)
 from app.models.user import User
+from app.core.permission_cache import permission_cache
+from app.core.permission_registry import permission_registry
+from app.crud.user import find_user, is_admin_user
 from app.utils.log_server import logServer
+from app.utils.lazy_import import lazy_import
 
 logger = logServer().run()
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+# 延迟导入 jose，首次解码令牌时才加载
+jwt = lazy_import("jose.jwt")
+
+# 配置不可变，热路径使用的值在加载时绑定一次
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHMS = [settings.ALGORITHM]
+
+class BearerTokenScheme(OAuth2PasswordBearer):
+    """
+    Bearer 令牌提取，缺少令牌时抛出预先序列化的认证失败
+    """
+    def __init__(self, tokenUrl: str):
+        super().__init__(tokenUrl=tokenUrl, auto_error=False)
+
+    async def __call__(self, request: Request) -> str:
+        token = await super().__call__(request)
+        if not token:
+            raise NOT_AUTHENTICATED.exception()
+        return token
+
+oauth2_scheme = BearerTokenScheme(tokenUrl="api/v1/auth/login")
+
+def decode_token_subject(token: str) -> str:
+    """
+    解码访问令牌并返回用户名，不访问数据库
+    @param: token JWT令牌
+    @return: str 用户名
+    @exception: ExpectedAuthError 认证失败异常
+    """
+    try:
+        # 解码JWT令牌
+        payload = jwt.decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
+    except jwt.JWTError:
+        raise INVALID_CREDENTIALS.exception()
+    username: str = payload.get("sub")
+    if username is None:
+        raise INVALID_CREDENTIALS.exception()
+    return username
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     获取当前用户
     @param: token JWT令牌
     @return: User 当前用户对象
-    @exception: HTTPException 认证失败异常
+    @exception: ExpectedAuthError 认证失败异常
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="无效的认证凭据",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        # 解码JWT令牌
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    username = decode_token_subject(token)
 
     # 获取用户信息
-    user = await User.get_or_none(username=username)
+    user = await find_user(username)
     if user is None:
-        raise credentials_exception
+        raise INVALID_CREDENTIALS.exception()
     if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="用户已被禁用"
-        )
+        raise USER_DISABLED.exception()
     return user
 
 async def get_current_active_user(
@@ -53,13 +81,10 @@ async def get_current_active_user(
     获取当前活跃用户
     @param: current_user 当前用户对象
     @return: User 当前活跃用户对象
-    @exception: HTTPException 用户未激活异常
+    @exception: ExpectedAuthError 用户未激活异常
     """
     if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="用户已被禁用"
-        )
+        raise USER_DISABLED.exception()
     return current_user
 
 def check_permissions(required_permissions: List[str]):
@@ -68,6 +93,8 @@ def check_permissions(required_permissions: List[str]):
     @param: required_permissions 所需权限列表
     @return: 权限检查函数
     """
+    required_permissions = tuple(required_permissions)
+
     async def permission_checker(
         current_user: User = Depends(get_current_active_user)
     ) -> User:
@@ -75,22 +102,16 @@ def check_permissions(required_permissions: List[str]):
         权限检查函数
         @param: current_user 当前用户对象
         @return: User 当前用户对象
-        @exception: HTTPException 权限不足异常
+        @exception: ExpectedAuthError 权限不足异常
         """
-        # 获取用户所有权限
-        user_permissions = set()
-        for role in await current_user.roles.all():
-            for permission in await role.permissions.all():
-                user_permissions.add(permission.code)
-
-        # 检查是否具有所需权限
-        if not all(perm in user_permissions for perm in required_permissions):
-            logger.warning(f"用户 {current_user.username} 权限不足")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="权限不足"
-            )
+        # 用户权限掩码(带缓存)与所需权限掩码做一次与运算
+        user_mask = await permission_cache.get_mask(current_user.id)
+        required_mask = permission_registry.required_mask(required_permissions)
+        if required_mask is None or user_mask & required_mask != required_mask:
+            raise PERMISSION_DENIED.exception()
         return current_user
+    # 启动预热时据此预先计算各路由所需的权限掩码
+    permission_checker.required_permissions = required_permissions
     return permission_checker
 
 # 常用权限依赖
@@ -101,20 +122,10 @@ async def get_admin_user(
     获取管理员用户
     @param: current_user 当前用户对象
     @return: User 管理员用户对象
-    @exception: HTTPException 非管理员异常
+    @exception: ExpectedAuthError 非管理员异常
     """
-    is_admin = False
-    for role in await current_user.roles.all():
-        if role.code == "admin":
-            is_admin = True
-            break
-    
-    if not is_admin:
-        logger.warning(f"用户 {current_user.username} 尝试访问管理员接口")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="需要管理员权限"
-        )
+    if not await is_admin_user(current_user.id):
+        raise ADMIN_REQUIRED.exception()
     return current_user
 
 # 权限依赖快捷方式
@@ -1,5 +1,7 @@
+import json
 from fastapi import HTTPException, status
 from typing import Optional, Any, Dict
+from app.schemas.response import ErrorResponse
 
 class BaseAPIException(HTTPException):
     """
@@ -90,4 +92,70 @@ class ServerException(BaseAPIException):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             message=message,
             detail=detail
-        ) 
\ No newline at end of file
+        ) 
+
+class DatabaseTimeoutException(BaseAPIException):
+    """
+    数据库查询超时异常
+    """
+    def __init__(
+        self,
+        message: str = "数据库查询超时",
+        detail: Optional[str] = None
+    ):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            message=message,
+            detail=detail
+        )
+
+class AuthErrorResponse:
+    """
+    预先序列化的认证/授权失败响应
+    响应体在模块加载时生成一次，每次失败只创建一个轻量异常
+    """
+    __slots__ = ("status_code", "message", "headers", "body")
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers
+        # 与 JSONResponse 的序列化方式一致
+        self.body = json.dumps(
+            ErrorResponse(code=status_code, message=message).dict(),
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+    def exception(self) -> "ExpectedAuthError":
+        """
+        创建对应的异常
+        @return: ExpectedAuthError 认证失败异常
+        """
+        return ExpectedAuthError(self)
+
+class ExpectedAuthError(HTTPException):
+    """
+    预期内的认证/授权失败，如缺少令牌、令牌无效、权限不足
+    由 expected_auth_error_handler 直接返回预先序列化的响应体
+    """
+    def __init__(self, response: AuthErrorResponse):
+        super().__init__(status_code=response.status_code, detail=response.message, headers=response.headers)
+        self.response = response
+
+    def __str__(self) -> str:
+        return self.response.message
+
+_BEARER = {"WWW-Authenticate": "Bearer"}
+
+# 常见的认证/授权失败
+NOT_AUTHENTICATED = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "Not authenticated", _BEARER)
+INVALID_CREDENTIALS = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "无效的认证凭据", _BEARER)
+INVALID_TOKEN = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "无效的令牌", _BEARER)
+INVALID_REFRESH_TOKEN = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "无效的刷新令牌", _BEARER)
+TOKEN_REVOKED = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "令牌已失效", _BEARER)
+TOKEN_USER_NOT_FOUND = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "用户不存在", _BEARER)
+INVALID_LOGIN = AuthErrorResponse(status.HTTP_401_UNAUTHORIZED, "用户名或密码错误", _BEARER)
+USER_DISABLED = AuthErrorResponse(status.HTTP_400_BAD_REQUEST, "用户已被禁用")
+PERMISSION_DENIED = AuthErrorResponse(status.HTTP_403_FORBIDDEN, "权限不足")
+ADMIN_REQUIRED = AuthErrorResponse(status.HTTP_403_FORBIDDEN, "需要管理员权限")
@@ -1,13 +1,21 @@
+import itertools
+import logging
 from fastapi import Request, status, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
-from app.core.exceptions import BaseAPIException
+from app.core.config import settings
+from app.core.exceptions import BaseAPIException, ExpectedAuthError
 from app.schemas.response import ErrorResponse
+from app.utils.metrics import metrics
 from app.utils.log_server import logServer
 
 logger = logServer().run()
 
+# 预期内认证失败的日志采样
+_AUTH_FAILURE_LOG_SAMPLE = settings.AUTH.FAILURE_LOG_SAMPLE
+_auth_failures = itertools.count(1)
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """
     参数验证异常处理器
@@ -55,6 +63,28 @@ async def api_exception_handler(request: Request, exc: BaseAPIException):
         headers=exc.headers
     )
 
+async def expected_auth_error_handler(request: Request, exc: ExpectedAuthError):
+    """
+    预期内认证/授权失败的快速处理器
+    直接返回预先序列化的响应体，不构造响应模型，按采样记录 DEBUG 日志
+    @param: request 请求对象
+    @param: exc 异常对象
+    @return: Response 错误响应
+    """
+    metrics.inc("auth.failures")
+    if next(_auth_failures) % _AUTH_FAILURE_LOG_SAMPLE == 0 and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "认证失败(每 %d 次记录一次): %s %s -> %d %s",
+            _AUTH_FAILURE_LOG_SAMPLE, request.method, request.url.path, exc.status_code, exc.detail
+        )
+    error = exc.response
+    return Response(
+        content=error.body,
+        status_code=error.status_code,
+        headers=error.headers,
+        media_type="application/json"
+    )
+
 async def http_exception_handler(request: Request, exc: HTTPException):
     """
     HTTP异常处理器
@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, List, Tuple
+from pypika import Table
+from tortoise import Tortoise
+from app.core.config import settings
+from app.models.user import User
+from app.models.role import Role
+from app.models.permission import Permission
+from app.core.permission_registry import permission_registry
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+
+async def load_user_permissions(user_id: int) -> FrozenSet[str]:
+    """
+    从数据库加载用户通过角色获得的全部权限编码
+    只连接两张中间表和权限表，不经过 users/roles 表，可直接命中中间表的联合索引
+    @param: user_id 用户ID
+    @return: FrozenSet[str] 权限编码集合
+    """
+    user_roles = User._meta.fields_map["roles"]
+    role_permissions = Role._meta.fields_map["permissions"]
+    users_roles = Table(user_roles.through)
+    roles_permissions = Table(role_permissions.through)
+    permissions = Table(Permission._meta.db_table)
+    connection = Tortoise.get_connection(Permission._meta.default_connection)
+    query = (
+        connection.query_class.from_(users_roles)
+        .join(roles_permissions).on(
+            roles_permissions[role_permissions.backward_key] == users_roles[user_roles.forward_key]
+        )
+        .join(permissions).on(permissions.id == roles_permissions[role_permissions.forward_key])
+        .where(users_roles[user_roles.backward_key] == int(user_id))
+        .select(permissions.code)
+        .distinct()
+    )
+    rows = await connection.execute_query_dict(str(query))
+    return frozenset(row["code"] for row in rows)
+
+
+async def load_user_role_ids(user_id: int) -> List[int]:
+    """
+    从中间表加载用户的角色ID，命中 users_roles 的联合索引
+    @param: user_id 用户ID
+    @return: List[int] 角色ID列表
+    """
+    field = User._meta.fields_map["roles"]
+    users_roles = Table(field.through)
+    connection = Tortoise.get_connection(User._meta.default_connection)
+    query = connection.query_class.from_(users_roles).select(users_roles[field.forward_key]).where(
+        users_roles[field.backward_key] == int(user_id)
+    )
+    rows = await connection.execute_query_dict(str(query))
+    return [row[field.forward_key] for row in rows]
+
+
+class PermissionCache:
+    """
+    用户有效权限缓存
+    缓存的是用户权限位掩码(一个整数)，由用户角色的预计算掩码合并而成，见 permission_registry。
+    进程内缓存(L1)和 Redis(L2)的键都带注册表版本号，权限或角色权限变更递增版本后旧缓存自然失效；
+    用户角色变更时由 crud 层主动失效
+    """
+    def __init__(self):
+        """
+        初始化权限缓存
+        """
+        self.redis = RedisClient()
+        self.prefix = "user_permissions:"
+        self.enabled = settings.CACHE.ENABLED
+        self.ttl = settings.CACHE.DEFAULT_TTL
+        self.local_ttl = settings.CACHE.LOCAL_TTL
+        self.local_max_entries = settings.CACHE.LOCAL_MAX_ENTRIES
+        # 用户ID -> (过期时间, 注册表版本, 权限掩码)
+        self._local: "OrderedDict[int, Tuple[float, int, int]]" = OrderedDict()
+
+    async def get_mask(self, user_id: int) -> int:
+        """
+        获取用户权限掩码，未命中时查询用户角色并合并角色掩码
+        @param: user_id 用户ID
+        @return: int 权限掩码
+        """
+        await permission_registry.ensure_fresh()
+        version = permission_registry.version
+        if not self.enabled:
+            return permission_registry.role_mask(await load_user_role_ids(user_id))
+        now = time.monotonic()
+        cached = self._local.get(user_id)
+        if cached is not None and cached[0] >= now and cached[1] == version:
+            self._local.move_to_end(user_id)
+            return cached[2]
+
+        key = f"{self.prefix}{version}:{user_id}"
+        raw = await self.redis.get(key)
+        mask = None
+        if raw is not None:
+            try:
+                mask = int(raw)
+            except ValueError as e:
+                logger.warning(f"权限缓存数据无效: {str(e)}")
+        if mask is None:
+            mask = permission_registry.role_mask(await load_user_role_ids(user_id))
+            await self.redis.set(key, str(mask), expire=self.ttl)
+
+        self._local[user_id] = (now + self.local_ttl, version, mask)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+        return mask
+
+    async def get(self, user_id: int) -> FrozenSet[str]:
+        """
+        获取用户有效权限编码
+        @param: user_id 用户ID
+        @return: FrozenSet[str] 权限编码集合
+        """
+        return permission_registry.codes(await self.get_mask(user_id))
+
+    async def invalidate(self, user_ids: Iterable[int]) -> None:
+        """
+        使用户权限缓存失效
+        @param: user_ids 用户ID列表
+        """
+        keys = []
+        for user_id in set(user_ids):
+            self._local.pop(user_id, None)
+            keys.append(f"{self.prefix}{permission_registry.version}:{user_id}")
+        if keys:
+            await self.redis.delete(*keys)
+            logger.debug(f"用户权限缓存已失效: {len(keys)} 个用户")
+
+
+# 创建权限缓存实例
+permission_cache = PermissionCache()
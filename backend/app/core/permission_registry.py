@@ -0,0 +1,172 @@
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from pypika import Table
+from tortoise import Tortoise
+from app.core.config import settings
+from app.models.role import Role
+from app.models.permission import Permission
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+
+class PermissionRegistry:
+    """
+    权限位图注册表
+    权限按ID排序后依次编号为连续的位(第 n 个权限占第 n 位)，掩码长度只取决于权限数量，
+    每个角色的权限预先合并成位掩码，权限检查只需一次整数与运算。
+    位编号随权限增删变化，因此与注册表版本绑定：权限或角色权限变更时递增 Redis 中的版本号，
+    缓存的用户掩码按版本区分，各进程按 CACHE_LOCAL_TTL 间隔检查版本并重新加载
+    """
+    def __init__(self):
+        """
+        初始化权限注册表
+        """
+        self.redis = RedisClient()
+        self.version_key = "permission_registry:version"
+        self.check_interval = settings.CACHE.LOCAL_TTL
+        self.version = 0
+        self.loaded = False
+        self._next_check = 0.0
+        self._bits: Dict[str, int] = {}
+        self._codes: Dict[int, str] = {}
+        self._role_masks: Dict[int, int] = {}
+        self._required: Dict[Tuple[str, ...], Optional[int]] = {}
+
+    async def _remote_version(self) -> int:
+        raw = await self.redis.get(self.version_key)
+        try:
+            return int(raw) if raw is not None else 0
+        except ValueError:
+            return 0
+
+    async def load(self, version: Optional[int] = None) -> None:
+        """
+        从数据库加载权限位和角色掩码
+        @param: version 注册表版本，为空时从 Redis 读取
+        """
+        check_version = version is None
+        if check_version:
+            version = await self._remote_version()
+        while True:
+            bits, role_masks = await self._read()
+            if not check_version:
+                break
+            # 读取期间版本变化说明数据已更新，位编号可能与该版本下缓存的掩码不一致，按新版本重读
+            current = await self._remote_version()
+            if current == version:
+                break
+            version = current
+
+        self._bits = bits
+        self._codes = {bit: code for code, bit in bits.items()}
+        self._role_masks = role_masks
+        # 已编译的所需权限(如启动时预热的路由权限表)按新的权限位重新计算，保持常驻
+        self._required = {key: self._compile(key) for key in self._required}
+        self.version = version
+        self.loaded = True
+        self._next_check = time.monotonic() + self.check_interval
+        logger.debug(f"权限注册表已加载: 版本 {version}, {len(bits)} 个权限, {len(role_masks)} 个角色")
+
+    async def _read(self) -> Tuple[Dict[str, int], Dict[int, int]]:
+        """
+        查询权限位编号和角色掩码
+        @return: Tuple[Dict[str, int], Dict[int, int]] 权限编码 -> 位编号，角色ID -> 权限掩码
+        """
+        connection = Tortoise.get_connection(Permission._meta.default_connection)
+        rows = await Permission.all().order_by("id").values_list("id", "code")
+        field = Role._meta.fields_map["permissions"]
+        through = Table(field.through)
+        query = connection.query_class.from_(through).select(
+            through[field.backward_key], through[field.forward_key]
+        )
+        links = await connection.execute_query_dict(str(query))
+
+        bits: Dict[str, int] = {}
+        id_bits: Dict[int, int] = {}
+        for bit, (permission_id, code) in enumerate(rows):
+            bits[code] = bit
+            id_bits[permission_id] = bit
+        role_masks: Dict[int, int] = {}
+        for link in links:
+            bit = id_bits.get(link[field.forward_key])
+            if bit is None:
+                continue
+            role_id = link[field.backward_key]
+            role_masks[role_id] = role_masks.get(role_id, 0) | (1 << bit)
+        return bits, role_masks
+
+    async def ensure_fresh(self) -> None:
+        """
+        确保注册表已加载且与 Redis 中的版本一致，版本检查最多每 check_interval 秒一次
+        """
+        if not self.loaded:
+            await self.load()
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        if await self._remote_version() != self.version:
+            await self.load()
+
+    async def bump(self) -> None:
+        """
+        权限或角色权限变更后递增版本号并重新加载，其他进程在下次版本检查时重新加载
+        """
+        await self.redis.incr(self.version_key)
+        await self.load()
+
+    def role_mask(self, role_ids: Iterable[int]) -> int:
+        """
+        合并角色的权限掩码
+        @param: role_ids 角色ID列表
+        @return: int 权限掩码
+        """
+        mask = 0
+        role_masks = self._role_masks
+        for role_id in role_ids:
+            mask |= role_masks.get(role_id, 0)
+        return mask
+
+    def required_mask(self, codes: Iterable[str]) -> Optional[int]:
+        """
+        计算所需权限的掩码，结果缓存，注册表重新加载时重新计算
+        @param: codes 权限编码列表
+        @return: Optional[int] 权限掩码，存在未知编码时为None(任何用户都不满足)
+        """
+        key = tuple(codes)
+        if key in self._required:
+            return self._required[key]
+        mask = self._compile(key)
+        self._required[key] = mask
+        return mask
+
+    def _compile(self, codes: Tuple[str, ...]) -> Optional[int]:
+        mask = 0
+        for code in codes:
+            bit = self._bits.get(code)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def codes(self, mask: int) -> FrozenSet[str]:
+        """
+        把权限掩码还原为权限编码
+        @param: mask 权限掩码
+        @return: FrozenSet[str] 权限编码集合
+        """
+        codes = set()
+        while mask:
+            low = mask & -mask
+            code = self._codes.get(low.bit_length() - 1)
+            if code is not None:
+                codes.add(code)
+            mask ^= low
+        return frozenset(codes)
+
+
+# 创建权限注册表实例
+permission_registry = PermissionRegistry()
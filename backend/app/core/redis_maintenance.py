@@ -0,0 +1,186 @@
+import asyncio
+import random
+import re
+import time
+from typing import Dict, List, Optional
+from app.core.blacklist import TokenBlacklist, token_blacklist
+from app.utils.metrics import metrics
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 多个进程中同一时间只有一个执行维护
+LOCK_KEY = "maintenance:redis:lock"
+
+
+# 无法归类的键(没有冒号、前缀不规范或前缀数超过上限)统一计入该前缀，指标名的数量保持有界
+OTHER_PREFIX = "other"
+_PREFIX = re.compile(r"[A-Za-z0-9_\-]{1,32}:")
+
+
+def key_prefix(key: str) -> str:
+    """
+    键前缀：第一个冒号及之前的部分；没有冒号或前缀不规范(超过32个字符、含特殊字符)时为 other
+    @param: key 键
+    @return: str 前缀
+    """
+    match = _PREFIX.match(key)
+    return match.group(0) if match else OTHER_PREFIX
+
+
+class PrefixStats:
+    """
+    单个前缀的统计：键数量和抽样的内存
+    """
+    __slots__ = ("keys", "samples")
+
+    def __init__(self):
+        self.keys = 0
+        self.samples: List[str] = []
+
+    def add(self, key: str, sample_size: int) -> None:
+        """
+        计数并按蓄水池抽样保留部分键，用于估算内存
+        """
+        self.keys += 1
+        if len(self.samples) < sample_size:
+            self.samples.append(key)
+        else:
+            index = random.randrange(self.keys)
+            if index < sample_size:
+                self.samples[index] = key
+
+
+class RedisMaintenance:
+    """
+    Redis 维护任务
+    - 用 SCAN 增量遍历键，按前缀统计键数量，抽样 MEMORY USAGE 估算内存，写入指标和日志
+    - 清理令牌黑名单分桶中的过期成员
+    后台任务按固定间隔执行，多个进程通过 Redis 锁保证同一时间只有一个执行
+    """
+    def __init__(self, blacklist: TokenBlacklist = token_blacklist):
+        self.redis = RedisClient()
+        self.blacklist = blacklist
+        self.last_report: Dict[str, Dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def scan_prefixes(self, scan_count: int, max_keys: int, sample_size: int,
+                            max_prefixes: int = 50) -> Dict[str, Dict[str, float]]:
+        """
+        统计各前缀的键数量和内存
+        遍历超过 max_keys 时停止，并按 DBSIZE 等比例估算
+        @param: scan_count 每次 SCAN 的建议数量
+        @param: max_keys 最多遍历的键数
+        @param: sample_size 每个前缀抽样计算内存的键数
+        @param: max_prefixes 最多统计的前缀数(不含 other)，之后出现的新前缀计入 other
+        @return: Dict[str, Dict[str, float]] 前缀 -> {keys, memory_bytes}
+        """
+        stats: Dict[str, PrefixStats] = {}
+        named = 0
+        scanned = 0
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis.scan(cursor, count=scan_count)
+            for key in keys:
+                prefix = key_prefix(key)
+                entry = stats.get(prefix)
+                if entry is None:
+                    if prefix != OTHER_PREFIX:
+                        if named >= max_prefixes:
+                            prefix = OTHER_PREFIX
+                        else:
+                            named += 1
+                    entry = stats.get(prefix)
+                    if entry is None:
+                        entry = stats[prefix] = PrefixStats()
+                entry.add(key, sample_size)
+            scanned += len(keys)
+            if cursor == 0 or scanned >= max_keys:
+                break
+
+        scale = 1.0
+        if cursor != 0:
+            total = await self.redis.dbsize()
+            if total and scanned:
+                scale = total / scanned
+
+        report = {}
+        for prefix, entry in stats.items():
+            sizes = [size for size in [await self.redis.memory_usage(key) for key in entry.samples] if size is not None]
+            keys = entry.keys * scale
+            report[prefix] = {
+                "keys": round(keys),
+                "memory_bytes": round(sum(sizes) / len(sizes) * keys) if sizes else None,
+            }
+        return report
+
+    async def run_once(self, scan_count: int, max_keys: int, sample_size: int,
+                       max_prefixes: int = 50) -> Dict[str, Dict[str, float]]:
+        """
+        执行一次维护
+        @return: Dict[str, Dict[str, float]] 各前缀统计
+        """
+        start = time.perf_counter()
+        purged = await self.blacklist.purge_expired()
+        report = await self.scan_prefixes(scan_count, max_keys, sample_size, max_prefixes)
+        for prefix, item in report.items():
+            name = prefix.rstrip(":")
+            metrics.set_gauge(f"redis.keys.{name}", item["keys"])
+            if item["memory_bytes"] is not None:
+                metrics.set_gauge(f"redis.memory_bytes.{name}", item["memory_bytes"])
+        metrics.inc("redis.blacklist_purged", purged)
+        self.last_report = report
+        summary = ", ".join(
+            f"{prefix} {item['keys']}键/{item['memory_bytes'] if item['memory_bytes'] is not None else '?'}B"
+            for prefix, item in sorted(report.items(), key=lambda pair: -pair[1]["keys"])
+        )
+        logger.info(
+            f"Redis维护完成，耗时 {(time.perf_counter() - start) * 1000:.1f}ms，"
+            f"清理黑名单过期成员 {purged} 个；{summary or '无键'}"
+        )
+        return report
+
+    async def _run(self, interval: float, scan_count: int, max_keys: int, sample_size: int,
+                   max_prefixes: int) -> None:
+        while True:
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+            try:
+                # 锁在下一次执行前过期，持有锁的进程退出后其他进程可以接替
+                if await self.redis.set(LOCK_KEY, "1", expire=max(1, int(interval * 0.9)), nx=True):
+                    await self.run_once(scan_count, max_keys, sample_size, max_prefixes)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis维护失败: {str(e)}")
+
+    def start(self, interval: float, scan_count: int, max_keys: int, sample_size: int,
+              max_prefixes: int = 50) -> None:
+        """
+        启动后台维护任务，需在 Redis 初始化后调用，重复调用无副作用
+        @param: interval 执行间隔(秒)
+        @param: scan_count 每次 SCAN 的建议数量
+        @param: max_keys 最多遍历的键数
+        @param: sample_size 每个前缀抽样计算内存的键数
+        @param: max_prefixes 最多统计的前缀数，超出的计入 other
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(interval, scan_count, max_keys, sample_size, max_prefixes)
+            )
+
+    async def stop(self) -> None:
+        """
+        停止后台维护任务
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 创建 Redis 维护实例
+redis_maintenance = RedisMaintenance()
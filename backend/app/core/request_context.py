@@ -0,0 +1,48 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# 当前请求的 ASGI scope，路由匹配后 scope 中会写入 endpoint
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+# 当前请求的截止时间(time.monotonic)，由准入控制设置，数据库和 Redis 调用都不会超过它
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# 当前请求的数据库截止时间(time.monotonic)，为空表示不限制
+db_deadline: ContextVar[Optional[float]] = ContextVar("db_deadline", default=None)
+
+
+def route_label() -> str:
+    """
+    当前请求的路由描述，用于日志
+    @return: str 如 "GET /api/v1/users/1 (get_user)"，不在请求中时为 "-"
+    """
+    scope = request_scope.get()
+    if scope is None:
+        return "-"
+    label = f"{scope.get('method', '')} {scope.get('path', '')}"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        label += f" ({getattr(endpoint, '__name__', endpoint)})"
+    return label
+
+
+def _remaining(*deadlines: Optional[float]) -> Optional[float]:
+    deadlines = [d for d in deadlines if d is not None]
+    if not deadlines:
+        return None
+    return min(deadlines) - time.monotonic()
+
+
+def request_time_remaining() -> Optional[float]:
+    """
+    当前请求的剩余时间
+    @return: Optional[float] 剩余秒数，不在请求中或未设置截止时间时为None
+    """
+    return _remaining(request_deadline.get())
+
+
+def db_time_remaining() -> Optional[float]:
+    """
+    当前请求剩余的数据库时间，取数据库截止时间和请求截止时间中较早的一个
+    @return: Optional[float] 剩余秒数，不在请求中或未设置截止时间时为None
+    """
+    return _remaining(db_deadline.get(), request_deadline.get())
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.response import ResponseModel
+from app.schemas.user import UserResponse
+from app.utils.redis import RedisClient
+from app.utils.cache import default_cache
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+
+class CachedUserResponse:
+    """
+    已序列化的用户响应
+    """
+    __slots__ = ("user_id", "username", "etag", "body", "expires_at")
+
+    def __init__(self, user_id: int, username: str, etag: str, body: bytes, expires_at: float):
+        self.user_id = user_id
+        self.username = username
+        self.etag = etag
+        self.body = body
+        self.expires_at = expires_at
+
+
+def make_user_etag(user_id: int, body: bytes) -> str:
+    """
+    根据序列化后的响应体生成ETag
+    响应中包含角色编码，角色分配或编码变更不会修改 updated_at，因此按内容摘要生成
+    @param: user_id 用户ID
+    @param: body 序列化后的响应体
+    @return: str ETag
+    """
+    return f'"u{user_id}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断 If-None-Match 请求头是否命中ETag
+    @param: if_none_match If-None-Match 请求头
+    @param: etag 当前ETag
+    @return: bool 是否命中
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+async def render_user_response(user: User) -> bytes:
+    """
+    序列化用户响应，格式与 ResponseModel[UserResponse] 一致
+    @param: user 用户对象
+    @return: bytes JSON响应体
+    """
+    roles = await user.roles.all().values_list("code", flat=True)
+    data = UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        is_active=user.is_active,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+        roles=list(roles)
+    )
+    content = jsonable_encoder(ResponseModel(data=data))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class UserResponseCache:
+    """
+    用户响应缓存
+    进程内缓存(L1)按用户ID保存序列化后的响应，Redis(L2)在多个进程间共享
+    只缓存响应体，不用于认证：用户是否存在、是否禁用由调用方每次确认，
+    失效失败或其他进程的 L1 未过期时最多返回 LOCAL_TTL/DEFAULT_TTL 秒前的资料
+    失效时一并失效批量用户查询的跨请求缓存(user:{id} 标签)
+    """
+    def __init__(self):
+        """
+        初始化用户响应缓存
+        """
+        self.redis = RedisClient()
+        self.prefix = "user_response:"
+        self.enabled = settings.CACHE.ENABLED
+        self.ttl = settings.CACHE.DEFAULT_TTL
+        self.local_ttl = settings.CACHE.LOCAL_TTL
+        self.local_max_entries = settings.CACHE.LOCAL_MAX_ENTRIES
+        self._local: "OrderedDict[int, CachedUserResponse]" = OrderedDict()
+
+    def _get_local(self, user_id: int) -> Optional[CachedUserResponse]:
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._drop_local(user_id)
+            return None
+        self._local.move_to_end(user_id)
+        return entry
+
+    def _put_local(self, entry: CachedUserResponse) -> None:
+        self._local[entry.user_id] = entry
+        self._local.move_to_end(entry.user_id)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    def _drop_local(self, user_id: int) -> None:
+        self._local.pop(user_id, None)
+
+    async def get(self, user_id: int) -> Optional[CachedUserResponse]:
+        """
+        按用户ID获取缓存的响应
+        @param: user_id 用户ID
+        @return: Optional[CachedUserResponse] 缓存的响应
+        """
+        if not self.enabled:
+            return None
+        entry = self._get_local(user_id)
+        if entry is not None:
+            return entry
+        raw = await self.redis.get(f"{self.prefix}{user_id}")
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw)
+            entry = CachedUserResponse(
+                user_id=user_id,
+                username=data["username"],
+                etag=data["etag"],
+                body=data["body"].encode("utf-8"),
+                expires_at=time.monotonic() + self.local_ttl
+            )
+        except (ValueError, KeyError) as e:
+            logger.warning(f"用户响应缓存数据无效: {str(e)}")
+            return None
+        self._put_local(entry)
+        return entry
+
+    async def set(self, user: User, body: bytes) -> CachedUserResponse:
+        """
+        缓存用户响应
+        @param: user 用户对象
+        @param: body 序列化后的响应体
+        @return: CachedUserResponse 缓存的响应
+        """
+        entry = CachedUserResponse(
+            user_id=user.id,
+            username=user.username,
+            etag=make_user_etag(user.id, body),
+            body=body,
+            expires_at=time.monotonic() + self.local_ttl
+        )
+        if not self.enabled:
+            return entry
+        self._put_local(entry)
+        payload = json.dumps({"username": entry.username, "etag": entry.etag, "body": body.decode("utf-8")})
+        await self.redis.set(f"{self.prefix}{user.id}", payload, expire=self.ttl)
+        return entry
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        使用户响应缓存失效
+        @param: user_id 用户ID
+        """
+        self._drop_local(user_id)
+        await self.redis.delete(f"{self.prefix}{user_id}")
+        if settings.CACHE.LOADER_TTL > 0:
+            await default_cache.invalidate_tags(f"user:{user_id}")
+        logger.debug(f"用户响应缓存已失效: {user_id}")
+
+    async def invalidate_many(self, user_ids: Iterable[int]) -> None:
+        """
+        批量使用户响应缓存失效，一次Redis调用完成
+        @param: user_ids 用户ID列表
+        """
+        user_ids = set(user_ids)
+        keys = []
+        for user_id in user_ids:
+            self._drop_local(user_id)
+            keys.append(f"{self.prefix}{user_id}")
+        if keys:
+            await self.redis.delete(*keys)
+            if settings.CACHE.LOADER_TTL > 0:
+                await default_cache.invalidate_tags(*(f"user:{user_id}" for user_id in user_ids))
+            logger.debug(f"用户响应缓存已失效: {len(keys)} 个用户")
+
+
+# 创建用户响应缓存实例
+user_response_cache = UserResponseCache()
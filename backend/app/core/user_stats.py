@@ -0,0 +1,173 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+from tortoise.functions import Count
+from app.models.user import User
+from app.models.role import Role
+from app.utils.cache import SingleFlight
+from app.utils.metrics import metrics
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 统计哈希：total、active、role:<角色编码>、reconciled_at
+STATS_KEY = "stats:users"
+# 多个进程中同一时间只有一个执行定期校正
+LOCK_KEY = "stats:users:lock"
+ROLE_FIELD_PREFIX = "role:"
+
+
+class UserStats:
+    """
+    仪表盘用户统计
+    统计保存在 Redis 哈希中，读取为一次 HGETALL，不扫描用户表：
+    - 注册、激活、禁用时 HINCRBY 增量更新用户总数和激活数
+    - 分配、移除角色及角色增删改时，只重新统计受影响角色的用户数(按中间表计数)
+    - 后台任务定期用 SQL 聚合重算全部统计并原子替换，校正增量更新期间丢失或重复的计数
+    哈希缺少 reconciled_at(首次启动、Redis 数据丢失)时，读取会先执行一次校正
+    """
+    def __init__(self):
+        self.redis = RedisClient()
+        self._reconciles = SingleFlight("user_stats.reconcile")
+        self._task: Optional[asyncio.Task] = None
+
+    async def user_created(self, active: bool = True, count: int = 1) -> None:
+        """
+        新增用户
+        @param: active 用户是否激活
+        @param: count 新增的用户数
+        """
+        await self.redis.hincrby(STATS_KEY, "total", count)
+        if active:
+            await self.redis.hincrby(STATS_KEY, "active", count)
+
+    async def active_changed(self, active: bool) -> None:
+        """
+        用户激活状态变化，状态未变化时不应调用
+        @param: active 变化后是否激活
+        """
+        await self.redis.hincrby(STATS_KEY, "active", 1 if active else -1)
+
+    async def refresh_roles(self, role_ids: Sequence[int]) -> None:
+        """
+        重新统计指定角色的用户数
+        @param: role_ids 角色ID列表
+        """
+        if not role_ids:
+            return
+        try:
+            rows = await Role.filter(id__in=list(role_ids)).annotate(
+                user_count=Count("users")
+            ).values("code", "user_count")
+        except Exception as e:
+            logger.warning(f"统计角色用户数失败: {str(e)}")
+            return
+        if rows:
+            await self.redis.hset(STATS_KEY, {f"{ROLE_FIELD_PREFIX}{row['code']}": row["user_count"] for row in rows})
+
+    async def remove_role(self, code: str) -> None:
+        """
+        删除角色的统计(角色删除或编码变更后)
+        @param: code 角色编码
+        """
+        await self.redis.hdel(STATS_KEY, f"{ROLE_FIELD_PREFIX}{code}")
+
+    async def reconcile(self) -> Dict[str, str]:
+        """
+        用 SQL 聚合重算全部统计，写入临时键后 RENAME 原子替换
+        @return: Dict[str, str] 与 Redis 哈希格式一致的统计
+        """
+        start = time.perf_counter()
+        total = await User.all().count()
+        active = await User.filter(is_active=True).count()
+        roles = await Role.annotate(user_count=Count("users")).values("code", "user_count")
+        fields = {"total": str(total), "active": str(active), "reconciled_at": repr(time.time())}
+        for row in roles:
+            fields[f"{ROLE_FIELD_PREFIX}{row['code']}"] = str(row["user_count"])
+
+        try:
+            previous = await self.redis.hgetall(STATS_KEY)
+        except Exception:
+            previous = {}
+        temp_key = f"{STATS_KEY}:tmp:{uuid.uuid4().hex}"
+        if await self.redis.hset(temp_key, fields):
+            await self.redis.rename(temp_key, STATS_KEY)
+
+        metrics.inc("user_stats.reconciles")
+        if "reconciled_at" in previous:
+            drift = sum(
+                abs(int(fields.get(name, 0)) - int(previous.get(name, 0)))
+                for name in set(fields) | set(previous)
+                if name != "reconciled_at"
+            )
+            if drift:
+                metrics.inc("user_stats.drift", drift)
+                logger.warning(f"用户统计校正: 增量计数偏差 {drift}")
+        logger.info(f"用户统计校正完成，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        return fields
+
+    async def get(self) -> Dict[str, Any]:
+        """
+        读取统计
+        @return: Dict[str, Any] total、active、inactive、roles(角色编码 -> 用户数)、reconciled_at
+        """
+        try:
+            fields = await self.redis.hgetall(STATS_KEY)
+        except Exception as e:
+            logger.warning(f"读取用户统计失败: {str(e)}")
+            fields = {}
+        if "reconciled_at" not in fields:
+            # 并发读取共用一次校正
+            fields = await self._reconciles.do(STATS_KEY, self.reconcile)
+        total = int(fields.get("total", 0))
+        active = int(fields.get("active", 0))
+        return {
+            "total": total,
+            "active": active,
+            "inactive": max(0, total - active),
+            "roles": {
+                name[len(ROLE_FIELD_PREFIX):]: int(value)
+                for name, value in sorted(fields.items())
+                if name.startswith(ROLE_FIELD_PREFIX)
+            },
+            "reconciled_at": datetime.fromtimestamp(float(fields["reconciled_at"]), timezone.utc),
+        }
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+            try:
+                if await self.redis.set(LOCK_KEY, "1", expire=max(1, int(interval * 0.9)), nx=True):
+                    await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"用户统计校正失败: {str(e)}")
+
+    def start(self, interval: float) -> None:
+        """
+        启动定期校正任务，需在 Redis 和数据库初始化后调用，重复调用无副作用
+        @param: interval 校正间隔(秒)
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """
+        停止定期校正任务
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 创建用户统计实例
+user_stats = UserStats()
@@ -0,0 +1,93 @@
+import asyncio
+import importlib
+import time
+from typing import Dict, Iterator, Tuple
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from tortoise import connections
+from app.core.config import settings
+from app.core.deps import decode_token_subject
+from app.core.permission_registry import permission_registry
+from app.services.auth_service import AuthService
+from app.utils.executors import run_in_thread
+from app.utils.metrics import metrics
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+
+async def warm_db_pool() -> None:
+    """
+    预先建立连接池的最小连接数，并发执行 SELECT 1 让每个查询占用一个连接
+    """
+    for connection in connections.all():
+        count = settings.DB_POOL.MIN_SIZE if connection.capabilities.dialect == "postgres" else 1
+        await asyncio.gather(*(connection.execute_query("SELECT 1") for _ in range(max(1, count))))
+
+
+async def warm_redis_pool() -> None:
+    """
+    预先建立 Redis 连接
+    """
+    redis_client = RedisClient()
+    await asyncio.gather(*(redis_client.ping() for _ in range(settings.WARMUP.REDIS_CONNECTIONS)))
+
+
+def _permission_codes(dependant: Dependant) -> Iterator[Tuple[str, ...]]:
+    """
+    递归查找依赖树中 check_permissions 声明的权限编码
+    """
+    for dependency in dependant.dependencies:
+        codes = getattr(dependency.call, "required_permissions", None)
+        if codes is not None:
+            yield codes
+        yield from _permission_codes(dependency)
+
+
+def compile_route_permissions(app: FastAPI) -> Dict[str, Tuple[str, ...]]:
+    """
+    编译路由权限表：预先计算每个路由所需的权限掩码，首个请求不再计算
+    @param: app FastAPI应用
+    @return: Dict[str, Tuple[str, ...]] 路由 -> 所需权限编码
+    """
+    table = {}
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for codes in _permission_codes(route.dependant):
+            if permission_registry.required_mask(codes) is None:
+                logger.warning(f"路由 {route.path} 需要未定义的权限: {codes}")
+            table[f"{','.join(sorted(route.methods))} {route.path}"] = codes
+    return table
+
+
+def warm_jwt() -> None:
+    """
+    签发并解码一个令牌：加载 jose 及其签名后端，准备密钥
+    """
+    decode_token_subject(AuthService.create_access_token({"sub": "warmup"}))
+
+
+async def warm_workers() -> None:
+    """
+    在线程池中导入 bcrypt，创建工作线程
+    """
+    bcrypt = importlib.import_module("bcrypt")
+    await run_in_thread(bcrypt.gensalt, 4)
+
+
+async def warmup(app: FastAPI) -> None:
+    """
+    启动预热，完成后再报告就绪，部署后的首批请求与稳态耗时一致
+    权限注册表需已加载
+    @param: app FastAPI应用
+    """
+    start = time.perf_counter()
+    await asyncio.gather(warm_db_pool(), warm_redis_pool(), warm_workers())
+    route_permissions = compile_route_permissions(app)
+    warm_jwt()
+    elapsed = time.perf_counter() - start
+    metrics.set_gauge("startup.warmup_seconds", elapsed)
+    logger.info(f"启动预热完成，耗时 {elapsed * 1000:.1f}ms，编译 {len(route_permissions)} 个路由权限")
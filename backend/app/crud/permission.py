@@ -0,0 +1,84 @@
+from typing import List
+from tortoise.exceptions import IntegrityError
+from app.models.permission import Permission
+from app.core.exceptions import DatabaseTimeoutException, NotFoundException, ServerException, ValidationException
+from app.core.permission_registry import permission_registry
+from app.schemas.permission import PermissionCreate, PermissionUpdate
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+async def get_all_permissions() -> List[Permission]:
+    """
+    获取所有权限
+    @return: List[Permission] 权限列表
+    @exception: ServerException 服务器内部错误
+    """
+    try:
+        return await Permission.all().order_by("id")
+    except DatabaseTimeoutException:
+        raise
+    except Exception as e:
+        logger.error(f"获取权限列表失败: {str(e)}")
+        raise ServerException(detail="获取权限列表失败")
+
+async def get_permission_by_id(permission_id: int) -> Permission:
+    """
+    根据ID获取权限
+    @param: permission_id 权限ID
+    @return: Permission 权限对象
+    @exception: NotFoundException 权限不存在异常
+    """
+    permission = await Permission.get_or_none(id=permission_id)
+    if not permission:
+        raise NotFoundException(detail="权限不存在")
+    return permission
+
+async def create_permission(permission_in: PermissionCreate) -> Permission:
+    """
+    创建权限
+    @param: permission_in 权限数据
+    @return: Permission 权限对象
+    @exception: ValidationException 权限编码已存在
+    """
+    try:
+        permission = await Permission.create(
+            name=permission_in.name,
+            code=permission_in.code,
+            description=permission_in.description
+        )
+    except IntegrityError:
+        raise ValidationException(message="权限编码已存在")
+    await permission_registry.bump()
+    return permission
+
+async def update_permission(permission_id: int, permission_in: PermissionUpdate) -> Permission:
+    """
+    更新权限，编码变更时重新加载权限注册表
+    @param: permission_id 权限ID
+    @param: permission_in 权限数据
+    @return: Permission 权限对象
+    @exception: NotFoundException 权限不存在异常
+    @exception: ValidationException 权限编码已存在
+    """
+    permission = await get_permission_by_id(permission_id)
+    changes = {k: v for k, v in permission_in.dict(exclude_unset=True).items() if v is not None}
+    code_changed = "code" in changes and changes["code"] != permission.code
+    permission.update_from_dict(changes)
+    try:
+        await permission.save()
+    except IntegrityError:
+        raise ValidationException(message="权限编码已存在")
+    if code_changed:
+        await permission_registry.bump()
+    return permission
+
+async def delete_permission(permission_id: int) -> None:
+    """
+    删除权限，中间表中的关联随外键级联删除，并重新加载权限注册表
+    @param: permission_id 权限ID
+    @exception: NotFoundException 权限不存在异常
+    """
+    permission = await get_permission_by_id(permission_id)
+    await permission.delete()
+    await permission_registry.bump()
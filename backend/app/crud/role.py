@@ -0,0 +1,303 @@
+from typing import List, Optional, Sequence, Type
+from pypika import Table
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import IntegrityError
+from tortoise.fields.relational import ManyToManyFieldInstance
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+from app.models.user import User
+from app.models.role import Role
+from app.models.permission import Permission
+from app.core.exceptions import DatabaseTimeoutException, NotFoundException, ServerException, ValidationException
+from app.core.permission_cache import permission_cache
+from app.core.permission_registry import permission_registry
+from app.core.user_cache import user_response_cache
+from app.core.user_stats import user_stats
+from app.schemas.role import RoleCreate, RoleUpdate
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 单条 INSERT 写入的最大关联行数
+LINK_BATCH_SIZE = 1000
+# 单次批量分配允许的最大组合数
+MAX_ASSIGNMENT_PAIRS = 100_000
+
+def _unique_ids(ids: Sequence[int]) -> List[int]:
+    """
+    去重并保持顺序
+    @param: ids ID列表
+    @return: List[int] 去重后的ID列表
+    """
+    return list(dict.fromkeys(ids))
+
+def _check_pairs(owner_ids: Sequence[int], target_ids: Sequence[int]) -> None:
+    """
+    检查批量分配的组合数
+    @param: owner_ids 关联发起方ID列表
+    @param: target_ids 关联目标ID列表
+    @exception: ValidationException 组合数超过上限
+    """
+    if len(owner_ids) * len(target_ids) > MAX_ASSIGNMENT_PAIRS:
+        raise ValidationException(message=f"单次最多分配 {MAX_ASSIGNMENT_PAIRS} 个关联")
+
+async def _ensure_exists(
+    model: Type[Model], ids: Sequence[int], label: str, connection: BaseDBAsyncClient
+) -> None:
+    """
+    检查ID是否全部存在
+    @param: model 模型类
+    @param: ids ID列表
+    @param: label 资源名称
+    @param: connection 数据库连接
+    @exception: NotFoundException 资源不存在异常
+    """
+    found = set(await model.filter(id__in=ids).using_db(connection).values_list("id", flat=True))
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise NotFoundException(message=f"{label}不存在", detail=",".join(map(str, missing)))
+
+async def link_many(
+    connection: BaseDBAsyncClient,
+    field: ManyToManyFieldInstance,
+    owner_ids: Sequence[int],
+    target_ids: Sequence[int]
+) -> int:
+    """
+    批量写入多对多关联
+    一次查询取出已存在的组合，剩余组合按批次用多行 INSERT 写入中间表；
+    中间表有唯一索引，并发写入相同组合时由 ON CONFLICT DO NOTHING(MySQL 为 INSERT IGNORE)忽略，
+    返回值取数据库报告的实际插入行数，被忽略的组合不计入
+    @param: connection 数据库连接
+    @param: field 多对多字段，如 User._meta.fields_map["roles"]
+    @param: owner_ids 字段所属模型的ID列表
+    @param: target_ids 关联模型的ID列表
+    @return: int 新增的关联数
+    """
+    if not owner_ids or not target_ids:
+        return 0
+    table = Table(field.through)
+    owner_key, target_key = field.backward_key, field.forward_key
+    query = connection.query_class.from_(table).select(table[owner_key], table[target_key]).where(
+        table[owner_key].isin(owner_ids) & table[target_key].isin(target_ids)
+    )
+    rows = await connection.execute_query_dict(str(query))
+    existing = {(row[owner_key], row[target_key]) for row in rows}
+    pairs = [(o, t) for o in owner_ids for t in target_ids if (o, t) not in existing]
+    inserted = 0
+    for start in range(0, len(pairs), LINK_BATCH_SIZE):
+        insert = connection.query_class.into(table).columns(owner_key, target_key).insert(
+            *pairs[start:start + LINK_BATCH_SIZE]
+        ).on_conflict().do_nothing()
+        if connection.capabilities.dialect == "postgres":
+            # asyncpg 只对带返回行的语句计数，用 RETURNING 取回实际插入的行
+            insert = insert.returning(table[owner_key])
+        affected, _ = await connection.execute_query(str(insert))
+        inserted += affected
+    return inserted
+
+async def unlink_many(
+    connection: BaseDBAsyncClient,
+    field: ManyToManyFieldInstance,
+    owner_ids: Sequence[int],
+    target_ids: Sequence[int]
+) -> int:
+    """
+    批量删除多对多关联，一条 DELETE 完成
+    @param: connection 数据库连接
+    @param: field 多对多字段
+    @param: owner_ids 字段所属模型的ID列表
+    @param: target_ids 关联模型的ID列表
+    @return: int 删除的关联数
+    """
+    if not owner_ids or not target_ids:
+        return 0
+    table = Table(field.through)
+    query = connection.query_class.from_(table).delete().where(
+        table[field.backward_key].isin(owner_ids) & table[field.forward_key].isin(target_ids)
+    )
+    affected, _ = await connection.execute_query(str(query))
+    return affected
+
+async def get_role_user_ids(role_ids: Sequence[int]) -> List[int]:
+    """
+    获取拥有指定角色的用户ID
+    @param: role_ids 角色ID列表
+    @return: List[int] 用户ID列表
+    """
+    return await User.filter(roles__id__in=role_ids).distinct().values_list("id", flat=True)
+
+async def invalidate_user_caches(user_ids: Sequence[int], responses: bool = True) -> None:
+    """
+    角色相关变更后使用户缓存失效
+    @param: user_ids 用户ID列表
+    @param: responses 是否同时失效用户响应缓存(响应中包含角色编码)
+    """
+    if not user_ids:
+        return
+    await permission_cache.invalidate(user_ids)
+    if responses:
+        await user_response_cache.invalidate_many(user_ids)
+
+async def get_all_roles() -> List[Role]:
+    """
+    获取所有角色
+    @return: List[Role] 角色列表
+    @exception: ServerException 服务器内部错误
+    """
+    try:
+        return await Role.all().order_by("id")
+    except DatabaseTimeoutException:
+        raise
+    except Exception as e:
+        logger.error(f"获取角色列表失败: {str(e)}")
+        raise ServerException(detail="获取角色列表失败")
+
+async def get_role_by_id(role_id: int) -> Role:
+    """
+    根据ID获取角色
+    @param: role_id 角色ID
+    @return: Role 角色对象
+    @exception: NotFoundException 角色不存在异常
+    """
+    role = await Role.get_or_none(id=role_id)
+    if not role:
+        raise NotFoundException(detail="角色不存在")
+    return role
+
+async def get_role_permission_codes(role_id: int) -> List[str]:
+    """
+    获取角色拥有的权限编码
+    @param: role_id 角色ID
+    @return: List[str] 权限编码列表
+    """
+    return await Permission.filter(roles__id=role_id).order_by("id").values_list("code", flat=True)
+
+async def create_role(role_in: RoleCreate) -> Role:
+    """
+    创建角色
+    @param: role_in 角色数据
+    @return: Role 角色对象
+    @exception: ValidationException 角色编码已存在
+    """
+    try:
+        role = await Role.create(name=role_in.name, code=role_in.code, description=role_in.description)
+    except IntegrityError:
+        raise ValidationException(message="角色编码已存在")
+    await user_stats.refresh_roles([role.id])
+    return role
+
+async def update_role(role_id: int, role_in: RoleUpdate) -> Role:
+    """
+    更新角色，编码变更时使相关用户的缓存失效并更新角色统计
+    @param: role_id 角色ID
+    @param: role_in 角色数据
+    @return: Role 角色对象
+    @exception: NotFoundException 角色不存在异常
+    @exception: ValidationException 角色编码已存在
+    """
+    role = await get_role_by_id(role_id)
+    changes = {k: v for k, v in role_in.dict(exclude_unset=True).items() if v is not None}
+    old_code = role.code
+    code_changed = "code" in changes and changes["code"] != old_code
+    role.update_from_dict(changes)
+    try:
+        await role.save()
+    except IntegrityError:
+        raise ValidationException(message="角色编码已存在")
+    if code_changed:
+        await invalidate_user_caches(await get_role_user_ids([role.id]))
+        await user_stats.remove_role(old_code)
+        await user_stats.refresh_roles([role.id])
+    return role
+
+async def delete_role(role_id: int) -> None:
+    """
+    删除角色，中间表中的关联随外键级联删除
+    @param: role_id 角色ID
+    @exception: NotFoundException 角色不存在异常
+    """
+    role = await get_role_by_id(role_id)
+    user_ids = await get_role_user_ids([role.id])
+    await role.delete()
+    await permission_registry.bump()
+    await invalidate_user_caches(user_ids)
+    await user_stats.remove_role(role.code)
+
+async def assign_roles_to_users(user_ids: Sequence[int], role_ids: Sequence[int]) -> int:
+    """
+    批量为用户分配角色(user_ids × role_ids)，在一个事务中完成
+    @param: user_ids 用户ID列表
+    @param: role_ids 角色ID列表
+    @return: int 新增的关联数
+    @exception: NotFoundException 用户或角色不存在异常
+    @exception: ValidationException 组合数超过上限
+    """
+    user_ids, role_ids = _unique_ids(user_ids), _unique_ids(role_ids)
+    _check_pairs(user_ids, role_ids)
+    async with in_transaction() as connection:
+        await _ensure_exists(User, user_ids, "用户", connection)
+        await _ensure_exists(Role, role_ids, "角色", connection)
+        affected = await link_many(connection, User._meta.fields_map["roles"], user_ids, role_ids)
+    if affected:
+        await invalidate_user_caches(user_ids)
+        await user_stats.refresh_roles(role_ids)
+    logger.info(f"批量分配角色: {len(user_ids)} 个用户, {len(role_ids)} 个角色, 新增 {affected} 个关联")
+    return affected
+
+async def unassign_roles_from_users(user_ids: Sequence[int], role_ids: Sequence[int]) -> int:
+    """
+    批量移除用户的角色(user_ids × role_ids)
+    @param: user_ids 用户ID列表
+    @param: role_ids 角色ID列表
+    @return: int 删除的关联数
+    @exception: ValidationException 组合数超过上限
+    """
+    user_ids, role_ids = _unique_ids(user_ids), _unique_ids(role_ids)
+    _check_pairs(user_ids, role_ids)
+    async with in_transaction() as connection:
+        affected = await unlink_many(connection, User._meta.fields_map["roles"], user_ids, role_ids)
+    if affected:
+        await invalidate_user_caches(user_ids)
+        await user_stats.refresh_roles(role_ids)
+    logger.info(f"批量移除角色: {len(user_ids)} 个用户, {len(role_ids)} 个角色, 删除 {affected} 个关联")
+    return affected
+
+async def assign_permissions_to_roles(role_ids: Sequence[int], permission_ids: Sequence[int]) -> int:
+    """
+    批量为角色分配权限(role_ids × permission_ids)，在一个事务中完成
+    @param: role_ids 角色ID列表
+    @param: permission_ids 权限ID列表
+    @return: int 新增的关联数
+    @exception: NotFoundException 角色或权限不存在异常
+    @exception: ValidationException 组合数超过上限
+    """
+    role_ids, permission_ids = _unique_ids(role_ids), _unique_ids(permission_ids)
+    _check_pairs(role_ids, permission_ids)
+    async with in_transaction() as connection:
+        await _ensure_exists(Role, role_ids, "角色", connection)
+        await _ensure_exists(Permission, permission_ids, "权限", connection)
+        affected = await link_many(connection, Role._meta.fields_map["permissions"], role_ids, permission_ids)
+    if affected:
+        # 角色掩码变化，递增注册表版本后所有用户权限缓存随之失效
+        await permission_registry.bump()
+    logger.info(f"批量分配权限: {len(role_ids)} 个角色, {len(permission_ids)} 个权限, 新增 {affected} 个关联")
+    return affected
+
+async def unassign_permissions_from_roles(role_ids: Sequence[int], permission_ids: Sequence[int]) -> int:
+    """
+    批量移除角色的权限(role_ids × permission_ids)
+    @param: role_ids 角色ID列表
+    @param: permission_ids 权限ID列表
+    @return: int 删除的关联数
+    @exception: ValidationException 组合数超过上限
+    """
+    role_ids, permission_ids = _unique_ids(role_ids), _unique_ids(permission_ids)
+    _check_pairs(role_ids, permission_ids)
+    async with in_transaction() as connection:
+        affected = await unlink_many(connection, Role._meta.fields_map["permissions"], role_ids, permission_ids)
+    if affected:
+        # 角色掩码变化，递增注册表版本后所有用户权限缓存随之失效
+        await permission_registry.bump()
+    logger.info(f"批量移除权限: {len(role_ids)} 个角色, {len(permission_ids)} 个权限, 删除 {affected} 个关联")
+    return affected
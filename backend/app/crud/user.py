@@ -1,53 +1,402 @@
-from typing import List, Optional
+import asyncio
+import copy
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar, Union
+from fastapi.encoders import jsonable_encoder
+from tortoise import Tortoise
 from app.models.user import User
-from app.core.exceptions import NotFoundException, ServerException
+from app.models.role import Role
+from app.core.config import settings
+from app.core.exceptions import DatabaseTimeoutException, NotFoundException, ServerException
+from app.core.user_cache import user_response_cache
+from app.core.user_stats import user_stats
+from app.core.request_context import db_deadline, db_time_remaining, request_deadline
+from app.schemas.user import UserResponse
+from app.utils.cache import SingleFlight, default_cache
+from app.utils.dataloader import DataLoader, request_loader
+from app.utils.executors import run_in_thread
+from app.utils.export import CsvEncoder, ParquetEncoder
+from app.utils.metrics import metrics
 from app.utils.log_server import logServer
 
 logger = logServer().run()
 
+T = TypeVar("T")
+
+# 同一进程内并发的相同查询共用一次数据库访问(如同一令牌并行请求多个接口)
+user_lookups = SingleFlight("users.lookup")
+admin_checks = SingleFlight("users.admin_check")
+
+async def _coalesce(flight: SingleFlight, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    合并并发的相同查询
+    共用的查询不继承发起方的截止时间，否则发起方剩余时间不足会让所有等待方一起超时；
+    每个等待方按自己剩余的数据库时间等待，超时只影响自己，查询继续供其他等待方使用
+    @param: flight 请求合并
+    @param: key 合并键
+    @param: func 无参数的查询函数
+    @return: T 查询结果
+    @exception: DatabaseTimeoutException 当前请求的数据库时间已用尽
+    """
+    async def load() -> T:
+        # 在共用查询自己的任务上下文中清除，不影响调用方
+        request_deadline.set(None)
+        db_deadline.set(None)
+        return await func()
+
+    remaining = db_time_remaining()
+    if remaining is not None and remaining <= 0:
+        metrics.inc("db.deadline_exceeded")
+        raise DatabaseTimeoutException(detail="请求的数据库时间已用尽")
+    try:
+        return await asyncio.wait_for(flight.do(key, load), remaining)
+    except asyncio.TimeoutError:
+        metrics.inc("db.deadline_exceeded")
+        raise DatabaseTimeoutException(detail=f"等待合并的查询超过 {remaining:.3f} 秒")
+
+async def find_user(username: str) -> Optional[User]:
+    """
+    按用户名查询用户，并发的相同查询合并为一次
+    每个调用方拿到独立的模型副本，修改不会影响其他请求
+    @param: username 用户名
+    @return: Optional[User] 用户对象
+    @exception: DatabaseTimeoutException 当前请求的数据库时间已用尽
+    """
+    user = await _coalesce(user_lookups, username, lambda: User.get_or_none(username=username))
+    return copy.copy(user) if user is not None else None
+
+async def is_admin_user(user_id: int) -> bool:
+    """
+    用户是否拥有管理员角色，并发的相同查询合并为一次
+    @param: user_id 用户ID
+    @return: bool 是否为管理员
+    @exception: DatabaseTimeoutException 当前请求的数据库时间已用尽
+    """
+    return await _coalesce(
+        admin_checks, user_id, lambda: User.filter(id=user_id, roles__code="admin").exists()
+    )
+
 async def get_user_by_id(user_id: int) -> Optional[User]:
     """
     根据ID获取用户
     @param: user_id 用户ID
     @return: Optional[User] 用户对象或None
     @exception: NotFoundException 用户不存在异常
+    @exception: DatabaseTimeoutException 数据库查询超时
     @exception: ServerException 服务器内部错误
     """
     try:
-        user = await User.get_or_none(id=user_id)
+        # 同一请求内的查询合并为一次 IN 查询
+        user = await user_loader().load(user_id)
         if not user:
             raise NotFoundException(detail="用户不存在")
         return user
-    except NotFoundException:
+    except (NotFoundException, DatabaseTimeoutException):
         raise
     except Exception as e:
         logger.error(f"获取用户信息失败: {str(e)}")
         raise ServerException(detail="获取用户信息失败")
 
+async def load_users(user_ids: List[int]) -> Dict[int, User]:
+    """
+    批量查询用户，一次 WHERE id IN (...) 查询
+    @param: user_ids 用户ID列表
+    @return: Dict[int, User] 用户ID -> 用户对象，不存在的ID不在结果中
+    """
+    return {user.id: user for user in await User.filter(id__in=user_ids)}
+
+def user_loader() -> DataLoader[int, User]:
+    """
+    当前请求的用户 loader，返回模型对象，不跨请求缓存
+    @return: DataLoader[int, User]
+    """
+    return request_loader("users", lambda: DataLoader(load_users, name="loader.users"))
+
+async def load_user_summaries(user_ids: List[int]) -> Dict[int, dict]:
+    """
+    批量查询用户及其角色编码，共两次查询，结果格式与 UserResponse 一致
+    @param: user_ids 用户ID列表
+    @return: Dict[int, dict] 用户ID -> 可JSON序列化的用户信息
+    """
+    users = await load_users(user_ids)
+    if not users:
+        return {}
+    roles: Dict[int, List[str]] = {user_id: [] for user_id in users}
+    for row in await Role.filter(users__id__in=list(users)).values("code", user_id="users__id"):
+        roles[row["user_id"]].append(row["code"])
+    return {
+        user_id: jsonable_encoder(UserResponse(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            roles=roles[user_id]
+        ))
+        for user_id, user in users.items()
+    }
+
+def user_summary_loader() -> DataLoader[int, dict]:
+    """
+    当前请求的用户信息 loader
+    CACHE_LOADER_TTL 大于0时跨请求缓存，按 user:{id} 标签随用户响应缓存一起失效
+    @return: DataLoader[int, dict]
+    """
+    ttl = settings.CACHE.LOADER_TTL
+    return request_loader("user_summaries", lambda: DataLoader(
+        load_user_summaries,
+        cache=default_cache if ttl > 0 else None,
+        cache_key=lambda user_id: f"user_summary:{user_id}",
+        cache_tags=lambda user_id: (f"user:{user_id}",),
+        ttl=ttl,
+        name="loader.user_summaries",
+    ))
+
+async def get_users_by_ids(user_ids: Sequence[int]) -> List[dict]:
+    """
+    批量获取用户信息
+    @param: user_ids 用户ID列表
+    @return: List[dict] 按请求顺序排列的用户信息，不存在的用户和重复的ID跳过
+    @exception: DatabaseTimeoutException 数据库查询超时
+    @exception: ServerException 服务器内部错误
+    """
+    try:
+        unique_ids = list(dict.fromkeys(user_ids))
+        summaries = await user_summary_loader().load_many(unique_ids)
+        return [summary for summary in summaries if summary is not None]
+    except DatabaseTimeoutException:
+        raise
+    except Exception as e:
+        logger.error(f"批量获取用户信息失败: {str(e)}")
+        raise ServerException(detail="批量获取用户信息失败")
+
 async def get_all_users() -> List[User]:
     """
     获取所有用户列表
     @return: List[User] 用户列表
+    @exception: DatabaseTimeoutException 数据库查询超时
     @exception: ServerException 服务器内部错误
     """
     try:
         return await User.all()
+    except DatabaseTimeoutException:
+        raise
     except Exception as e:
         logger.error(f"获取用户列表失败: {str(e)}")
         raise ServerException(detail="获取用户列表失败")
 
+# 支持搜索的字段
+SEARCH_FIELDS = ("username", "email", "full_name")
+# 搜索结果返回的列
+SEARCH_COLUMNS = ("id", "username", "email", "full_name", "is_active")
+# LIKE 转义字符，不用反斜杠以兼容 MySQL 的字符串转义
+LIKE_ESCAPE = "!"
+
+def _escape_like(value: str) -> str:
+    """
+    转义 LIKE 通配符
+    @param: value 原始字符串
+    @return: str 转义后的字符串
+    """
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+def _build_search_sql(
+    dialect: str,
+    query: str,
+    fields: Sequence[str],
+    prefix: bool,
+    limit: int,
+    after_id: Optional[int]
+) -> Tuple[str, list]:
+    """
+    生成用户搜索SQL
+    条件写成 lower(列) 的形式以命中表达式索引：PostgreSQL 前缀匹配走 text_pattern_ops 索引，
+    包含匹配走 pg_trgm 索引；SQLite 前缀匹配改写成范围查询以使用表达式索引，包含匹配退化为普通 LIKE。
+    SQLite 的 lower() 只转换 ASCII 字母，搜索词也只转换 ASCII 字母，非 ASCII 字符区分大小写
+    @param: dialect 数据库方言
+    @param: query 搜索词
+    @param: fields 搜索字段
+    @param: prefix 是否前缀匹配
+    @param: limit 返回条数
+    @param: after_id 上一页最后一条记录的ID
+    @return: Tuple[str, list] (SQL, 参数)
+    """
+    values = []
+
+    def param(value) -> str:
+        values.append(value)
+        if dialect == "postgres":
+            return f"${len(values)}"
+        if dialect == "mysql":
+            return "%s"
+        return "?"
+
+    if dialect == "sqlite":
+        needle = "".join(char.lower() if char.isascii() else char for char in query)
+    else:
+        needle = query.lower()
+    conditions = []
+    for field in fields:
+        if prefix and dialect == "sqlite":
+            conditions.append(f"(lower({field}) >= {param(needle)} AND lower({field}) < {param(needle + chr(0x10FFFF))})")
+        else:
+            pattern = _escape_like(needle) + "%"
+            if not prefix:
+                pattern = "%" + pattern
+            conditions.append(f"lower({field}) LIKE {param(pattern)} ESCAPE '{LIKE_ESCAPE}'")
+
+    where = "(" + " OR ".join(conditions) + ")"
+    if after_id is not None:
+        where += f" AND id > {param(after_id)}"
+    sql = (
+        f"SELECT {', '.join(SEARCH_COLUMNS)} FROM {User._meta.db_table} "
+        f"WHERE {where} ORDER BY id LIMIT {param(limit)}"
+    )
+    return sql, values
+
+async def search_users(
+    query: str,
+    fields: Sequence[str] = SEARCH_FIELDS,
+    prefix: bool = True,
+    limit: int = 20,
+    after_id: Optional[int] = None
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    按用户名、邮箱、全名搜索用户(不区分大小写)，按ID做游标分页，只查询需要的列
+    @param: query 搜索词
+    @param: fields 搜索字段
+    @param: prefix 是否前缀匹配，否则为包含匹配
+    @param: limit 每页条数
+    @param: after_id 上一页最后一条记录的ID
+    @return: Tuple[List[dict], Optional[int]] (用户列表, 下一页游标)
+    @exception: DatabaseTimeoutException 数据库查询超时
+    @exception: ServerException 服务器内部错误
+    """
+    try:
+        connection = Tortoise.get_connection(User._meta.default_connection)
+        # 多取一条用于判断是否还有下一页
+        sql, values = _build_search_sql(
+            connection.capabilities.dialect, query, fields, prefix, limit + 1, after_id
+        )
+        rows = await connection.execute_query_dict(sql, values)
+    except DatabaseTimeoutException:
+        raise
+    except Exception as e:
+        logger.error(f"搜索用户失败: {str(e)}")
+        raise ServerException(detail="搜索用户失败")
+    next_after_id = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after_id = rows[-1]["id"]
+    for row in rows:
+        row["is_active"] = bool(row["is_active"])
+    return rows, next_after_id
+
+# 可导出的列及其类型
+EXPORT_COLUMNS = {
+    "id": "int",
+    "username": "str",
+    "email": "str",
+    "full_name": "str",
+    "is_active": "bool",
+    "is_superuser": "bool",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+}
+# 导出时每次查询的行数
+EXPORT_CHUNK_SIZE = 5000
+
+async def iter_user_rows(
+    columns: Sequence[str],
+    is_active: Optional[bool] = None,
+    role: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[List[Tuple[Any, ...]]]:
+    """
+    按ID顺序分批读取用户，用于导出
+    每批一次按主键游标(id > 上一批最后的ID)的查询，只取需要的列，内存占用与总行数无关；
+    不在长事务中持有数据库游标，导出期间不占用连接
+    @param: columns 导出的列，取自 EXPORT_COLUMNS
+    @param: is_active 按激活状态过滤
+    @param: role 按角色编码过滤
+    @param: created_after 创建时间下限(含)
+    @param: created_before 创建时间上限(不含)
+    @param: chunk_size 每批行数
+    @return: AsyncIterator[List[Tuple[Any, ...]]] 每批行，列顺序与 columns 一致
+    """
+    filters = {}
+    if is_active is not None:
+        filters["is_active"] = is_active
+    if role is not None:
+        filters["roles__code"] = role
+    if created_after is not None:
+        filters["created_at__gte"] = created_after
+    if created_before is not None:
+        filters["created_at__lt"] = created_before
+    # 第一列始终为ID，用于游标
+    fields = ["id", *columns]
+    last_id = 0
+    while True:
+        rows = await User.filter(id__gt=last_id, **filters).order_by("id").limit(chunk_size).values_list(*fields)
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < chunk_size:
+            return
+
+async def export_users(
+    encoder: Union[CsvEncoder, ParquetEncoder],
+    **filters: Any
+) -> AsyncIterator[bytes]:
+    """
+    流式导出用户，每读取一批即编码输出，用作 StreamingResponse 的响应体
+    导出耗时与行数相关，不受请求截止时间限制，每次查询仍受数据库语句超时限制
+    编码(特别是 Parquet 的列转换和压缩)在线程池中执行，不阻塞事件循环
+    @param: encoder 编码器，列与 encoder.columns 一致
+    @param: filters 过滤条件，见 iter_user_rows
+    @return: AsyncIterator[bytes] 编码后的数据
+    """
+    request_deadline.set(None)
+    db_deadline.set(None)
+    start = time.perf_counter()
+    total = 0
+    try:
+        async for rows in iter_user_rows(encoder.columns, **filters):
+            total += len(rows)
+            data = await run_in_thread(encoder.encode, rows)
+            if data:
+                yield data
+        yield await run_in_thread(encoder.finish)
+    except Exception as e:
+        # 响应头已发出，只能中断响应
+        logger.error(f"导出用户失败: 已导出 {total} 行, {str(e)}")
+        raise
+    metrics.inc("export.users.rows", total)
+    logger.info(f"导出用户完成: {total} 行, 耗时 {time.perf_counter() - start:.2f}s")
+
 async def activate_user(user_id: int) -> None:
     """
     激活用户
     @param: user_id 用户ID
     @exception: NotFoundException 用户不存在异常
+    @exception: DatabaseTimeoutException 数据库查询超时
     @exception: ServerException 服务器内部错误
     """
     try:
         user = await get_user_by_id(user_id)
+        changed = not user.is_active
         user.is_active = True
         await user.save()
-    except NotFoundException:
+        await user_response_cache.invalidate(user.id)
+        if changed:
+            await user_stats.active_changed(True)
+    except (NotFoundException, DatabaseTimeoutException):
         raise
     except Exception as e:
         logger.error(f"激活用户失败: {str(e)}")
@@ -58,13 +407,18 @@ async def deactivate_user(user_id: int) -> None:
     禁用用户
     @param: user_id 用户ID
     @exception: NotFoundException 用户不存在异常
+    @exception: DatabaseTimeoutException 数据库查询超时
     @exception: ServerException 服务器内部错误
     """
     try:
         user = await get_user_by_id(user_id)
+        changed = user.is_active
         user.is_active = False
         await user.save()
-    except NotFoundException:
+        await user_response_cache.invalidate(user.id)
+        if changed:
+            await user_stats.active_changed(False)
+    except (NotFoundException, DatabaseTimeoutException):
         raise
     except Exception as e:
         logger.error(f"禁用用户失败: {str(e)}")
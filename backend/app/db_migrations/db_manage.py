@@ -1,11 +1,15 @@
 import asyncio
 import bcrypt
 from tortoise import Tortoise
+from tortoise.transactions import in_transaction
 from app.core.config import settings
 from app.models.user import User
 from app.models.role import Role
 from app.models.permission import Permission
 from app.tortoise_config import TORTOISE_ORM
+from app.crud.role import link_many
+from app.db_migrations.user_search_indexes import upgrade as create_search_indexes
+from app.db_migrations.rbac_relations import ensure_relation_indexes
 
 async def init_db():
     """
@@ -15,6 +19,8 @@ async def init_db():
     """
     await Tortoise.init(config=TORTOISE_ORM)
     await Tortoise.generate_schemas()
+    await create_search_indexes(Tortoise.get_connection("default"))
+    await ensure_relation_indexes(Tortoise.get_connection("default"))
 
 async def create_initial_data():
     """
@@ -48,9 +54,13 @@ async def create_initial_data():
         }
     ]
 
-    for perm_data in permissions:
-        permission = await Permission.create(**perm_data)
-        await super_admin_role.permissions.add(permission)
+    # 批量写入权限和角色权限关联
+    await Permission.bulk_create([Permission(**perm_data) for perm_data in permissions])
+    permission_ids = await Permission.filter(
+        code__in=[perm_data["code"] for perm_data in permissions]
+    ).values_list("id", flat=True)
+    async with in_transaction() as connection:
+        await link_many(connection, Role._meta.fields_map["permissions"], [super_admin_role.id], permission_ids)
 
     # 创建超级管理员用户
     password = settings.FIRST_SUPERUSER_PASSWORD.encode('utf-8')
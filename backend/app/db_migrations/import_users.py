@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import json
+from typing import Optional
+from tortoise import Tortoise
+from app.services.user_import import IMPORT_FORMATS, MAX_REPORTED_ERRORS, detect_format, import_users, read_rows
+from app.tortoise_config import TORTOISE_ORM
+from app.utils.executors import shutdown_executors
+from app.utils.log_server import logServer
+from app.utils.redis import RedisClient
+
+logger = logServer().run()
+
+
+async def main(path: str, batch_size: int, format: Optional[str], errors_path: Optional[str]) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    redis_client = RedisClient()
+    try:
+        # 导入成功的用户数计入仪表盘统计；Redis 不可用时由定期校正修正
+        await redis_client.init()
+    except Exception:
+        logger.warning("Redis不可用，用户统计将在下次校正时更新")
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            # 写入 --errors 文件时保留全部失败行
+            report = await import_users(
+                read_rows(f, detect_format(path, format)),
+                batch_size,
+                max_errors=None if errors_path else MAX_REPORTED_ERRORS
+            )
+    finally:
+        await Tortoise.close_connections()
+        await redis_client.close()
+        shutdown_executors()
+    if errors_path:
+        with open(errors_path, "w", encoding="utf-8") as f:
+            for error in report.errors:
+                f.write(json.dumps(error, ensure_ascii=False) + "\n")
+    for error in report.errors[:20]:
+        logger.warning(f"第 {error['line']} 行导入失败({error['username']}): {error['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从CSV或NDJSON批量导入用户")
+    parser.add_argument("path", help="文件路径，CSV表头为 username,email,password[,full_name]，NDJSON每行一个同样字段的对象")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批插入的行数")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="文件格式，默认按扩展名判断")
+    parser.add_argument("--errors", help="失败行写入的文件(NDJSON)")
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.batch_size, args.format, args.errors))
@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+from typing import List
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+from app.tortoise_config import TORTOISE_ORM
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 多对多关系合并配置
+# table/columns: 保留的中间表及其列(发起方, 目标方)
+# legacy/legacy_columns: 旧的反向声明生成的重复中间表，列顺序与 columns 对应
+# owner/target: 列引用的表，回滚时重建旧表使用
+RELATIONS = (
+    {
+        "table": "users_roles",
+        "columns": ("users_id", "role_id"),
+        "legacy": "roles_users",
+        "legacy_columns": ("user_id", "roles_id"),
+        "owner": "users",
+        "target": "roles",
+    },
+    {
+        "table": "roles_permissions",
+        "columns": ("roles_id", "permission_id"),
+        "legacy": "permissions_roles",
+        "legacy_columns": ("role_id", "permissions_id"),
+        "owner": "roles",
+        "target": "permissions",
+    },
+)
+
+
+def index_statements(dialect: str) -> List[str]:
+    """
+    生成中间表索引SQL：正向唯一索引防止重复关联，反向索引用于按目标方查询
+    @param: dialect 数据库方言
+    @return: List[str] SQL列表
+    """
+    if dialect not in ("postgres", "sqlite"):
+        # MySQL 不支持 CREATE INDEX IF NOT EXISTS，这里不处理
+        return []
+    statements = []
+    for relation in RELATIONS:
+        table = relation["table"]
+        owner_column, target_column = relation["columns"]
+        statements.append(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "uidx_{table}" ON "{table}" ("{owner_column}", "{target_column}")'
+        )
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS "idx_{table}_{target_column}" ON "{table}" ("{target_column}", "{owner_column}")'
+        )
+    return statements
+
+
+def dedupe_statement(dialect: str, table: str, owner_column: str, target_column: str) -> str:
+    """
+    生成删除中间表重复行的SQL
+    @param: dialect 数据库方言
+    @param: table 中间表
+    @param: owner_column 发起方列
+    @param: target_column 目标方列
+    @return: str SQL
+    """
+    if dialect == "postgres":
+        return (
+            f'DELETE FROM "{table}" a USING "{table}" b WHERE a.ctid < b.ctid '
+            f'AND a."{owner_column}" = b."{owner_column}" AND a."{target_column}" = b."{target_column}"'
+        )
+    return (
+        f'DELETE FROM "{table}" WHERE rowid NOT IN '
+        f'(SELECT MIN(rowid) FROM "{table}" GROUP BY "{owner_column}", "{target_column}")'
+    )
+
+
+async def table_exists(connection: BaseDBAsyncClient, table: str) -> bool:
+    """
+    判断表是否存在
+    @param: connection 数据库连接
+    @param: table 表名
+    @return: bool 是否存在
+    """
+    if connection.capabilities.dialect == "postgres":
+        sql = "SELECT 1 FROM pg_tables WHERE schemaname = current_schema() AND tablename = $1"
+    else:
+        sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    rows = await connection.execute_query_dict(sql, [table])
+    return bool(rows)
+
+
+async def ensure_relation_indexes(connection: BaseDBAsyncClient) -> None:
+    """
+    创建中间表索引(幂等)，应用启动时在 generate_schemas 之后调用
+    已有重复关联的旧库无法创建唯一索引，需先执行本迁移
+    @param: connection 数据库连接
+    """
+    try:
+        for sql in index_statements(connection.capabilities.dialect):
+            await connection.execute_script(sql)
+    except Exception as e:
+        logger.warning(f"创建中间表索引失败，请执行 python -m app.db_migrations.rbac_relations: {str(e)}")
+
+
+async def upgrade(connection_name: str = "default") -> None:
+    """
+    合并重复的多对多中间表
+    把旧表中的关联并入保留的中间表，删除重复行后创建索引，最后删除旧表，整个过程在一个事务中完成
+    @param: connection_name 连接名
+    """
+    async with in_transaction(connection_name) as connection:
+        dialect = connection.capabilities.dialect
+        if dialect not in ("postgres", "sqlite"):
+            raise RuntimeError(f"不支持的数据库: {dialect}")
+        for relation in RELATIONS:
+            table, legacy = relation["table"], relation["legacy"]
+            owner_column, target_column = relation["columns"]
+            legacy_owner, legacy_target = relation["legacy_columns"]
+            if await table_exists(connection, legacy):
+                await connection.execute_script(
+                    f'INSERT INTO "{table}" ("{owner_column}", "{target_column}") '
+                    f'SELECT DISTINCT l."{legacy_owner}", l."{legacy_target}" FROM "{legacy}" l '
+                    f'WHERE NOT EXISTS (SELECT 1 FROM "{table}" t '
+                    f'WHERE t."{owner_column}" = l."{legacy_owner}" AND t."{target_column}" = l."{legacy_target}")'
+                )
+                logger.info(f"已合并 {legacy} -> {table}")
+            await connection.execute_script(dedupe_statement(dialect, table, owner_column, target_column))
+        for sql in index_statements(dialect):
+            await connection.execute_script(sql)
+            logger.info(f"已执行: {sql}")
+        for relation in RELATIONS:
+            await connection.execute_script(f'DROP TABLE IF EXISTS "{relation["legacy"]}"')
+            logger.info(f"已删除旧表 {relation['legacy']}")
+
+
+async def downgrade(connection_name: str = "default") -> None:
+    """
+    回滚：删除索引，重建旧中间表并复制关联
+    @param: connection_name 连接名
+    """
+    async with in_transaction(connection_name) as connection:
+        for relation in RELATIONS:
+            table, legacy = relation["table"], relation["legacy"]
+            owner_column, target_column = relation["columns"]
+            legacy_owner, legacy_target = relation["legacy_columns"]
+            await connection.execute_script(f'DROP INDEX IF EXISTS "uidx_{table}"')
+            await connection.execute_script(f'DROP INDEX IF EXISTS "idx_{table}_{target_column}"')
+            # 旧表由目标方模型声明，目标方列在前
+            await connection.execute_script(
+                f'CREATE TABLE IF NOT EXISTS "{legacy}" ('
+                f'"{legacy_target}" INT NOT NULL REFERENCES "{relation["target"]}" ("id") ON DELETE CASCADE, '
+                f'"{legacy_owner}" INT NOT NULL REFERENCES "{relation["owner"]}" ("id") ON DELETE CASCADE)'
+            )
+            await connection.execute_script(
+                f'INSERT INTO "{legacy}" ("{legacy_target}", "{legacy_owner}") '
+                f'SELECT "{target_column}", "{owner_column}" FROM "{table}"'
+            )
+            logger.info(f"已重建旧表 {legacy}")
+
+
+async def main(rollback: bool) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        if rollback:
+            await downgrade()
+        else:
+            await upgrade()
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="合并重复的角色/权限多对多中间表")
+    parser.add_argument("--downgrade", action="store_true", help="回滚")
+    args = parser.parse_args()
+    asyncio.run(main(args.downgrade))
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+from typing import List
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from app.tortoise_config import TORTOISE_ORM
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 表达式索引，前缀匹配使用
+EXPRESSION_INDEXES = (
+    ("idx_users_lower_username", "username"),
+    ("idx_users_lower_email", "email"),
+    ("idx_users_lower_full_name", "full_name"),
+)
+# 三元组索引，包含匹配使用(仅 PostgreSQL)
+TRIGRAM_INDEXES = (
+    ("idx_users_username_trgm", "username"),
+    ("idx_users_email_trgm", "email"),
+    ("idx_users_full_name_trgm", "full_name"),
+)
+
+
+def upgrade_statements(dialect: str, trigram: bool = True) -> List[str]:
+    """
+    生成创建搜索索引的SQL
+    PostgreSQL 使用 CONCURRENTLY 建索引不锁表，每条语句需单独执行(不能放在事务中)
+    @param: dialect 数据库方言
+    @param: trigram 是否创建三元组索引
+    @return: List[str] SQL列表
+    """
+    if dialect == "postgres":
+        statements = [
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON users (lower({column}) text_pattern_ops)"
+            for name, column in EXPRESSION_INDEXES
+        ]
+        if trigram:
+            # 需要先创建 pg_trgm 扩展
+            statements.extend(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON users USING gin (lower({column}) gin_trgm_ops)"
+                for name, column in TRIGRAM_INDEXES
+            )
+        return statements
+    if dialect == "sqlite":
+        return [
+            f"CREATE INDEX IF NOT EXISTS {name} ON users (lower({column}))"
+            for name, column in EXPRESSION_INDEXES
+        ]
+    # MySQL 默认排序规则不区分大小写，lower() 表达式索引需 8.0.13 以上，这里不处理
+    return []
+
+
+def downgrade_statements(dialect: str) -> List[str]:
+    """
+    生成删除搜索索引的SQL
+    @param: dialect 数据库方言
+    @return: List[str] SQL列表
+    """
+    if dialect == "postgres":
+        return [
+            f"DROP INDEX CONCURRENTLY IF EXISTS {name}"
+            for name, _ in EXPRESSION_INDEXES + TRIGRAM_INDEXES
+        ]
+    if dialect == "sqlite":
+        return [f"DROP INDEX IF EXISTS {name}" for name, _ in EXPRESSION_INDEXES]
+    return []
+
+
+async def upgrade(connection: BaseDBAsyncClient, trigram: bool = True) -> None:
+    """
+    创建用户搜索索引
+    pg_trgm 扩展创建失败(如没有权限)时跳过三元组索引，包含匹配仍可用但不走索引
+    @param: connection 数据库连接
+    @param: trigram 是否创建三元组索引
+    """
+    dialect = connection.capabilities.dialect
+    if dialect == "postgres" and trigram:
+        try:
+            await connection.execute_script("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            logger.warning(f"创建 pg_trgm 扩展失败，跳过三元组索引: {str(e)}")
+            trigram = False
+    for sql in upgrade_statements(dialect, trigram):
+        await connection.execute_script(sql)
+        logger.info(f"已执行: {sql}")
+
+
+async def downgrade(connection: BaseDBAsyncClient) -> None:
+    """
+    删除用户搜索索引
+    @param: connection 数据库连接
+    """
+    for sql in downgrade_statements(connection.capabilities.dialect):
+        await connection.execute_script(sql)
+        logger.info(f"已执行: {sql}")
+
+
+async def main(rollback: bool, trigram: bool) -> None:
+    await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        connection = Tortoise.get_connection("default")
+        if rollback:
+            await downgrade(connection)
+        else:
+            await upgrade(connection, trigram)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="创建或删除用户搜索索引")
+    parser.add_argument("--downgrade", action="store_true", help="删除索引")
+    parser.add_argument("--no-trigram", action="store_true", help="不创建 pg_trgm 三元组索引")
+    args = parser.parse_args()
+    asyncio.run(main(args.downgrade, not args.no_trigram))
@@ -1,5 +1,7 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 import logging as py_logging
 from app.core.config import settings
 from app.api.v1.api import api_router
@@ -7,54 +9,51 @@ from app.core.handlers import (
     validation_exception_handler,
     api_exception_handler,
     http_exception_handler,
+    expected_auth_error_handler,
     general_exception_handler
 )
-from app.core.exceptions import BaseAPIException
+from app.core.exceptions import BaseAPIException, ExpectedAuthError
 from fastapi.exceptions import RequestValidationError
 from fastapi.exceptions import HTTPException
 from app.middlewares.rbac_middleware import RBACMiddleware
+from app.middlewares.cors_middleware import CORSMiddleware
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.middlewares.request_context_middleware import RequestContextMiddleware
+from app.middlewares.access_log_middleware import AccessLogMiddleware
+from app.middlewares.tracing_middleware import TracingMiddleware
+from app.middlewares.admission_middleware import (
+    AdmissionMiddleware,
+    loop_lag_monitor,
+    request_tracker,
+)
 from app.utils.log_server import logServer
 from app.tortoise_config import init_db, close_db
 from app.utils.redis import RedisClient
+from app.utils.cache import default_cache
+from app.core.redis_maintenance import redis_maintenance
+from app.core.user_stats import user_stats
+from app.core.permission_registry import permission_registry
+from app.core.warmup import warmup
+from app.utils.executors import shutdown_executors
+from app.utils.metrics import metrics
+from app.utils.tracing import tracer, FileSpanExporter, InMemorySpanExporter
 
 logger = logServer().run()
 
-app = FastAPI()
-
-# 配置CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# 注册异常处理器
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(BaseAPIException, api_exception_handler)
-app.add_exception_handler(HTTPException, http_exception_handler)
-app.add_exception_handler(Exception, general_exception_handler)
-
-# 注册RBAC中间件
-app.add_middleware(RBACMiddleware)
-
-# 注册路由
-app.include_router(api_router, prefix=settings.API_V1_PREFIX)
-
-# 替换 uvicorn 的 handler，让uvicorn日志也走自定义日志组件
-uvicorn_logger = py_logging.getLogger("uvicorn")
-uvicorn_access_logger = py_logging.getLogger("uvicorn.access")
-uvicorn_logger.handlers = []
-uvicorn_access_logger.handlers = []
-for handler in logger.handlers:
-    uvicorn_logger.addHandler(handler)
-    uvicorn_access_logger.addHandler(handler)
+def begin_drain(app: FastAPI) -> None:
+    """
+    进入排空状态：就绪检查返回503，新请求返回503并关闭连接
+    @param: app FastAPI应用
+    """
+    if not request_tracker.draining:
+        logger.info(f"开始排空，进行中的请求 {request_tracker.in_flight} 个")
+    app.state.ready = False
+    request_tracker.start_draining()
 
-@app.on_event("startup")
-async def startup_event():
+async def startup(app: FastAPI):
     """
-    应用启动事件
+    应用启动：初始化连接、加载权限注册表并预热，完成后才报告就绪
+    @param: app FastAPI应用
     """
     # 初始化数据库连接
     await init_db()
@@ -62,6 +61,29 @@ async def startup_event():
     # 初始化Redis连接
     redis_client = RedisClient()
     await redis_client.init()
+
+    # 订阅缓存失效通知
+    default_cache.start()
+
+    # 启动 Redis 维护任务：统计各前缀键数量和内存，清理黑名单过期成员
+    if settings.REDIS_MAINTENANCE.ENABLED:
+        redis_maintenance.start(
+            settings.REDIS_MAINTENANCE.INTERVAL,
+            settings.REDIS_MAINTENANCE.SCAN_COUNT,
+            settings.REDIS_MAINTENANCE.MAX_KEYS,
+            settings.REDIS_MAINTENANCE.SAMPLE_SIZE,
+            settings.REDIS_MAINTENANCE.MAX_PREFIXES,
+        )
+
+    # 定期用 SQL 聚合校正仪表盘用户统计
+    user_stats.start(settings.USER_STATS.RECONCILE_INTERVAL)
+
+    # 加载权限位图注册表
+    await permission_registry.load()
+
+    # 启动事件循环延迟监控
+    if settings.ADMISSION.ENABLED:
+        loop_lag_monitor.start(settings.ADMISSION.LAG_CHECK_INTERVAL)
     
     # 输出数据库配置
     logger.debug(f"数据库配置:{settings.DATABASE_URL}")
@@ -74,18 +96,160 @@ async def startup_event():
     # 输出CORS配置
     logger.debug(f"CORS允许的源: {settings.BACKEND_CORS_ORIGINS}")
     
+    # 预热连接池、路由权限表和令牌签名，失败不影响启动
+    if settings.WARMUP.ENABLED:
+        try:
+            await warmup(app)
+        except Exception as e:
+            logger.warning(f"启动预热失败: {str(e)}")
+
+    # 通过 python -m app.server 启动时收到退出信号即进入排空状态，其他方式启动只能在 lifespan 关闭时进入
+    if not request_tracker.drain_on_signal:
+        logger.warning(
+            "未通过 app.server 启动，收到退出信号后就绪检查仍返回200，直到进行中的请求结束、执行 lifespan 关闭时才进入排空状态"
+        )
+
+    app.state.ready = True
     logger.info("应用启动完成")
 
-@app.on_event("shutdown")
-async def shutdown_event():
+async def shutdown(app: FastAPI):
     """
-    应用关闭事件
+    应用关闭：先拒绝新请求并等待进行中的请求完成，再等待后台任务、关闭连接池，最后写完日志队列
+    @param: app FastAPI应用
     """
+    start = time.monotonic()
+    begin_drain(app)
+
+    # 排空：使用 uvicorn 时进行中的请求已由 --timeout-graceful-shutdown 等待(超时的已被取消)，
+    # 这里只等待取消后的收尾；其他服务器下最多等待 SHUTDOWN_DRAIN_TIMEOUT 秒
+    drained = await request_tracker.wait_idle(settings.SHUTDOWN.DRAIN_TIMEOUT)
+    drain_seconds = time.monotonic() - start
+    metrics.observe("shutdown.drain_seconds", drain_seconds)
+    if drained:
+        logger.info(f"进行中的请求已完成，排空耗时 {drain_seconds:.2f}s")
+    else:
+        metrics.set_gauge("shutdown.abandoned_requests", request_tracker.in_flight)
+        logger.warning(
+            f"排空超时({settings.SHUTDOWN.DRAIN_TIMEOUT}s)，仍有 {request_tracker.in_flight} 个请求未完成"
+        )
+
+    # 停止事件循环延迟监控
+    await loop_lag_monitor.stop()
+
+    # 停止用户统计校正，校正会访问数据库
+    await user_stats.stop()
+
+    # 等待线程池和进程池中已提交的任务(密码哈希、批量导入)
+    await asyncio.to_thread(shutdown_executors)
+
     # 关闭数据库连接
     await close_db()
     
+    # 停止缓存失效订阅和 Redis 维护任务
+    await default_cache.stop()
+    await redis_maintenance.stop()
+
     # 关闭Redis连接
     redis_client = RedisClient()
     await redis_client.close()
     
-    logger.info("应用关闭完成")
+    logger.info(f"应用关闭完成，耗时 {time.monotonic() - start:.2f}s")
+
+    # 写完日志队列中剩余的日志
+    logServer().stop()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期
+    @param: app FastAPI应用
+    """
+    await startup(app)
+    yield
+    await shutdown(app)
+
+app = FastAPI(lifespan=lifespan)
+app.state.ready = False
+
+# 注册异常处理器
+app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(BaseAPIException, api_exception_handler)
+app.add_exception_handler(HTTPException, http_exception_handler)
+# 预期内的认证失败走快速路径
+app.add_exception_handler(ExpectedAuthError, expected_auth_error_handler)
+app.add_exception_handler(Exception, general_exception_handler)
+
+# 注册RBAC中间件
+app.add_middleware(RBACMiddleware)
+
+# 注册请求上下文中间件，为数据库查询设置请求截止时间，慢查询日志记录来源路由
+app.add_middleware(RequestContextMiddleware, db_deadline_seconds=settings.DB_QUERY.REQUEST_DEADLINE)
+
+# 注册响应压缩中间件
+if settings.COMPRESSION.ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION.MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION.GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION.BROTLI_QUALITY,
+        offload_threshold=settings.COMPRESSION.OFFLOAD_THRESHOLD,
+        brotli_enabled=settings.COMPRESSION.BROTLI_ENABLED,
+    )
+
+# 注册准入控制中间件，过载或关闭排空时直接返回503，并为请求设置截止时间
+# 关闭准入控制时仍注册，用于统计进行中的请求
+app.add_middleware(
+    AdmissionMiddleware,
+    enabled=settings.ADMISSION.ENABLED,
+    max_in_flight=settings.ADMISSION.MAX_IN_FLIGHT,
+    reserved_ratio=settings.ADMISSION.RESERVED_RATIO,
+    low_priority_ratio=settings.ADMISSION.LOW_PRIORITY_RATIO,
+    max_loop_lag_ms=settings.ADMISSION.MAX_LOOP_LAG_MS,
+    request_timeout=settings.ADMISSION.REQUEST_TIMEOUT,
+    retry_after=settings.ADMISSION.RETRY_AFTER,
+    log_interval=settings.ADMISSION.REJECT_LOG_INTERVAL,
+    high_priority_paths=settings.ADMISSION.HIGH_PRIORITY_PATHS,
+    low_priority_paths=settings.ADMISSION.LOW_PRIORITY_PATHS,
+)
+
+# 注册访问日志中间件，按状态码和耗时采样写入 JSON Lines 文件
+if settings.ACCESS_LOG.ENABLED:
+    app.add_middleware(
+        AccessLogMiddleware,
+        success_sample_rate=settings.ACCESS_LOG.SUCCESS_SAMPLE_RATE,
+        client_error_sample_rate=settings.ACCESS_LOG.CLIENT_ERROR_SAMPLE_RATE,
+        slow_threshold_ms=settings.ACCESS_LOG.SLOW_THRESHOLD_MS,
+    )
+
+# 注册链路追踪中间件，在请求入口决定是否采样
+if settings.TRACING.ENABLED:
+    tracer.configure(
+        sample_rate=settings.TRACING.SAMPLE_RATE,
+        exporter=FileSpanExporter() if settings.TRACING.EXPORTER == "file" else InMemorySpanExporter(),
+    )
+    app.add_middleware(TracingMiddleware, tracer=tracer, trusted_proxies=settings.TRACING.TRUSTED_PROXIES)
+
+# 配置CORS，最后注册即为最外层，预检请求不经过RBAC等中间件
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
+    allow_credentials=settings.CORS.ALLOW_CREDENTIALS,
+    allow_methods=settings.CORS.ALLOW_METHODS,
+    allow_headers=settings.CORS.ALLOW_HEADERS,
+    expose_headers=settings.CORS.EXPOSE_HEADERS,
+    max_age=settings.CORS.MAX_AGE,
+)
+
+# 注册路由
+app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+
+# 替换 uvicorn 的 handler，让uvicorn日志也走自定义日志组件
+uvicorn_logger = py_logging.getLogger("uvicorn")
+uvicorn_access_logger = py_logging.getLogger("uvicorn.access")
+uvicorn_logger.handlers = []
+uvicorn_access_logger.handlers = []
+for handler in logger.handlers:
+    uvicorn_logger.addHandler(handler)
+    uvicorn_access_logger.addHandler(handler)
+# 访问日志由 AccessLogMiddleware 采样记录，关闭 uvicorn 的逐条访问日志
+uvicorn_access_logger.disabled = settings.ACCESS_LOG.ENABLED
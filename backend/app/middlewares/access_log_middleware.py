@@ -0,0 +1,105 @@
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from app.utils.metrics import metrics
+from app.utils.log_server import logServer
+from app.utils.tracing import current_span
+
+
+class AccessLogMiddleware:
+    """
+    访问日志中间件(纯ASGI)，替代 uvicorn 的逐条访问日志
+    请求结束后按状态码采样：5xx 和慢请求全部记录，其余按采样率记录；
+    每条日志是一行JSON，带采样率(rate)便于按权重还原总量，经队列写入 访问日志_*.jsonl
+    请求被链路追踪采样时附带 trace_id
+    需注册在准入控制中间件外层，被拒绝的请求也会记录
+    """
+    def __init__(
+        self,
+        app,
+        success_sample_rate: float = 0.01,
+        client_error_sample_rate: float = 0.1,
+        slow_threshold_ms: float = 1000,
+        random_func: Callable[[], float] = random.random,
+    ):
+        """
+        初始化中间件
+        @param: app ASGI应用
+        @param: success_sample_rate 2xx/3xx 采样率
+        @param: client_error_sample_rate 4xx 采样率
+        @param: slow_threshold_ms 慢请求阈值(毫秒)，超过时全部记录
+        @param: random_func 随机数函数
+        """
+        self.app = app
+        self.success_sample_rate = success_sample_rate
+        self.client_error_sample_rate = client_error_sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.random = random_func
+        self.logger = logServer().access()
+
+    def sample_rate(self, status: int, duration_ms: float) -> float:
+        """
+        请求的采样率
+        @param: status 响应状态码
+        @param: duration_ms 请求耗时(毫秒)
+        @return: float 采样率
+        """
+        if status >= 500 or duration_ms >= self.slow_threshold_ms:
+            return 1.0
+        if status >= 400:
+            return self.client_error_sample_rate
+        return self.success_sample_rate
+
+    def record(self, scope, status: int, start: float, duration_ms: float, ttfb_ms: Optional[float],
+               size: int, rate: float) -> str:
+        """
+        生成一行访问日志
+        @return: str JSON字符串
+        """
+        client = scope.get("client")
+        endpoint = scope.get("endpoint")
+        entry = {
+            "ts": datetime.fromtimestamp(start, timezone.utc).isoformat(timespec="milliseconds"),
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "route": getattr(endpoint, "__name__", None),
+            "status": status,
+            "dur_ms": round(duration_ms, 2),
+            "ttfb_ms": round(ttfb_ms, 2) if ttfb_ms is not None else None,
+            "bytes": size,
+            "client": client[0] if client else None,
+            "rate": rate,
+        }
+        span = current_span()
+        if span.recording:
+            entry["trace_id"] = span.trace_id
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        wall_start = time.time()
+        start = time.perf_counter()
+        # 状态码、首字节耗时、响应体字节数
+        state = [500, None, 0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state[0] = message["status"]
+                state[1] = (time.perf_counter() - start) * 1000
+            elif message["type"] == "http.response.body":
+                state[2] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            status, ttfb_ms, size = state
+            rate = self.sample_rate(status, duration_ms)
+            if rate >= 1.0 or (rate > 0 and self.random() < rate):
+                metrics.inc("access_log.written")
+                self.logger.info(self.record(scope, status, wall_start, duration_ms, ttfb_ms, size, rate))
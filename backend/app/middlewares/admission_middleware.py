@@ -0,0 +1,269 @@
+import asyncio
+import time
+from typing import Iterable, Optional, Tuple
+from starlette.responses import JSONResponse
+from app.core.request_context import request_deadline
+from app.schemas.response import ErrorResponse
+from app.utils.metrics import metrics
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 请求优先级
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+    后台任务按固定间隔休眠，实际唤醒时间比预期晚多少即为事件循环延迟
+    """
+    def __init__(self):
+        self.lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float) -> None:
+        """
+        启动监控任务，需在事件循环中调用，重复调用无副作用
+        @param: interval 采样间隔(秒)
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """
+        停止监控任务
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.lag_ms = 0.0
+
+    async def _run(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.lag_ms = max(0.0, (loop.time() - start - interval) * 1000)
+            metrics.set_gauge("admission.loop_lag_ms", self.lag_ms)
+
+
+# 创建事件循环延迟监控实例
+loop_lag_monitor = LoopLagMonitor()
+
+
+class RequestTracker:
+    """
+    进行中请求计数
+    关闭时先进入排空状态拒绝新请求，再等待进行中的请求完成
+    """
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        # 服务器是否在收到退出信号时调用 start_draining(见 app.server)
+        self.drain_on_signal = False
+        self._idle: Optional[asyncio.Event] = None
+
+    def enter(self) -> None:
+        self.in_flight += 1
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+
+    def exit(self) -> None:
+        self.in_flight -= 1
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+        if self.in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+    def start_draining(self) -> None:
+        """
+        进入排空状态，之后的新请求返回 503
+        """
+        self.draining = True
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """
+        等待进行中的请求全部完成
+        @param: timeout 最长等待时间(秒)
+        @return: bool 是否在超时前完成
+        """
+        if self.in_flight == 0:
+            return True
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._idle = None
+
+
+# 创建进行中请求计数实例
+request_tracker = RequestTracker()
+
+def compile_paths(paths: Iterable[str]) -> Tuple[frozenset, Tuple[str, ...]]:
+    """
+    拆分路径配置，以 * 结尾的按前缀匹配
+    @param: paths 路径列表
+    @return: Tuple[frozenset, Tuple[str, ...]] (精确路径集合, 前缀元组)
+    """
+    exact, prefixes = set(), []
+    for path in paths:
+        if path.endswith("*"):
+            prefixes.append(path[:-1])
+        else:
+            exact.add(path)
+    return frozenset(exact), tuple(prefixes)
+
+
+class AdmissionMiddleware:
+    """
+    准入控制中间件(纯ASGI)
+    按并发数和事件循环延迟决定是否接受请求，过载时直接返回 503，不再占用数据库和 bcrypt 资源：
+    - 高优先级(刷新令牌、当前用户)可使用全部并发
+    - 普通请求不能占用为高优先级保留的并发，事件循环延迟过高时拒绝
+    - 低优先级(批量管理接口)只能使用部分普通并发，事件循环延迟过高时拒绝
+    接受的请求设置截止时间，数据库和 Redis 调用不会超过它；应用关闭排空期间拒绝所有新请求
+    需注册在 CORS 中间件内层，拒绝响应也带有 CORS 头
+    """
+    def __init__(
+        self,
+        app,
+        enabled: bool = True,
+        max_in_flight: int = 256,
+        reserved_ratio: float = 0.2,
+        low_priority_ratio: float = 0.5,
+        max_loop_lag_ms: float = 250,
+        request_timeout: float = 30.0,
+        retry_after: int = 1,
+        log_interval: float = 10.0,
+        high_priority_paths: Iterable[str] = (),
+        low_priority_paths: Iterable[str] = (),
+        lag_monitor: LoopLagMonitor = loop_lag_monitor,
+        tracker: RequestTracker = request_tracker,
+    ):
+        """
+        初始化中间件
+        @param: app ASGI应用
+        @param: enabled 是否启用并发和事件循环延迟限制，关闭时仍统计进行中请求并在排空期间拒绝新请求
+        @param: max_in_flight 最大并发请求数
+        @param: reserved_ratio 为高优先级请求保留的并发比例
+        @param: low_priority_ratio 低优先级请求可使用的普通并发比例
+        @param: max_loop_lag_ms 事件循环延迟阈值(毫秒)
+        @param: request_timeout 请求截止时间(秒)
+        @param: retry_after 拒绝时返回的 Retry-After(秒)
+        @param: log_interval 拒绝日志的最小间隔(秒)，期间的拒绝只计入指标
+        @param: high_priority_paths 高优先级路径
+        @param: low_priority_paths 低优先级路径
+        @param: lag_monitor 事件循环延迟监控
+        @param: tracker 进行中请求计数
+        """
+        self.app = app
+        self.enabled = enabled
+        normal_limit = max(1, int(max_in_flight * (1 - reserved_ratio)))
+        self.limits = {
+            PRIORITY_HIGH: max_in_flight,
+            PRIORITY_NORMAL: normal_limit,
+            PRIORITY_LOW: max(1, int(normal_limit * low_priority_ratio)),
+        }
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.request_timeout = request_timeout
+        self.retry_after = str(retry_after)
+        self.log_interval = log_interval
+        self._next_log = 0.0
+        self._suppressed = 0
+        self.high_exact, self.high_prefixes = compile_paths(high_priority_paths)
+        self.low_exact, self.low_prefixes = compile_paths(low_priority_paths)
+        self.lag_monitor = lag_monitor
+        self.tracker = tracker
+
+    def priority(self, path: str) -> str:
+        """
+        请求优先级
+        @param: path 请求路径
+        @return: str 优先级
+        """
+        if path in self.high_exact or (self.high_prefixes and path.startswith(self.high_prefixes)):
+            return PRIORITY_HIGH
+        if path in self.low_exact or (self.low_prefixes and path.startswith(self.low_prefixes)):
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    def rejection_reason(self, priority: str) -> Optional[str]:
+        """
+        判断是否拒绝请求
+        @param: priority 请求优先级
+        @return: Optional[str] 拒绝原因，接受时为None
+        """
+        if self.tracker.draining:
+            return "draining"
+        if not self.enabled:
+            return None
+        if self.tracker.in_flight >= self.limits[priority]:
+            return "concurrency"
+        if priority != PRIORITY_HIGH and self.lag_monitor.lag_ms > self.max_loop_lag_ms:
+            return "loop_lag"
+        return None
+
+    def deadline(self, scope) -> float:
+        """
+        请求截止时间，上游通过 X-Request-Timeout(秒)传入更短的超时时使用上游的值
+        @param: scope ASGI scope
+        @return: float 截止时间(time.monotonic)
+        """
+        timeout = self.request_timeout
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout":
+                try:
+                    upstream = float(value)
+                except ValueError:
+                    break
+                if 0 < upstream < timeout:
+                    timeout = upstream
+                break
+        return time.monotonic() + timeout
+
+    async def reject(self, scope, receive, send, priority: str, reason: str) -> None:
+        metrics.inc(f"admission.rejected.{reason}")
+        # 过载时每秒可能拒绝成千上万个请求，日志按间隔限流，数量以 admission.rejected.* 指标为准
+        now = time.monotonic()
+        if now < self._next_log:
+            self._suppressed += 1
+        else:
+            self._next_log = now + self.log_interval
+            suppressed, self._suppressed = self._suppressed, 0
+            logger.warning(
+                f"请求被拒绝({reason}): {scope.get('method')} {scope.get('path')}, 优先级 {priority}, "
+                f"并发 {self.tracker.in_flight}, 事件循环延迟 {self.lag_monitor.lag_ms:.1f}ms, "
+                f"上次日志后另有 {suppressed} 个请求被拒绝"
+            )
+        error_response = ErrorResponse(code=503, message="服务繁忙，请稍后重试", detail=reason)
+        headers = {"Retry-After": self.retry_after}
+        if reason == "draining":
+            # 让客户端和负载均衡器改用其他实例
+            headers["Connection"] = "close"
+        response = JSONResponse(status_code=503, content=error_response.dict(), headers=headers)
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority(scope["path"])
+        reason = self.rejection_reason(priority)
+        if reason is not None:
+            await self.reject(scope, receive, send, priority, reason)
+            return
+        self.tracker.enter()
+        token = request_deadline.set(self.deadline(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+            self.tracker.exit()
@@ -0,0 +1,259 @@
+import asyncio
+import time
+import zlib
+from typing import Optional, Tuple
+from app.utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+# 值得压缩的内容类型前缀
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/javascript",
+    b"application/xml",
+    b"text/",
+    b"image/svg+xml",
+)
+
+
+def choose_encoding(accept_encoding: bytes, brotli_enabled: bool = True) -> Optional[str]:
+    """
+    根据 Accept-Encoding 选择压缩算法，优先 br
+    @param: accept_encoding Accept-Encoding 请求头
+    @param: brotli_enabled 是否允许使用 brotli
+    @return: Optional[str] "br"、"gzip" 或 None
+    """
+    accepted = {}
+    for item in accept_encoding.decode("latin-1").lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    if brotli_enabled and brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+class StreamCompressor:
+    """
+    增量压缩器，统一 gzip 和 brotli 的接口
+    """
+    __slots__ = ("encoding", "_compressor")
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 输出带 gzip 头的数据
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> Tuple[bytes, float]:
+        """
+        压缩一段数据
+        @param: data 原始数据
+        @param: flush 是否立即刷出，流式响应每块都刷出以便客户端及时收到
+        @return: Tuple[bytes, float] (压缩后的数据, 消耗的CPU时间秒)
+        """
+        start = time.thread_time()
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            if flush:
+                out += self._compressor.flush()
+        else:
+            out = self._compressor.compress(data)
+            if flush:
+                out += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return out, time.thread_time() - start
+
+    def finish(self, data: bytes = b"") -> Tuple[bytes, float]:
+        """
+        压缩最后一段数据并结束压缩流
+        @param: data 原始数据
+        @return: Tuple[bytes, float] (压缩后的数据, 消耗的CPU时间秒)
+        """
+        start = time.thread_time()
+        if self.encoding == "br":
+            out = self._compressor.process(data) + self._compressor.finish()
+        else:
+            out = self._compressor.compress(data) + self._compressor.flush()
+        return out, time.thread_time() - start
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件(纯ASGI)
+    支持 brotli/gzip 协商、最小压缩阈值、流式响应增量压缩，大响应体在线程池中压缩以免阻塞事件循环
+    """
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        offload_threshold: int = 256 * 1024,
+        brotli_enabled: bool = True
+    ):
+        """
+        初始化中间件
+        @param: app ASGI应用
+        @param: minimum_size 小于该大小(字节)的响应不压缩
+        @param: gzip_level gzip 压缩级别
+        @param: brotli_quality brotli 压缩质量
+        @param: offload_threshold 大于该大小(字节)的数据块在线程池中压缩
+        @param: brotli_enabled 是否允许使用 brotli
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_threshold = offload_threshold
+        self.brotli_enabled = brotli_enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = choose_encoding(value, self.brotli_enabled)
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    async def run_compress(self, func, data: bytes) -> Tuple[bytes, float]:
+        """
+        执行压缩，大数据块放到线程池中
+        @param: func 压缩函数
+        @param: data 原始数据
+        @return: Tuple[bytes, float] (压缩后的数据, CPU时间秒)
+        """
+        if len(data) >= self.offload_threshold:
+            metrics.inc("compression.offloaded")
+            return await asyncio.to_thread(func, data)
+        return func(data)
+
+
+class _CompressionResponder:
+    """
+    单个响应的压缩状态
+    """
+    __slots__ = (
+        "middleware", "encoding", "send", "_downstream", "start_message", "compressor", "passthrough", "buffer"
+    )
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = self._send
+        self._downstream = send
+        self.start_message = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+        self.buffer = b""
+
+    def _should_compress(self, message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in message.get("headers", ()):
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compressed_headers(self, content_length: Optional[int]):
+        headers = []
+        for name, value in self.start_message.get("headers", ()):
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                # 压缩后字节不同，强ETag降级为弱ETag
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def _send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._should_compress(message):
+                self.start_message = message
+            else:
+                self.passthrough = True
+                await self._downstream(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        middleware = self.middleware
+
+        if self.compressor is None:
+            # 未达到压缩阈值前先缓冲，流式响应也可能很小
+            if self.buffer:
+                self.buffer += body
+                body = self.buffer
+            if len(body) < middleware.minimum_size:
+                if more_body:
+                    self.buffer = body
+                    return
+                metrics.inc("compression.skipped")
+                self.passthrough = True
+                await self._downstream(self.start_message)
+                await self._downstream({"type": "http.response.body", "body": body})
+                return
+            self.buffer = b""
+            compressor = StreamCompressor(self.encoding, middleware.gzip_level, middleware.brotli_quality)
+            if not more_body:
+                # 完整响应体一次压缩，保留 content-length
+                compressed, cpu = await middleware.run_compress(compressor.finish, body)
+                self._record(len(body), len(compressed), cpu)
+                self.start_message["headers"] = self._compressed_headers(len(compressed))
+                await self._downstream(self.start_message)
+                await self._downstream({"type": "http.response.body", "body": compressed})
+                return
+            # 流式响应：去掉 content-length，逐块压缩
+            self.compressor = compressor
+            self.start_message["headers"] = self._compressed_headers(None)
+            await self._downstream(self.start_message)
+
+        if more_body:
+            compressed, cpu = await middleware.run_compress(
+                lambda data: self.compressor.compress(data, flush=True), body
+            )
+        else:
+            compressed, cpu = await middleware.run_compress(self.compressor.finish, body)
+        self._record(len(body), len(compressed), cpu)
+        if compressed or not more_body:
+            await self._downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _record(self, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        metrics.inc("compression.bytes_in", bytes_in)
+        metrics.inc("compression.bytes_out", bytes_out)
+        metrics.inc("compression.bytes_saved", bytes_in - bytes_out)
+        metrics.inc("compression.cpu_seconds", cpu_seconds)
+        metrics.inc(f"compression.chunks.{self.encoding}")
@@ -0,0 +1,214 @@
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# allow_methods 为 "*" 时展开的方法列表
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+# 源匹配结果缓存上限，防止恶意构造的 Origin 撑爆内存
+ORIGIN_CACHE_SIZE = 1024
+
+
+def compile_origin_pattern(origins: Iterable[str]) -> Tuple[frozenset, Optional[re.Pattern]]:
+    """
+    预编译允许的源
+    精确源放入集合，通配子域名(如 https://*.example.com)合并编译成一个正则
+    @param: origins 允许的源列表
+    @return: Tuple[frozenset, Optional[re.Pattern]] (精确源集合, 通配源正则)
+    """
+    exact = set()
+    wildcard_patterns = []
+    for origin in origins:
+        origin = origin.rstrip("/")
+        if "*." in origin:
+            scheme, _, host = origin.partition("://*.")
+            wildcard_patterns.append(
+                rf"{re.escape(scheme)}://[a-z0-9-]+(?:\.[a-z0-9-]+)*\.{re.escape(host)}"
+            )
+        else:
+            exact.add(origin)
+    pattern = re.compile("|".join(f"(?:{p})" for p in wildcard_patterns)) if wildcard_patterns else None
+    return frozenset(exact), pattern
+
+
+class CORSMiddleware:
+    """
+    轻量CORS中间件(纯ASGI)
+    需注册为最外层中间件：预检请求在这里直接返回，不进入后续中间件和路由
+    """
+    def __init__(
+        self,
+        app,
+        allow_origins: Sequence[str] = (),
+        allow_methods: Sequence[str] = ("*",),
+        allow_headers: Sequence[str] = ("*",),
+        allow_credentials: bool = False,
+        expose_headers: Sequence[str] = (),
+        max_age: int = 600
+    ):
+        """
+        初始化中间件并预构建响应头
+        @param: app ASGI应用
+        @param: allow_origins 允许的源，支持 "*" 和 https://*.example.com 通配子域名
+        @param: allow_methods 允许的方法
+        @param: allow_headers 允许的请求头，"*" 表示回显请求中的头
+        @param: allow_credentials 是否允许携带凭据
+        @param: expose_headers 暴露给前端的响应头
+        @param: max_age 预检结果缓存时间(秒)
+        """
+        self.app = app
+        self.allow_all_origins = "*" in allow_origins
+        self.exact_origins, self.origin_pattern = compile_origin_pattern(
+            o for o in allow_origins if o != "*"
+        )
+        self.allow_methods = frozenset(ALL_METHODS if "*" in allow_methods else (m.upper() for m in allow_methods))
+        self.allow_all_headers = "*" in allow_headers
+        self.allow_headers = frozenset(h.lower() for h in allow_headers if h != "*")
+        self.allow_credentials = allow_credentials
+        self._origin_cache = {}
+
+        # 预构建响应头
+        common: List[Tuple[bytes, bytes]] = [(b"vary", b"Origin")]
+        if allow_credentials:
+            common.append((b"access-control-allow-credentials", b"true"))
+        self._preflight_headers = tuple(common + [
+            (b"access-control-allow-methods", ", ".join(sorted(self.allow_methods)).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+        ])
+        simple = list(common)
+        if expose_headers:
+            simple.append((b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1")))
+        self._simple_headers = tuple(simple)
+        if self.allow_headers and not self.allow_all_headers:
+            self._allow_headers_value = ", ".join(sorted(self.allow_headers)).encode("latin-1")
+        else:
+            self._allow_headers_value = None
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        """
+        判断源是否允许，结果会被缓存
+        @param: origin 请求源
+        @return: bool 是否允许
+        """
+        if self.allow_all_origins:
+            return True
+        allowed = self._origin_cache.get(origin)
+        if allowed is None:
+            allowed = origin in self.exact_origins or (
+                self.origin_pattern is not None and self.origin_pattern.fullmatch(origin) is not None
+            )
+            if len(self._origin_cache) >= ORIGIN_CACHE_SIZE:
+                self._origin_cache.clear()
+            self._origin_cache[origin] = allowed
+        return allowed
+
+    def _allow_origin_value(self, origin: bytes) -> bytes:
+        """
+        Access-Control-Allow-Origin 的值，携带凭据时必须回显具体源
+        """
+        if self.allow_all_origins and not self.allow_credentials:
+            return b"*"
+        return origin
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, self._vary_send(send))
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, request_method, request_headers, send)
+            return
+
+        if not self.is_allowed_origin(origin.decode("latin-1")):
+            await self.app(scope, receive, self._vary_send(send))
+            return
+
+        allow_origin = (b"access-control-allow-origin", self._allow_origin_value(origin))
+        simple_headers = self._simple_headers
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    allow_origin,
+                    *simple_headers
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    def _vary_send(self, send):
+        """
+        不带 CORS 头的响应：未允许所有源时响应随 Origin 变化，需加 Vary: Origin，
+        否则共享缓存可能把不带允许头的响应返回给允许的源
+        @param: send ASGI send
+        @return: ASGI send
+        """
+        if self.allow_all_origins:
+            return send
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"vary", b"Origin")]
+            await send(message)
+
+        return send_with_vary
+
+    async def _preflight(self, origin: bytes, request_method: bytes, request_headers: Optional[bytes], send):
+        """
+        直接响应预检请求
+        @param: origin 请求源
+        @param: request_method 预检请求的方法
+        @param: request_headers 预检请求的请求头
+        @param: send ASGI send
+        """
+        failures = []
+        if not self.is_allowed_origin(origin.decode("latin-1")):
+            failures.append("origin")
+        if request_method.decode("latin-1").upper() not in self.allow_methods:
+            failures.append("method")
+
+        headers = [(b"access-control-allow-origin", self._allow_origin_value(origin)), *self._preflight_headers]
+        if request_headers:
+            if self.allow_all_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            else:
+                requested = {h.strip().lower() for h in request_headers.decode("latin-1").split(",") if h.strip()}
+                if not requested <= self.allow_headers:
+                    failures.append("headers")
+                headers.append((b"access-control-allow-headers", self._allow_headers_value or b""))
+
+        if failures:
+            logger.debug(f"CORS预检被拒绝: {origin.decode('latin-1')} {', '.join(failures)}")
+            body = f"Disallowed CORS {', '.join(failures)}".encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"vary", b"Origin")
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers.append((b"content-length", b"0"))
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
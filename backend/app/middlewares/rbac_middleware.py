@@ -2,10 +2,10 @@ from typing import List, Optional, Callable
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.models.user import User
-from app.models.role import Role
-from app.models.permission import Permission
+from app.core.permission_cache import permission_cache
 from app.core.exceptions import AuthenticationException, PermissionException
 from app.utils.log_server import logServer
+from app.utils.tracing import traced
 
 logger = logServer().run()
 
@@ -22,6 +22,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.required_permissions = required_permissions or []
 
+    @traced("RBACMiddleware")
     async def dispatch(self, request: Request, call_next: Callable):
         """
         中间件处理函数
@@ -50,12 +51,8 @@ class RBACMiddleware(BaseHTTPMiddleware):
             if user.is_superuser:
                 return await call_next(request)
 
-            # 获取用户角色和权限
-            roles = await user.roles.all()
-            permissions = set()
-            for role in roles:
-                role_permissions = await role.permissions.all()
-                permissions.update(p.code for p in role_permissions)
+            # 获取用户权限(带缓存)
+            permissions = await permission_cache.get(user.id)
 
             # 将权限信息添加到请求状态中
             request.state.permissions = permissions
@@ -0,0 +1,31 @@
+import time
+from app.core.request_context import request_scope, db_deadline
+
+
+class RequestContextMiddleware:
+    """
+    请求上下文中间件(纯ASGI)
+    记录当前请求的 scope 和数据库截止时间，供查询超时控制和慢查询日志使用
+    需注册在 RBAC 中间件外层，权限加载的查询也计入请求截止时间
+    """
+    def __init__(self, app, db_deadline_seconds: float = 0):
+        """
+        初始化中间件
+        @param: app ASGI应用
+        @param: db_deadline_seconds 单个请求内数据库查询的截止时间(秒)，0 表示不限制
+        """
+        self.app = app
+        self.db_deadline_seconds = db_deadline_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope_token = request_scope.set(scope)
+        deadline = time.monotonic() + self.db_deadline_seconds if self.db_deadline_seconds else None
+        deadline_token = db_deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            db_deadline.reset(deadline_token)
+            request_scope.reset(scope_token)
@@ -0,0 +1,83 @@
+import ipaddress
+from typing import Iterable, Optional
+from app.utils.tracing import KIND_INTERNAL, KIND_SERVER, STATUS_ERROR, Span, Tracer, tracer as default_tracer
+
+
+class TracingMiddleware:
+    """
+    链路追踪中间件(纯ASGI)
+    在请求入口决定是否采样并创建根 span，未采样的请求直接透传；
+    采样的请求另记录 http.response 子 span，覆盖从响应头发出到响应体发送完成(压缩、传输)
+    需注册在访问日志中间件外层，访问日志可记录 trace_id
+    只有来自可信代理的 traceparent 沿用其采样标记，防止客户端强制采样每个请求
+    """
+    def __init__(self, app, tracer: Tracer = default_tracer, trusted_proxies: Optional[Iterable[str]] = None):
+        """
+        初始化中间件
+        @param: app ASGI应用
+        @param: tracer 链路追踪
+        @param: trusted_proxies 可信代理的IP或网段
+        """
+        self.app = app
+        self.tracer = tracer
+        self.trusted_networks = tuple(ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies or ())
+
+    def is_trusted(self, scope) -> bool:
+        """
+        请求是否直接来自可信代理
+        @param: scope ASGI scope
+        @return: bool 是否可信
+        """
+        client = scope.get("client")
+        if not client or not self.trusted_networks:
+            return False
+        try:
+            address = ipaddress.ip_address(client[0])
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_networks)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        method = scope.get("method", "")
+        span = self.tracer.start_trace(
+            f"{method} {scope.get('path', '')}",
+            traceparent=traceparent,
+            kind=KIND_SERVER,
+            attributes={"http.request.method": method, "url.path": scope.get("path")},
+            trust_sampled=traceparent is not None and self.is_trusted(scope),
+        )
+        if not span.recording:
+            await self.app(scope, receive, send)
+            return
+
+        response_span = None
+
+        async def send_wrapper(message):
+            nonlocal response_span
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+                response_span = Span(self.tracer, "http.response", KIND_INTERNAL, span.trace_id, span.span_id)
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) \
+                    and response_span is not None:
+                response_span.end()
+
+        with span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                endpoint = scope.get("endpoint")
+                if endpoint is not None:
+                    span.set_attribute("http.route", getattr(endpoint, "__name__", str(endpoint)))
+                if response_span is not None:
+                    response_span.end()
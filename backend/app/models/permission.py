@@ -1,5 +1,4 @@
 from tortoise import fields, models
-from tortoise.contrib.pydantic import pydantic_model_creator
 from app.models.base import BaseModel
 
 class Permission(BaseModel):
@@ -14,11 +13,6 @@ class Permission(BaseModel):
     description = fields.TextField(null=True, description="权限描述")
     created_at = fields.DatetimeField(auto_now_add=True, description="创建时间")
     updated_at = fields.DatetimeField(auto_now=True, description="更新时间")
-    roles = fields.ManyToManyField(
-        'models.Role',
-        related_name='permission_roles',  # 修改这里
-        description="关联角色"
-    )
     class Meta:
         table = "permissions"
         table_description = "权限表"
@@ -26,11 +20,35 @@ class Permission(BaseModel):
     def __str__(self):
         return f"{self.name}"
 
-# 创建Pydantic模型，用于API请求和响应
-Permission_Pydantic = pydantic_model_creator(Permission, name="Permission")
-PermissionIn_Pydantic = pydantic_model_creator(
-    Permission, 
-    name="PermissionIn", 
-    exclude_readonly=True,
-    exclude=("created_at", "updated_at")
-) 
\ No newline at end of file
+# Pydantic模型，用于API请求和响应
+# tortoise.contrib.pydantic 导入和模型创建都较慢，改为首次访问时再创建并缓存
+_pydantic_models = {}
+
+def _create_pydantic_model(name: str):
+    """
+    创建Pydantic模型
+    @param: name 模型变量名
+    @return: Type[PydanticModel] Pydantic模型
+    """
+    from tortoise.contrib.pydantic import pydantic_model_creator
+    if name == "Permission_Pydantic":
+        return pydantic_model_creator(Permission, name="Permission")
+    return pydantic_model_creator(
+        Permission,
+        name="PermissionIn",
+        exclude_readonly=True,
+        exclude=("created_at", "updated_at")
+    )
+
+def __getattr__(name: str):
+    """
+    模块级延迟属性，按需创建 Permission_Pydantic / PermissionIn_Pydantic
+    @param: name 属性名
+    @return: Type[PydanticModel] Pydantic模型
+    @exception: AttributeError 属性不存在
+    """
+    if name not in ("Permission_Pydantic", "PermissionIn_Pydantic"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _pydantic_models:
+        _pydantic_models[name] = _create_pydantic_model(name)
+    return _pydantic_models[name]
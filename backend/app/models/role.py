@@ -1,5 +1,4 @@
 from tortoise import fields, models
-from tortoise.contrib.pydantic import pydantic_model_creator
 from app.models.base import BaseModel
 
 class Role(BaseModel):
@@ -14,14 +13,13 @@ class Role(BaseModel):
     description = fields.TextField(null=True, description="角色描述")
     created_at = fields.DatetimeField(auto_now_add=True, description="创建时间")
     updated_at = fields.DatetimeField(auto_now=True, description="更新时间")
-    users = fields.ManyToManyField(
-        'models.User',
-        related_name='role_users',  # 修改这里
-        description="关联用户"
-    )
+    # 角色-权限关系只在这里声明，Permission.roles 为反向关系，共用 roles_permissions 中间表
     permissions = fields.ManyToManyField(
         'models.Permission',
-        related_name='role_permissions',  # 修改这里
+        related_name='roles',
+        through='roles_permissions',
+        backward_key='roles_id',
+        forward_key='permission_id',
         description="关联权限"
     )
 
@@ -32,11 +30,35 @@ class Role(BaseModel):
     def __str__(self):
         return self.name
 
-# 创建Pydantic模型，用于API请求和响应
-Role_Pydantic = pydantic_model_creator(Role, name="Role")
-RoleIn_Pydantic = pydantic_model_creator(
-    Role, 
-    name="RoleIn", 
-    exclude_readonly=True,
-    exclude=("created_at", "updated_at")
-) 
\ No newline at end of file
+# Pydantic模型，用于API请求和响应
+# tortoise.contrib.pydantic 导入和模型创建都较慢，改为首次访问时再创建并缓存
+_pydantic_models = {}
+
+def _create_pydantic_model(name: str):
+    """
+    创建Pydantic模型
+    @param: name 模型变量名
+    @return: Type[PydanticModel] Pydantic模型
+    """
+    from tortoise.contrib.pydantic import pydantic_model_creator
+    if name == "Role_Pydantic":
+        return pydantic_model_creator(Role, name="Role")
+    return pydantic_model_creator(
+        Role,
+        name="RoleIn",
+        exclude_readonly=True,
+        exclude=("created_at", "updated_at")
+    )
+
+def __getattr__(name: str):
+    """
+    模块级延迟属性，按需创建 Role_Pydantic / RoleIn_Pydantic
+    @param: name 属性名
+    @return: Type[PydanticModel] Pydantic模型
+    @exception: AttributeError 属性不存在
+    """
+    if name not in ("Role_Pydantic", "RoleIn_Pydantic"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _pydantic_models:
+        _pydantic_models[name] = _create_pydantic_model(name)
+    return _pydantic_models[name]
@@ -13,9 +13,13 @@ class User(BaseModel):
     full_name = fields.CharField(max_length=255, null=True, description="全名")
     is_active = fields.BooleanField(default=True, description="是否激活")
     is_superuser = fields.BooleanField(default=False, description="是否超级管理员")
+    # 用户-角色关系只在这里声明，Role.users 为反向关系，共用 users_roles 中间表
     roles = fields.ManyToManyField(
         'models.Role',
-        related_name='user_roles',  # 修改这里
+        related_name='users',
+        through='users_roles',
+        backward_key='users_id',
+        forward_key='role_id',
         description="关联角色"
     )
 
@@ -32,12 +36,8 @@ class User(BaseModel):
         获取用户所有权限
         @return: List[Permission] 权限列表
         """
-        permissions = set()
-        roles = await self.roles.all().prefetch_related('permissions')
-        for role in roles:
-            role_permissions = await role.permissions.all()
-            permissions.update(role_permissions)
-        return list(permissions)
+        from app.models.permission import Permission
+        return await Permission.filter(roles__users__id=self.id).distinct()
 
 # Pydantic 模型定义
 class UserBase(BaseModel):
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class PermissionBase(BaseModel):
+    """
+    权限基础模型
+    """
+    name: str = Field(..., min_length=1, max_length=50, description="权限名称")
+    code: str = Field(..., min_length=1, max_length=50, description="权限编码")
+    description: Optional[str] = Field(None, description="权限描述")
+
+class PermissionCreate(PermissionBase):
+    """
+    权限创建模型
+    """
+
+class PermissionUpdate(BaseModel):
+    """
+    权限更新模型，只更新传入的字段
+    """
+    name: Optional[str] = Field(None, min_length=1, max_length=50, description="权限名称")
+    code: Optional[str] = Field(None, min_length=1, max_length=50, description="权限编码")
+    description: Optional[str] = Field(None, description="权限描述")
+
+class PermissionResponse(PermissionBase):
+    """
+    权限响应模型
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+class RoleBase(BaseModel):
+    """
+    角色基础模型
+    """
+    name: str = Field(..., min_length=1, max_length=50, description="角色名称")
+    code: str = Field(..., min_length=1, max_length=50, description="角色编码")
+    description: Optional[str] = Field(None, description="角色描述")
+
+class RoleCreate(RoleBase):
+    """
+    角色创建模型
+    """
+
+class RoleUpdate(BaseModel):
+    """
+    角色更新模型，只更新传入的字段
+    """
+    name: Optional[str] = Field(None, min_length=1, max_length=50, description="角色名称")
+    code: Optional[str] = Field(None, min_length=1, max_length=50, description="角色编码")
+    description: Optional[str] = Field(None, description="角色描述")
+
+class RoleResponse(RoleBase):
+    """
+    角色响应模型
+    """
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    permissions: List[str] = []
+
+    class Config:
+        orm_mode = True
+
+class UserRoleAssignment(BaseModel):
+    """
+    用户角色批量分配模型，对 user_ids × role_ids 的所有组合生效
+    """
+    user_ids: List[int] = Field(..., description="用户ID列表")
+    role_ids: List[int] = Field(..., description="角色ID列表")
+
+class RolePermissionAssignment(BaseModel):
+    """
+    角色权限批量分配模型，对 role_ids × permission_ids 的所有组合生效
+    """
+    role_ids: List[int] = Field(..., description="角色ID列表")
+    permission_ids: List[int] = Field(..., description="权限ID列表")
+
+class AssignmentResult(BaseModel):
+    """
+    批量分配结果模型
+    """
+    affected: int = Field(0, description="新增或删除的关联数")
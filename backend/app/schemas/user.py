@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -35,6 +35,50 @@ class UserResponse(UserBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class UserSearchItem(BaseModel):
+    """
+    用户搜索结果模型
+    """
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str] = None
+    is_active: bool
+
+class UserSearchPage(BaseModel):
+    """
+    用户搜索分页模型
+    """
+    items: List[UserSearchItem] = []
+    next_after_id: Optional[int] = Field(None, description="下一页游标，为空表示没有更多数据")
+
+class UserStatsResponse(BaseModel):
+    """
+    用户统计模型
+    """
+    total: int = Field(..., description="用户总数")
+    active: int = Field(..., description="激活用户数")
+    inactive: int = Field(..., description="禁用用户数")
+    roles: Dict[str, int] = Field({}, description="角色编码 -> 拥有该角色的用户数")
+    reconciled_at: datetime = Field(..., description="最近一次用 SQL 聚合校正的时间")
+
+class UserImportError(BaseModel):
+    """
+    导入失败的行
+    """
+    line: int = Field(..., description="行号")
+    username: Optional[str] = None
+    error: str = Field(..., description="失败原因")
+
+class UserImportResult(BaseModel):
+    """
+    用户导入结果模型
+    """
+    total: int = Field(..., description="处理的行数")
+    created: int = Field(..., description="成功导入的行数")
+    failed: int = Field(..., description="失败的行数")
+    errors: List[UserImportError] = Field([], description="失败的行，最多返回1000条")
+
 class Token(BaseModel):
     """
     JWT Token响应模型
@@ -0,0 +1,39 @@
+import argparse
+import uvicorn
+from app.main import app, begin_drain
+from app.middlewares.admission_middleware import request_tracker
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    收到退出信号时立即进入排空状态的 uvicorn 服务器
+    uvicorn 收到信号后先关闭监听套接字，等待进行中的请求(--timeout-graceful-shutdown)，
+    之后才执行 lifespan 关闭；覆盖 handle_exit 让就绪检查和保持连接上的新请求在信号到达时就返回 503
+    """
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        request_tracker.drain_on_signal = True
+
+    def handle_exit(self, sig, frame) -> None:
+        begin_drain(app)
+        super().handle_exit(sig, frame)
+
+
+def main(host: str, port: int, timeout_graceful_shutdown: float) -> None:
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        timeout_graceful_shutdown=timeout_graceful_shutdown or None,
+    )
+    DrainingServer(config).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="启动服务(单进程)，收到 SIGTERM/SIGINT 时立即进入排空状态")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口")
+    parser.add_argument("--timeout-graceful-shutdown", type=float, default=20,
+                        help="等待进行中请求的最长时间(秒)，0 表示一直等待")
+    args = parser.parse_args()
+    main(args.host, args.port, args.timeout_graceful_shutdown)
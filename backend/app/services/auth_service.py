@@ -1,20 +1,81 @@
+import re
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from jose import JWTError, jwt
-import bcrypt
 from fastapi import HTTPException, status
+from tortoise.exceptions import IntegrityError
 from app.models.user import User
 from app.core.config import settings
 from app.core.blacklist import token_blacklist
+from app.crud.user import find_user
+from app.core.user_stats import user_stats
+from app.core.exceptions import (
+    INVALID_LOGIN,
+    INVALID_REFRESH_TOKEN,
+    INVALID_TOKEN,
+    TOKEN_REVOKED,
+    TOKEN_USER_NOT_FOUND
+)
 from app.utils.log_server import logServer
+from app.utils.lazy_import import lazy_import
+from app.utils.executors import run_in_thread
+from app.utils.tracing import traced, tracer
 
 logger = logServer().run()
 
+# jose 依赖 cryptography，导入较慢；bcrypt 只在注册/登录时用到，均延迟导入
+jwt = lazy_import("jose.jwt")
+bcrypt = lazy_import("bcrypt")
+
+# 配置不可变，热路径使用的值在加载时绑定一次
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = [settings.ALGORITHM]
+_BCRYPT_ROUNDS = settings.AUTH.BCRYPT_ROUNDS
+
+# 唯一约束冲突信息中的字段名，冲突的值可能包含任意文本，只在固定位置匹配
+_UNIQUE_FIELDS = ("username", "email")
+_UNIQUE_MESSAGE_PATTERNS = (
+    # PostgreSQL: duplicate key value violates unique constraint "users_email_key"
+    re.compile(r'unique constraint "users_(username|email)_key"'),
+    # SQLite: UNIQUE constraint failed: users.email
+    re.compile(r"UNIQUE constraint failed: users\.(username|email)\b"),
+    # MySQL: Duplicate entry 'x' for key 'users.email'，冲突的值在前面，只匹配结尾
+    re.compile(r"for key '(?:users\.)?(username|email)'[^']*$"),
+)
+# PostgreSQL detail: Key (email)=(x) already exists.
+_UNIQUE_DETAIL_PATTERN = re.compile(r"Key \((username|email)\)=")
+
+def unique_violation_field(exc: IntegrityError) -> Optional[str]:
+    """
+    从唯一约束冲突异常中解析冲突的用户字段
+    兼容 PostgreSQL(约束名 users_username_key / users_email_key)、SQLite(UNIQUE constraint failed: users.email) 和 MySQL；
+    只匹配约束名或消息中的固定位置，冲突的值中包含字段名时不会误判
+    @param: exc 唯一约束冲突异常
+    @return: Optional[str] "username"、"email" 或 None
+    """
+    original = exc.args[0] if exc.args else exc
+    constraint = getattr(original, "constraint_name", None)
+    for field in _UNIQUE_FIELDS:
+        if constraint == f"users_{field}_key":
+            return field
+    detail = getattr(original, "detail", None)
+    if detail:
+        match = _UNIQUE_DETAIL_PATTERN.match(detail)
+        if match:
+            return match.group(1)
+    message = str(original)
+    for pattern in _UNIQUE_MESSAGE_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return match.group(1)
+    return None
+
 class AuthService:
     """
     认证服务类
     """
     @staticmethod
+    @traced("auth.verify_password")
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """
         验证密码
@@ -36,10 +97,20 @@ class AuthService:
         """
         return bcrypt.hashpw(
             password.encode('utf-8'),
-            bcrypt.gensalt()
+            bcrypt.gensalt(_BCRYPT_ROUNDS)
         ).decode('utf-8')
 
     @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """
+        在线程池中计算密码哈希
+        @param: password 明文密码
+        @return: str 哈希密码
+        """
+        return await run_in_thread(AuthService.get_password_hash, password)
+
+    @staticmethod
+    @traced("auth.create_access_token")
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """
         创建访问令牌
@@ -53,10 +124,11 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTE)
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
         return encoded_jwt
 
     @staticmethod
+    @traced("auth.create_refresh_token")
     def create_refresh_token(data: dict) -> str:
         """
         创建刷新令牌
@@ -66,10 +138,11 @@ class AuthService:
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         to_encode.update({"exp": expire, "type": "refresh"})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
         return encoded_jwt
 
     @staticmethod
+    @traced("auth.verify_token")
     async def verify_token(token: str, token_type: str = "access") -> bool:
         """
         验证令牌
@@ -78,55 +151,39 @@ class AuthService:
         @return: bool 是否有效
         """
         # 检查令牌是否在黑名单中
-        if await token_blacklist.is_blacklisted(token):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="令牌已失效",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+        with tracer.span("auth.check_blacklist"):
+            blacklisted = await token_blacklist.is_blacklisted(token)
+        if blacklisted:
+            raise TOKEN_REVOKED.exception()
 
         # 验证令牌
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-            )
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的令牌",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            with tracer.span("auth.decode_token"):
+                payload = jwt.decode(
+                    token,
+                    _SECRET_KEY,
+                    algorithms=_ALGORITHMS
+                )
+        except jwt.JWTError:
+            raise INVALID_TOKEN.exception()
         
         # 验证令牌类型
         if token_type == "refresh" and payload.get("type") != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的刷新令牌",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_REFRESH_TOKEN.exception()
         
         username: str = payload.get("sub")
         if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的令牌",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_TOKEN.exception()
         
-        # 检查用户是否存在
-        user = await User.get_or_none(username=username)
+        # 检查用户是否存在，并发的相同查询合并为一次
+        user = await find_user(username)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用户不存在",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise TOKEN_USER_NOT_FOUND.exception()
         
         return True
 
     @staticmethod
+    @traced("auth.authenticate_user")
     async def authenticate_user(username: str, password: str) -> Optional[User]:
         """
         认证用户
@@ -136,18 +193,10 @@ class AuthService:
         """
         user = await User.get_or_none(username=username)
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用户名或密码错误",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_LOGIN.exception()
         
         if not AuthService.verify_password(password, user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用户名或密码错误",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_LOGIN.exception()
         
         return user
 
@@ -161,31 +210,35 @@ class AuthService:
         @param: full_name 全名
         @return: User 用户对象
         """
-        # 检查用户名是否已存在
-        if await User.filter(username=username).exists():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="用户名已存在"
+        # 密码哈希在线程池中执行，不阻塞事件循环
+        hashed_password = await AuthService.get_password_hash_async(password)
+
+        # 依赖 username/email 唯一约束，一次插入完成注册，并发注册也不会产生重复用户
+        try:
+            user = await User.create(
+                username=username,
+                email=email,
+                hashed_password=hashed_password,
+                full_name=full_name
             )
-        
-        # 检查邮箱是否已存在
-        if await User.filter(email=email).exists():
+        except IntegrityError as e:
+            field = unique_violation_field(e)
+            if field == "email":
+                detail = "邮箱已被注册"
+            elif field == "username":
+                detail = "用户名已存在"
+            else:
+                logger.error(f"注册用户失败: {str(e)}")
+                raise
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="邮箱已被注册"
+                detail=detail
             )
-
-        # 创建新用户
-        hashed_password = AuthService.get_password_hash(password)
-        user = await User.create(
-            username=username,
-            email=email,
-            hashed_password=hashed_password,
-            full_name=full_name
-        )
+        await user_stats.user_created(active=user.is_active)
         return user
 
     @staticmethod
+    @traced("auth.login")
     async def login(username: str, password: str, remember: bool = False) -> Tuple[str, str, int]:
         """
         用户登录
@@ -219,6 +272,7 @@ class AuthService:
         return access_token, refresh_token, settings.ACCESS_TOKEN_EXPIRE_MINUTE * 60
 
     @staticmethod
+    @traced("auth.refresh_access_token")
     async def refresh_access_token(refresh_token: str) -> Tuple[str, str, int]:
         """
         刷新访问令牌
@@ -227,33 +281,21 @@ class AuthService:
         """
         # 验证刷新令牌
         if not await AuthService.verify_token(refresh_token, "refresh"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的刷新令牌",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_REFRESH_TOKEN.exception()
 
         # 解码刷新令牌
         try:
             payload = jwt.decode(
                 refresh_token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-            )
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的刷新令牌",
-                headers={"WWW-Authenticate": "Bearer"}
+                _SECRET_KEY,
+                algorithms=_ALGORITHMS
             )
+        except jwt.JWTError:
+            raise INVALID_REFRESH_TOKEN.exception()
 
         username: str = payload.get("sub")
         if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="无效的刷新令牌",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
+            raise INVALID_REFRESH_TOKEN.exception()
 
         # 创建新的访问令牌
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTE)
@@ -270,6 +312,7 @@ class AuthService:
         return access_token, new_refresh_token, settings.ACCESS_TOKEN_EXPIRE_MINUTE * 60
 
     @staticmethod
+    @traced("auth.logout")
     async def logout(token: str) -> bool:
         """
         用户登出
@@ -0,0 +1,349 @@
+import asyncio
+import csv
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from tortoise import Tortoise
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+from app.core.config import settings
+from app.core.request_context import db_deadline, request_deadline
+from app.core.user_stats import user_stats
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.services.auth_service import AuthService
+from app.utils.executors import get_process_pool, run_in_thread
+from app.utils.metrics import metrics
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 支持的导入格式
+IMPORT_FORMATS = ("csv", "ndjson")
+# 接口返回的报告中最多保留的错误行数，超过时只计数
+MAX_REPORTED_ERRORS = 1000
+# COPY 写入的列
+COPY_COLUMNS = ("username", "email", "hashed_password", "full_name", "is_active", "is_superuser", "created_at", "updated_at")
+
+# (行号, 原始数据)，JSON 无法解析时数据为 None
+Row = Tuple[int, Any]
+
+
+class RowReadError(Exception):
+    """
+    文件读取错误(编码错误、CSV格式错误)，出错位置之后的内容无法继续读取
+    """
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+
+
+class ImportReport:
+    """
+    导入结果：总行数、成功数、失败数和失败行的原因
+    """
+    __slots__ = ("total", "created", "failed", "errors", "max_errors")
+
+    def __init__(self, max_errors: Optional[int] = MAX_REPORTED_ERRORS):
+        """
+        初始化导入结果
+        @param: max_errors 最多保留的错误行数，None 表示全部保留
+        """
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.max_errors = max_errors
+
+    def error(self, line: int, username: Optional[str], message: str) -> None:
+        """
+        记录失败的行
+        @param: line 行号
+        @param: username 用户名
+        @param: message 失败原因
+        """
+        self.failed += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "username": username, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "created": self.created, "failed": self.failed, "errors": self.errors}
+
+
+def read_csv_rows(file: IO[str]) -> Iterator[Row]:
+    """
+    逐行读取CSV，表头为 username,email,password，full_name 可选
+    @param: file 文本文件
+    @return: Iterator[Row] (行号, 行数据)
+    @exception: RowReadError 文件不是UTF-8编码或CSV格式错误
+    """
+    reader = csv.DictReader(file)
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except UnicodeDecodeError:
+        raise RowReadError(reader.line_num + 1, "文件不是UTF-8编码，之后的内容未导入")
+    except csv.Error as e:
+        raise RowReadError(reader.line_num + 1, f"CSV格式错误({str(e)})，之后的内容未导入")
+
+
+def read_ndjson_rows(file: IO[str]) -> Iterator[Row]:
+    """
+    逐行读取 NDJSON，每行一个JSON对象，跳过空行
+    @param: file 文本文件
+    @return: Iterator[Row] (行号, 行数据)
+    @exception: RowReadError 文件不是UTF-8编码
+    """
+    line_no = 0
+    lines = iter(file)
+    while True:
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise RowReadError(line_no + 1, "文件不是UTF-8编码，之后的内容未导入")
+        line_no += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def detect_format(filename: Optional[str], format: Optional[str] = None) -> str:
+    """
+    导入格式，未指定时按扩展名判断，.ndjson/.jsonl 为 NDJSON，其他为CSV
+    @param: filename 文件名
+    @param: format 指定的格式
+    @return: str csv 或 ndjson
+    """
+    if format:
+        return format
+    return "ndjson" if os.path.splitext(filename or "")[1].lower() in (".ndjson", ".jsonl") else "csv"
+
+
+def read_rows(file: IO[str], format: str) -> Iterator[Row]:
+    """
+    按格式逐行读取
+    @param: file 文本文件
+    @param: format csv 或 ndjson
+    @return: Iterator[Row] (行号, 行数据)
+    """
+    return read_ndjson_rows(file) if format == "ndjson" else read_csv_rows(file)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    批量计算密码哈希，在子进程中执行
+    @param: passwords 明文密码列表
+    @return: List[str] 哈希密码列表
+    """
+    return [AuthService.get_password_hash(password) for password in passwords]
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(item) for item in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def validate_batch(batch: List[Row], report: ImportReport) -> List[Tuple[int, UserCreate]]:
+    """
+    校验一批行(与注册接口相同的规则)，并去掉批内重复的用户名和邮箱
+    @param: batch 行
+    @param: report 导入结果，记录失败的行
+    @return: List[Tuple[int, UserCreate]] 有效的行
+    """
+    valid = []
+    usernames, emails = set(), set()
+    for line, row in batch:
+        if not isinstance(row, dict):
+            report.error(line, None, "不是有效的JSON对象")
+            continue
+        data = {key: value for key, value in row.items() if key and value not in ("", None)}
+        try:
+            user = UserCreate(**data)
+        except ValidationError as e:
+            report.error(line, data.get("username"), _error_message(e))
+            continue
+        if user.username in usernames:
+            report.error(line, user.username, "用户名在文件中重复")
+        elif user.email in emails:
+            report.error(line, user.username, "邮箱在文件中重复")
+        else:
+            usernames.add(user.username)
+            emails.add(user.email)
+            valid.append((line, user))
+    return valid
+
+
+async def exclude_existing(valid: List[Tuple[int, UserCreate]], report: ImportReport) -> List[Tuple[int, UserCreate]]:
+    """
+    一次查询去掉用户名或邮箱已存在的行
+    @param: valid 有效的行
+    @param: report 导入结果，记录失败的行
+    @return: List[Tuple[int, UserCreate]] 可以写入的行
+    """
+    if not valid:
+        return valid
+    rows = await User.filter(
+        Q(username__in=[user.username for _, user in valid]) | Q(email__in=[user.email for _, user in valid])
+    ).values_list("username", "email")
+    usernames = {username for username, _ in rows}
+    emails = {email for _, email in rows}
+    remaining = []
+    for line, user in valid:
+        if user.username in usernames:
+            report.error(line, user.username, "用户名已存在")
+        elif user.email in emails:
+            report.error(line, user.username, "邮箱已存在")
+        else:
+            remaining.append((line, user))
+    return remaining
+
+
+async def hash_in_pool(passwords: List[str]) -> List[str]:
+    """
+    在进程池中计算一批密码哈希，按进程数分段
+    @param: passwords 明文密码列表
+    @return: List[str] 哈希密码列表
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    workers = settings.WORKERS.PROCESS_POOL_SIZE or os.cpu_count() or 1
+    chunk = max(1, -(-len(passwords) // workers))
+    futures = [
+        loop.run_in_executor(pool, hash_passwords, passwords[i:i + chunk])
+        for i in range(0, len(passwords), chunk)
+    ]
+    return [hashed for part in await asyncio.gather(*futures) for hashed in part]
+
+
+async def write_users(users: List[Tuple[UserCreate, str]]) -> None:
+    """
+    写入一批用户：PostgreSQL 使用 COPY，其他数据库使用多行 INSERT
+    @param: users (用户数据, 哈希密码)列表
+    @exception: IntegrityError 用户名或邮箱冲突，整批未写入
+    """
+    connection = Tortoise.get_connection(User._meta.default_connection)
+    if connection.capabilities.dialect == "postgres":
+        now = datetime.now(timezone.utc)
+        records = [
+            (user.username, user.email, hashed_password, user.full_name, True, False, now, now)
+            for user, hashed_password in users
+        ]
+        try:
+            async with connection.acquire_connection() as conn:
+                await conn.copy_records_to_table(User._meta.db_table, records=records, columns=COPY_COLUMNS)
+        except Exception as e:
+            # asyncpg 的唯一约束冲突
+            if getattr(e, "sqlstate", None) == "23505":
+                raise IntegrityError(e)
+            raise
+    else:
+        # 一个事务中写入，冲突时整批回滚
+        async with in_transaction(User._meta.default_connection) as conn:
+            await User.bulk_create([
+                User(username=user.username, email=user.email, full_name=user.full_name, hashed_password=hashed_password)
+                for user, hashed_password in users
+            ], using_db=conn)
+
+
+def read_batch(rows: Iterator[Row], batch_size: int, report: ImportReport) -> Tuple[int, List[Tuple[int, UserCreate]]]:
+    """
+    读取并校验一批行，在线程池中执行(读取上传的临时文件、解码和校验都是阻塞的)
+    读取出错时出错位置记为一行失败，已读取的行照常导入，之后不再读取
+    @param: rows 行迭代器，见 read_rows
+    @param: batch_size 每批行数
+    @param: report 导入结果，记录失败的行
+    @return: Tuple[int, List[Tuple[int, UserCreate]]] (读取的行数, 有效的行)，读取的行数为0表示文件已结束
+    """
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+    except RowReadError as e:
+        report.total += 1
+        report.error(e.line, None, e.message)
+    report.total += len(batch)
+    return len(batch), validate_batch(batch, report)
+
+
+async def import_batch(valid: List[Tuple[int, UserCreate]], report: ImportReport) -> None:
+    """
+    导入一批校验过的行：去重、哈希密码、写入
+    @param: valid 有效的行，见 read_batch
+    @param: report 导入结果
+    """
+    valid = await exclude_existing(valid, report)
+    if not valid:
+        return
+    hashed = await hash_in_pool([user.password for _, user in valid])
+    try:
+        await write_users([(user, hashed_password) for (_, user), hashed_password in zip(valid, hashed)])
+    except IntegrityError:
+        # 去重查询之后有并发写入，重新去重后写入剩余的行，密码哈希不必重算
+        hashes = {line: hashed_password for (line, _), hashed_password in zip(valid, hashed)}
+        valid = await exclude_existing(valid, report)
+        if not valid:
+            return
+        await write_users([(user, hashes[line]) for line, user in valid])
+    report.created += len(valid)
+
+
+async def import_users(
+    rows: Iterable[Row],
+    batch_size: int = 500,
+    max_errors: Optional[int] = MAX_REPORTED_ERRORS
+) -> ImportReport:
+    """
+    批量导入用户
+    逐批校验并去重(每批一次查询已存在的用户名和邮箱)，密码哈希分散到进程池，
+    PostgreSQL 用 COPY 写入；失败的行记录行号和原因，不影响其他行
+    文件读取出错或写入失败时停止导入，返回已导入部分的结果；成功导入的用户数计入用户统计
+    导入耗时与行数相关，不受请求截止时间限制(结束后恢复)，每次查询仍受数据库语句超时限制
+    @param: rows (行号, 行数据)，见 read_rows
+    @param: batch_size 每批行数
+    @param: max_errors 结果中最多保留的错误行数，None 表示全部保留
+    @return: ImportReport 导入结果
+    """
+    request_token = request_deadline.set(None)
+    db_token = db_deadline.set(None)
+    report = ImportReport(max_errors)
+    start = time.perf_counter()
+    rows = iter(rows)
+    try:
+        while True:
+            count, valid = await run_in_thread(read_batch, rows, batch_size, report)
+            if not count:
+                break
+            try:
+                await import_batch(valid, report)
+            except Exception as e:
+                logger.error(f"导入用户中断: 已处理 {report.total} 行, {str(e)}")
+                report.error(valid[0][0] if valid else 0, None, f"写入失败，本批及之后的行未导入: {str(e)}")
+                break
+            logger.info(f"已处理 {report.total} 行, 成功 {report.created} 行, 失败 {report.failed} 行")
+        if report.created:
+            await user_stats.user_created(count=report.created)
+    finally:
+        request_deadline.reset(request_token)
+        db_deadline.reset(db_token)
+    report.errors.sort(key=lambda error: error["line"])
+    metrics.inc("import.users.created", report.created)
+    metrics.inc("import.users.failed", report.failed)
+    logger.info(
+        f"导入用户完成: {report.total} 行, 成功 {report.created} 行, 失败 {report.failed} 行, "
+        f"耗时 {time.perf_counter() - start:.2f}s"
+    )
+    return report
@@ -0,0 +1,140 @@
+"""
+启动耗时分析工具
+用法: python -m app.startup_profile [--top 30] [--path /api/v1/users/me]
+
+1. 在子进程中以 -X importtime 导入 app.main，统计每个模块的导入耗时
+2. 在当前进程中导入 app.main 并直接通过 ASGI 接口发出第一个请求，统计首个请求耗时
+   (不触发 startup 事件，因此不需要数据库和Redis)
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# 进程启动时间基准
+_PROCESS_START = time.perf_counter()
+
+
+def collect_import_times(target: str = "app.main") -> List[Tuple[str, int, int]]:
+    """
+    在子进程中收集模块导入耗时
+    @param: target 要导入的模块
+    @return: List[Tuple[str, int, int]] (模块名, 自身耗时us, 累计耗时us) 列表
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    if result.returncode != 0:
+        print(result.stderr[-2000:], file=sys.stderr)
+    return rows
+
+
+def summarize_by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """
+    按顶层包汇总自身导入耗时
+    @param: rows 模块导入耗时列表
+    @return: Dict[str, int] 顶层包 -> 自身耗时总和(us)
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+async def _first_request(app, path: str) -> Tuple[int, float]:
+    """
+    直接调用ASGI应用发出一个GET请求
+    @param: app ASGI应用
+    @param: path 请求路径
+    @return: Tuple[int, float] (状态码, 耗时秒)
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"startup-profile")],
+        "client": ("127.0.0.1", 0),
+        "server": ("startup-profile", 80),
+    }
+    status_code = 0
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # 请求体已发送完毕，等待响应结束后再通知断开
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status_code, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应用启动耗时分析")
+    parser.add_argument("--top", type=int, default=30, help="显示耗时最多的模块数量")
+    parser.add_argument("--path", default="/api/v1/users/me", help="首个请求的路径")
+    args = parser.parse_args()
+
+    rows = collect_import_times()
+    total_us = max((cumulative for _, _, cumulative in rows), default=0)
+    print(f"== 模块导入耗时 (累计 {total_us / 1000:.1f} ms) ==")
+    print(f"{'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+
+    print("\n== 按顶层包汇总 ==")
+    for package, self_us in sorted(summarize_by_package(rows).items(), key=lambda i: i[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>10.1f}  {package}")
+
+    import_start = time.perf_counter()
+    from app.main import app
+    import_seconds = time.perf_counter() - import_start
+
+    status_code, request_seconds = asyncio.run(_first_request(app, args.path))
+    print("\n== 首个请求 ==")
+    print(f"导入 app.main: {import_seconds * 1000:.1f} ms")
+    print(f"首个请求 GET {args.path} -> {status_code}: {request_seconds * 1000:.1f} ms")
+    print(f"工具启动到首个响应: {(time.perf_counter() - _PROCESS_START) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
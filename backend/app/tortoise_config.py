@@ -1,9 +1,43 @@
+from typing import Optional, Union
 from app.core.config import settings
 from tortoise import Tortoise
+from tortoise.backends.base.config_generator import expand_db_url
+from app.utils.db_monitor import instrument_connections
+
+def build_connection_config(db_url: Optional[str]) -> Union[str, dict, None]:
+    """
+    根据数据库URL生成连接配置
+    PostgreSQL 连接附加连接池参数，并在建立连接时设置语句超时和等锁超时；SQLite 设置 busy_timeout
+    @param: db_url 数据库URL
+    @return: Union[str, dict, None] Tortoise 连接配置
+    """
+    query = settings.DB_QUERY
+    if db_url and db_url.startswith("sqlite://"):
+        config = expand_db_url(db_url)
+        if query.LOCK_TIMEOUT:
+            config["credentials"]["busy_timeout"] = int(query.LOCK_TIMEOUT * 1000)
+        return config
+    if not db_url or not db_url.startswith(("postgres://", "asyncpg://")):
+        return db_url
+    pool = settings.DB_POOL
+    config = expand_db_url(db_url)
+    config["credentials"].update({
+        "minsize": pool.MIN_SIZE,
+        "maxsize": pool.MAX_SIZE,
+        "max_inactive_connection_lifetime": pool.MAX_INACTIVE_CONNECTION_LIFETIME,
+        # 会话级参数，单位毫秒，0 表示不限制
+        "server_settings": {
+            "statement_timeout": str(int(query.STATEMENT_TIMEOUT * 1000)),
+            "lock_timeout": str(int(query.LOCK_TIMEOUT * 1000)),
+        },
+    })
+    if query.TIMEOUT:
+        config["credentials"]["command_timeout"] = query.TIMEOUT
+    return config
 
 TORTOISE_ORM = {
     "connections": {
-        "default": settings.TORTOISE_ORM_DATABASE_URL
+        "default": build_connection_config(settings.TORTOISE_ORM_DATABASE_URL)
     },
     "apps": {
         "models": {
@@ -25,8 +59,13 @@ async def init_db():
     @exception: Exception 数据库连接异常
     """
     await Tortoise.init(config=TORTOISE_ORM)
+    # 查询超时和慢查询日志
+    instrument_connections()
     # 创建数据库表
     await Tortoise.generate_schemas()
+    # 中间表索引 generate_schemas 不会创建，这里补上(迁移模块依赖本模块，延迟导入)
+    from app.db_migrations.rbac_relations import ensure_relation_indexes
+    await ensure_relation_indexes(Tortoise.get_connection("default"))
 
 async def close_db():
     """
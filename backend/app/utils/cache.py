@@ -0,0 +1,664 @@
+import asyncio
+import functools
+import inspect
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple, TypeVar, Union
+from app.core.config import settings
+from app.utils.metrics import metrics
+from app.utils.redis import RedisClient
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+T = TypeVar("T")
+
+
+class CacheEntry:
+    """
+    缓存条目
+    过了 fresh_until 为过期数据，stale_until 之前仍可返回并在后台刷新
+    """
+    __slots__ = ("value", "fresh_until", "stale_until", "tags")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float, tags: Tuple[str, ...] = ()):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.tags = tags
+
+
+class CacheBackend:
+    """
+    缓存后端接口，时间均为 time.time()，可在多个进程间比较
+    """
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """
+        获取多个键，未命中的键不在结果中
+        """
+        entries = {}
+        for key in keys:
+            entry = await self.get(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    async def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """
+        写入多个键
+        """
+        for key, entry in entries.items():
+            await self.set(key, entry)
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_tags(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    """
+    进程内缓存(L1)，按最近使用淘汰
+    条目在 ttl 秒后过期(多进程部署时决定其他进程修改后的最大延迟)，同时维护标签到键的索引
+    返回的值与缓存共用同一个对象，调用方不能修改
+    """
+    def __init__(self, ttl: float, max_entries: int):
+        """
+        初始化进程内缓存
+        @param: ttl 条目在本地保留的最长时间(秒)
+        @param: max_entries 最大条目数
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 键 -> (本地过期时间, 条目)
+        self._data: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_nowait(self, key: str) -> Optional[CacheEntry]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] < time.time():
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set_nowait(self, key: str, entry: CacheEntry) -> None:
+        self._drop(key)
+        self._data[key] = (min(entry.stale_until, time.time() + self.ttl), entry)
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.max_entries:
+            self._drop(next(iter(self._data)))
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return
+        for tag in item[1].tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self.set_nowait(key, entry)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._drop(key)
+
+    async def delete_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis 缓存(L2)，在多个进程间共享
+    值序列化为JSON；每个标签对应一个集合，记录带该标签的键，按标签失效时删除集合中的键
+    """
+    def __init__(self, prefix: str = "cache:", redis_client: Optional[RedisClient] = None):
+        """
+        初始化 Redis 缓存
+        @param: prefix 键前缀
+        @param: redis_client Redis客户端
+        """
+        self.prefix = prefix
+        self.redis = redis_client or RedisClient()
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    @staticmethod
+    def _decode(key: str, raw: Optional[str]) -> Optional[CacheEntry]:
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw)
+            return CacheEntry(data["v"], data["f"], data["s"], tuple(data["t"]))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"缓存数据无效 {key}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _encode(entry: CacheEntry) -> str:
+        return json.dumps(
+            {"v": entry.value, "f": entry.fresh_until, "s": entry.stale_until, "t": list(entry.tags)},
+            ensure_ascii=False, separators=(",", ":")
+        )
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self._decode(key, await self.redis.get(self.prefix + key))
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """
+        一次 MGET 获取多个键
+        """
+        keys = list(keys)
+        raws = await self.redis.mget(*(self.prefix + key for key in keys))
+        entries = {}
+        for key, raw in zip(keys, raws):
+            entry = self._decode(key, raw)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await self.set_many({key: entry})
+
+    async def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """
+        用管道写入多个键：第一次往返写入值、登记标签并读取标签集合的过期时间，
+        需要延长的标签集合在第二次往返中设置
+        """
+        now = time.time()
+        # 标签 -> 该批中带此标签的键的最长存活时间
+        tag_lifetimes: Dict[str, int] = {}
+        pipeline = self.redis.pipeline()
+        for key, entry in entries.items():
+            lifetime = math.ceil(entry.stale_until - now)
+            if lifetime <= 0:
+                continue
+            pipeline.set(self.prefix + key, self._encode(entry), ex=lifetime)
+            for tag in entry.tags:
+                pipeline.sadd(self._tag_key(tag), key)
+                tag_lifetimes[tag] = max(tag_lifetimes.get(tag, 0), lifetime)
+        tags = list(tag_lifetimes)
+        for tag in tags:
+            pipeline.ttl(self._tag_key(tag))
+        results = await self.redis.execute_pipeline(pipeline)
+        if not tags or not results:
+            return
+        # 标签集合至少保留到其中最晚过期的键
+        expire = self.redis.pipeline()
+        extend = False
+        for tag, remaining in zip(tags, results[-len(tags):]):
+            if remaining is not None and remaining < tag_lifetimes[tag]:
+                expire.expire(self._tag_key(tag), tag_lifetimes[tag])
+                extend = True
+        if extend:
+            await self.redis.execute_pipeline(expire)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.redis.delete(*(self.prefix + key for key in keys))
+
+    async def delete_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = await self.redis.smembers(tag_key)
+            await self.redis.delete(tag_key, *(self.prefix + key for key in keys))
+
+
+class SingleFlight:
+    """
+    请求合并：同一个键同时只执行一次，并发的调用方共用同一个结果
+    加载在独立任务中执行，发起方被取消(如客户端断开)不会影响其他等待方
+    """
+    def __init__(self, name: str = "singleflight"):
+        """
+        初始化请求合并
+        @param: name 指标名前缀
+        """
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def forget(self, key: Hashable) -> None:
+        """
+        不再合并到进行中的调用，之后的调用重新执行；已加入的等待方仍得到原结果
+        @param: key 合并键
+        """
+        self._calls.pop(key, None)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行或加入进行中的调用
+        @param: key 合并键
+        @param: func 无参数的协程函数
+        @return: T 调用结果
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            metrics.inc(f"{self.name}.coalesced")
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 所有等待方都已取消时，避免 "exception was never retrieved" 警告
+            task.exception()
+
+
+class TieredCache:
+    """
+    两级缓存：进程内(L1) + Redis(L2)
+    - get_or_load 未命中时合并并发加载，缓存过期瞬间不会有大量请求同时访问数据库
+    - 过期后的 stale_ttl 秒内返回旧值，并在后台刷新(stale-while-revalidate)
+    - 按标签失效：删除本进程和 Redis 中的条目，并通过 Redis 发布/订阅通知其他进程删除各自的 L1
+    - 加载期间键或其标签被失效时，加载结果不写入缓存，之后的调用重新加载
+    缓存的值需可以JSON序列化
+    """
+    def __init__(
+        self,
+        local: Optional[LocalCache],
+        remote: Optional[CacheBackend],
+        ttl: float,
+        stale_ttl: float = 0,
+        enabled: bool = True,
+        channel: str = "cache:invalidate",
+        redis_client: Optional[RedisClient] = None,
+    ):
+        """
+        初始化两级缓存
+        @param: local 进程内缓存，为空时不使用 L1
+        @param: remote 共享缓存，为空时不使用 L2
+        @param: ttl 默认过期时间(秒)
+        @param: stale_ttl 默认过期后仍可返回旧值的时间(秒)
+        @param: enabled 是否启用，关闭时直接调用加载函数
+        @param: channel 失效通知频道
+        @param: redis_client Redis客户端，用于发布/订阅失效通知
+        """
+        self.local = local
+        self.remote = remote
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self.channel = channel
+        self.redis = redis_client or RedisClient()
+        self.flight = SingleFlight("cache")
+        # 进行中的加载：键 -> (标签, 加载标识)，失效时删除，加载完成时标识不一致则不写入
+        self._loading: Dict[str, Tuple[Tuple[str, ...], object]] = {}
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        if self.local is not None:
+            entry = self.local.get_nowait(key)
+            if entry is not None:
+                metrics.inc("cache.l1_hits")
+                return entry
+        if self.remote is not None:
+            entry = await self.remote.get(key)
+            if entry is not None and entry.stale_until > time.time():
+                metrics.inc("cache.l2_hits")
+                if self.local is not None:
+                    self.local.set_nowait(key, entry)
+                return entry
+        metrics.inc("cache.misses")
+        return None
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """
+        获取缓存值，过期但仍在 stale 窗口内的旧值也会返回
+        @param: key 键
+        @param: default 未命中时的返回值
+        @return: Any 缓存值
+        """
+        if not self.enabled:
+            return default
+        entry = await self._lookup(key)
+        return default if entry is None else entry.value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, stale_ttl: Optional[float] = None,
+                  tags: Iterable[str] = ()) -> None:
+        """
+        写入缓存
+        @param: key 键
+        @param: value 值
+        @param: ttl 过期时间(秒)，默认使用配置
+        @param: stale_ttl 过期后仍可返回旧值的时间(秒)，默认使用配置
+        @param: tags 标签，用于按标签失效
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        entry = CacheEntry(value, fresh_until, fresh_until + (self.stale_ttl if stale_ttl is None else stale_ttl),
+                           tuple(tags))
+        if self.local is not None:
+            self.local.set_nowait(key, entry)
+        if self.remote is not None:
+            await self.remote.set(key, entry)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        获取多个缓存值，先查 L1，其余的一次从 L2 批量获取
+        @param: keys 键
+        @return: Dict[str, Any] 键 -> 值，未命中的键不在结果中
+        """
+        if not self.enabled:
+            return {}
+        values: Dict[str, Any] = {}
+        remaining = []
+        for key in keys:
+            entry = self.local.get_nowait(key) if self.local is not None else None
+            if entry is None:
+                remaining.append(key)
+            else:
+                values[key] = entry.value
+        l1_hits = len(values)
+        if remaining and self.remote is not None:
+            now = time.time()
+            for key, entry in (await self.remote.get_many(remaining)).items():
+                if entry.stale_until > now:
+                    values[key] = entry.value
+                    if self.local is not None:
+                        self.local.set_nowait(key, entry)
+        l2_hits = len(values) - l1_hits
+        metrics.inc("cache.l1_hits", l1_hits)
+        metrics.inc("cache.l2_hits", l2_hits)
+        metrics.inc("cache.misses", len(remaining) - l2_hits)
+        return values
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[float] = None, stale_ttl: Optional[float] = None,
+                       tags: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        """
+        写入多个缓存值，L2 一次管道写入
+        @param: values 键 -> 值
+        @param: ttl 过期时间(秒)，默认使用配置
+        @param: stale_ttl 过期后仍可返回旧值的时间(秒)，默认使用配置
+        @param: tags 键 -> 标签
+        """
+        if not self.enabled or not values:
+            return
+        fresh_until = time.time() + (self.ttl if ttl is None else ttl)
+        stale_until = fresh_until + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        tags = tags or {}
+        entries = {
+            key: CacheEntry(value, fresh_until, stale_until, tuple(tags.get(key, ())))
+            for key, value in values.items()
+        }
+        if self.local is not None:
+            for key, entry in entries.items():
+                self.local.set_nowait(key, entry)
+        if self.remote is not None:
+            await self.remote.set_many(entries)
+
+    async def load_many(self, tags: Dict[str, Tuple[str, ...]], loader: Callable[[], Awaitable[Dict[str, Any]]],
+                        ttl: Optional[float] = None, stale_ttl: Optional[float] = None) -> Dict[str, Any]:
+        """
+        批量加载并写入缓存，与 get_or_load 一样，加载期间被失效的键不写入
+        @param: tags 要加载的键 -> 标签
+        @param: loader 无参数的协程函数，返回 键 -> 值
+        @param: ttl 过期时间(秒)
+        @param: stale_ttl 过期后仍可返回旧值的时间(秒)
+        @return: Dict[str, Any] 加载结果
+        """
+        if not self.enabled:
+            return await loader()
+        token = object()
+        for key, key_tags in tags.items():
+            self._loading[key] = (tuple(key_tags), token)
+        try:
+            loaded = await loader()
+        finally:
+            current = set()
+            for key in tags:
+                item = self._loading.get(key)
+                if item is not None and item[1] is token:
+                    del self._loading[key]
+                    current.add(key)
+        writes = {key: value for key, value in loaded.items() if key in current}
+        if len(writes) < len(loaded):
+            # 加载期间已失效，值可能是修改前读到的
+            metrics.inc("cache.loads_discarded", len(loaded) - len(writes))
+        await self.set_many(writes, ttl, stale_ttl, tags)
+        return loaded
+
+    async def delete(self, *keys: str) -> None:
+        """
+        删除缓存，并通知其他进程删除 L1
+        @param: keys 键
+        """
+        self._abandon_loads(keys=keys)
+        if self.local is not None:
+            await self.local.delete(*keys)
+        if self.remote is not None:
+            await self.remote.delete(*keys)
+        await self._publish(keys=keys)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """
+        按标签失效，并通知其他进程
+        @param: tags 标签
+        """
+        self._abandon_loads(tags=tags)
+        if self.local is not None:
+            await self.local.delete_tags(tags)
+        if self.remote is not None:
+            await self.remote.delete_tags(tags)
+        await self._publish(tags=tags)
+        logger.debug(f"缓存标签已失效: {', '.join(tags)}")
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                          stale_ttl: Optional[float] = None, tags: Iterable[str] = ()) -> Any:
+        """
+        获取缓存值，未命中时加载并写入缓存
+        - 新鲜的值直接返回
+        - 过期但在 stale 窗口内的旧值直接返回，同时在后台刷新
+        - 未命中时合并并发的加载
+        @param: key 键
+        @param: loader 无参数的协程函数
+        @param: ttl 过期时间(秒)
+        @param: stale_ttl 过期后仍可返回旧值的时间(秒)
+        @param: tags 标签
+        @return: Any 值
+        """
+        if not self.enabled:
+            return await loader()
+        entry = await self._lookup(key)
+        if entry is not None:
+            if entry.fresh_until > time.time():
+                return entry.value
+            metrics.inc("cache.stale_served")
+            self._refresh(key, loader, ttl, stale_ttl, tags)
+            return entry.value
+        return await self.flight.do(key, lambda: self._load(key, loader, ttl, stale_ttl, tags))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float],
+                    stale_ttl: Optional[float], tags: Iterable[str]) -> Any:
+        tags = tuple(tags)
+        token = object()
+        self._loading[key] = (tags, token)
+        try:
+            value = await loader()
+        finally:
+            current = self._loading.get(key)
+            if current is not None and current[1] is token:
+                del self._loading[key]
+        if current is not None and current[1] is token:
+            await self.set(key, value, ttl, stale_ttl, tags)
+        else:
+            # 加载期间已失效，值可能是修改前读到的
+            metrics.inc("cache.loads_discarded")
+        return value
+
+    def _abandon_loads(self, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        """
+        放弃与失效的键或标签相关的进行中加载：结果不写入缓存，新的调用不再合并到这些加载
+        """
+        if not self._loading:
+            return
+        affected = [key for key in keys if key in self._loading]
+        tags = set(tags)
+        if tags:
+            affected.extend(key for key, (load_tags, _) in self._loading.items() if tags.intersection(load_tags))
+        for key in affected:
+            self._loading.pop(key, None)
+            self.flight.forget(key)
+
+    def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float],
+                 stale_ttl: Optional[float], tags: Iterable[str]) -> None:
+        """
+        后台刷新，同一个键同时只刷新一次
+        """
+        if key in self.flight:
+            return
+
+        def done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                metrics.inc("cache.refresh_errors")
+                logger.warning(f"缓存后台刷新失败 {key}: {str(task.exception())}")
+
+        task = asyncio.ensure_future(self.flight.do(key, lambda: self._load(key, loader, ttl, stale_ttl, tags)))
+        task.add_done_callback(done)
+
+    async def _publish(self, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        if not self.enabled or self.local is None:
+            return
+        message = {"origin": self.instance_id, "keys": list(keys), "tags": list(tags)}
+        await self.redis.publish(self.channel, json.dumps(message, ensure_ascii=False))
+
+    async def _apply(self, raw: str) -> None:
+        """
+        处理其他进程发来的失效通知，只删除本进程的 L1
+        """
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning(f"缓存失效通知无效: {raw!r}")
+            return
+        if message.get("origin") == self.instance_id or self.local is None:
+            return
+        self._abandon_loads(message.get("keys", ()), message.get("tags", ()))
+        await self.local.delete(*message.get("keys", ()))
+        await self.local.delete_tags(message.get("tags", ()))
+        metrics.inc("cache.invalidations_received")
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 订阅中断期间其他进程的修改最迟在 L1 过期后可见
+                logger.warning(f"缓存失效订阅中断，1秒后重试: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def start(self) -> None:
+        """
+        订阅失效通知，需在 Redis 初始化后调用；未启用 L1 时无需订阅
+        """
+        if self.enabled and self.local is not None and self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        停止订阅，需在关闭 Redis 前调用
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+def cached(
+    key: Union[str, Callable[..., str]],
+    ttl: Optional[float] = None,
+    stale_ttl: Optional[float] = None,
+    tags: Union[Iterable[str], Callable[..., Iterable[str]]] = (),
+    cache: Optional[TieredCache] = None,
+):
+    """
+    装饰器：缓存异步函数的返回值
+    @param: key 键模板，按参数名格式化，如 "user:{user_id}"；也可以是与被装饰函数参数相同的函数
+    @param: ttl 过期时间(秒)
+    @param: stale_ttl 过期后仍可返回旧值的时间(秒)
+    @param: tags 标签，可以是模板列表(如 ["user:{user_id}"])或与被装饰函数参数相同的函数
+    @param: cache 使用的缓存，默认为全局缓存
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def arguments(args, kwargs) -> Dict[str, Any]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound.arguments
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            target = cache or default_cache
+            if callable(key):
+                cache_key = key(*args, **kwargs)
+            else:
+                cache_key = key.format(**arguments(args, kwargs))
+            if callable(tags):
+                entry_tags = tuple(tags(*args, **kwargs))
+            elif tags:
+                values = arguments(args, kwargs)
+                entry_tags = tuple(tag.format(**values) for tag in tags)
+            else:
+                entry_tags = ()
+            return await target.get_or_load(cache_key, lambda: func(*args, **kwargs), ttl, stale_ttl, entry_tags)
+
+        return wrapper
+    return decorator
+
+
+# 创建全局缓存实例
+default_cache = TieredCache(
+    local=LocalCache(settings.CACHE.LOCAL_TTL, settings.CACHE.LOCAL_MAX_ENTRIES),
+    remote=RedisCache(),
+    ttl=settings.CACHE.DEFAULT_TTL,
+    stale_ttl=settings.CACHE.STALE_TTL,
+    enabled=settings.CACHE.ENABLED,
+    channel=settings.CACHE.INVALIDATION_CHANNEL,
+)
@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Mapping, Optional, Set, TypeVar
+from app.core.request_context import request_scope
+from app.utils.cache import TieredCache
+from app.utils.metrics import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    批量加载(DataLoader)
+    同一轮事件循环中的 load(key) 调用收集起来，由 batch_load 一次查询完成(如 WHERE id IN (...))；
+    同一个 loader 内相同的键只加载一次。loader 应按请求创建，见 request_loader
+    可选跨请求缓存：先批量查缓存(L2 一次 MGET)，只加载未命中的键，结果用管道一次写回；
+    使用 Redis(L2)时值需可以JSON序列化
+    """
+    def __init__(
+        self,
+        batch_load: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+        max_batch_size: int = 1000,
+        cache: Optional[TieredCache] = None,
+        cache_key: Callable[[K], str] = str,
+        cache_tags: Optional[Callable[[K], Iterable[str]]] = None,
+        ttl: Optional[float] = None,
+        name: str = "dataloader",
+    ):
+        """
+        初始化批量加载
+        @param: batch_load 批量加载函数，返回 键 -> 值，缺少的键视为 None
+        @param: max_batch_size 单次批量加载的最大键数
+        @param: cache 跨请求缓存，为空时不使用
+        @param: cache_key 缓存键
+        @param: cache_tags 缓存标签，用于按标签失效
+        @param: ttl 缓存过期时间(秒)
+        @param: name 指标名前缀
+        """
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self.cache_key = cache_key
+        self.cache_tags = cache_tags
+        self.ttl = ttl
+        self.name = name
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+        # 进行中的批量加载任务，事件循环只保留弱引用，需持有到完成
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """
+        加载一个键，本轮事件循环结束后与其他键一起批量加载
+        @param: key 键
+        @return: Future 可等待的结果，不存在时为 None
+        """
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        if not self._pending:
+            # 排在已就绪的回调之后，同一轮中其他协程的 load 都能赶上这一批
+            loop.call_soon(self._dispatch)
+        self._pending.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """
+        加载多个键
+        @param: keys 键
+        @return: List[Optional[V]] 与键顺序一致的值
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """
+        预先放入已知的值，之后的 load 不再查询
+        """
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: K) -> None:
+        """
+        清除一个键的结果(数据修改后)，不影响跨请求缓存
+        """
+        self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(self._load_batch(keys[start:start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, keys: List[K]) -> None:
+        metrics.inc(f"{self.name}.batches")
+        metrics.inc(f"{self.name}.keys", len(keys))
+        try:
+            values: Dict[K, Any] = {}
+            missing = keys
+            if self.cache is not None:
+                cache_keys = {key: self.cache_key(key) for key in keys}
+                cached = await self.cache.get_many(cache_keys.values())
+                missing = []
+                for key in keys:
+                    value = cached.get(cache_keys[key])
+                    if value is None:
+                        missing.append(key)
+                    else:
+                        values[key] = value
+            if missing and self.cache is None:
+                values.update(await self.batch_load(missing))
+            elif missing:
+                values.update(await self._load_and_cache(missing, cache_keys))
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+    async def _load_and_cache(self, keys: List[K], cache_keys: Dict[K, str]) -> Dict[K, Any]:
+        """
+        加载未命中的键并写入缓存，加载期间被失效的键不写入
+        """
+        by_cache_key = {cache_keys[key]: key for key in keys}
+        tags = {
+            cache_keys[key]: tuple(self.cache_tags(key)) if self.cache_tags is not None else ()
+            for key in keys
+        }
+
+        async def load() -> Dict[str, Any]:
+            loaded = await self.batch_load(keys)
+            return {cache_key: loaded[key] for cache_key, key in by_cache_key.items() if key in loaded}
+
+        loaded = await self.cache.load_many(tags, load, ttl=self.ttl)
+        return {by_cache_key[cache_key]: value for cache_key, value in loaded.items()}
+
+
+def request_loader(name: str, factory: Callable[[], DataLoader]) -> DataLoader:
+    """
+    获取当前请求的 loader，同一请求内共用，请求结束后随 scope 释放；不在请求中时每次新建
+    @param: name loader 名称
+    @param: factory 创建 loader 的函数
+    @return: DataLoader
+    """
+    scope = request_scope.get()
+    if scope is None:
+        return factory()
+    loaders = scope.setdefault("loaders", {})
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = factory()
+    return loader
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import re
+import sys
+import time
+from typing import Optional
+from tortoise import connections
+from tortoise.exceptions import OperationalError
+from app.core.config import settings
+from app.core.exceptions import DatabaseTimeoutException
+from app.core.request_context import db_time_remaining, route_label
+from app.utils.metrics import metrics
+from app.utils.tracing import KIND_CLIENT, tracer
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 需要接管的连接方法
+EXECUTE_METHODS = ("execute_insert", "execute_many", "execute_query", "execute_query_dict", "execute_script")
+# 慢查询日志中 SQL 的最大长度
+MAX_SHAPE_LENGTH = 500
+# 服务端超时取消语句时的错误信息(PostgreSQL)
+SERVER_TIMEOUT_MESSAGES = ("statement timeout", "lock timeout")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%s")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def sql_shape(sql: str) -> str:
+    """
+    SQL 归一化：字面量和占位符替换为 ?，IN 列表和多行 VALUES 折叠，用于日志聚合且不泄露参数
+    @param: sql 原始SQL
+    @return: str 归一化后的SQL
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _VALUE_LIST.sub("(...)", shape)
+    shape = re.sub(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+", "(...), ...", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    if len(shape) > MAX_SHAPE_LENGTH:
+        shape = shape[:MAX_SHAPE_LENGTH] + "..."
+    return shape
+
+
+def query_timeout() -> Optional[float]:
+    """
+    本次查询的客户端超时：单次查询超时与请求剩余时间取较小值
+    @return: Optional[float] 超时秒数，None 表示不限制
+    @exception: DatabaseTimeoutException 请求的数据库时间已用尽
+    """
+    timeout = settings.DB_QUERY.TIMEOUT or None
+    remaining = db_time_remaining()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        metrics.inc("db.deadline_exceeded")
+        raise DatabaseTimeoutException(detail="请求的数据库时间已用尽")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _instrument(method):
+    """
+    包装连接的执行方法：施加超时，记录慢查询，采样的请求中记录 span
+    """
+    @functools.wraps(method)
+    async def wrapper(self, query: str, *args, **kwargs):
+        with tracer.span("db.query", KIND_CLIENT) as span:
+            if span.recording:
+                span.set_attribute("db.system", self.capabilities.dialect)
+                span.set_attribute("db.operation", method.__name__)
+                span.set_attribute("db.statement", sql_shape(query))
+            timeout = query_timeout()
+            start = time.perf_counter()
+            try:
+                if timeout is None:
+                    return await method(self, query, *args, **kwargs)
+                return await asyncio.wait_for(method(self, query, *args, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                metrics.inc("db.timeouts")
+                logger.warning(f"数据库查询超时({timeout:.3f}s): 路由={route_label()} SQL={sql_shape(query)}")
+                raise DatabaseTimeoutException(detail=f"查询超过 {timeout:.3f} 秒")
+            except OperationalError as e:
+                if any(message in str(e) for message in SERVER_TIMEOUT_MESSAGES):
+                    metrics.inc("db.timeouts")
+                    logger.warning(f"数据库语句被服务端取消: 路由={route_label()} SQL={sql_shape(query)} 原因={str(e)}")
+                    raise DatabaseTimeoutException(detail=str(e))
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                metrics.observe("db.query_ms", elapsed_ms)
+                if elapsed_ms >= settings.DB_QUERY.SLOW_THRESHOLD_MS:
+                    metrics.inc("db.slow_queries")
+                    logger.warning(f"慢查询 {elapsed_ms:.1f}ms: 路由={route_label()} SQL={sql_shape(query)}")
+
+    wrapper.__db_monitor__ = True
+    return wrapper
+
+
+def instrument_client_class(cls: type) -> None:
+    """
+    接管连接类及其事务包装类的执行方法，重复调用无副作用
+    事务包装类继承连接类，但会覆盖部分方法(如 execute_many)，需要单独处理
+    @param: cls Tortoise 连接类
+    """
+    classes = [cls]
+    wrapper_cls = getattr(sys.modules[cls.__module__], "TransactionWrapper", None)
+    if wrapper_cls is not None:
+        classes.append(wrapper_cls)
+    for target in classes:
+        for name in EXECUTE_METHODS:
+            method = target.__dict__.get(name)
+            if method is None or getattr(method, "__db_monitor__", False):
+                continue
+            setattr(target, name, _instrument(method))
+
+
+def instrument_connections() -> None:
+    """
+    为已初始化的所有数据库连接启用查询超时和慢查询日志，在 Tortoise.init 之后调用
+    """
+    for connection in connections.all():
+        instrument_client_class(type(connection))
+    logger.debug(
+        f"数据库查询监控已启用: 单次超时 {settings.DB_QUERY.TIMEOUT}s, "
+        f"请求截止 {settings.DB_QUERY.REQUEST_DEADLINE}s, 慢查询阈值 {settings.DB_QUERY.SLOW_THRESHOLD_MS}ms"
+    )
@@ -0,0 +1,62 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    获取共享线程池，用于 bcrypt 等会释放GIL的阻塞调用
+    大小由 WORKERS_THREAD_POOL_SIZE 决定，0 表示按CPU核数自动选择
+    @return: ThreadPoolExecutor 线程池
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        size = settings.WORKERS.THREAD_POOL_SIZE or min(32, (os.cpu_count() or 1) + 4)
+        _thread_pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="app-worker")
+    return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    获取共享进程池，用于批量导入等CPU密集型任务
+    大小由 WORKERS_PROCESS_POOL_SIZE 决定，0 表示按CPU核数自动选择
+    @return: ProcessPoolExecutor 进程池
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.WORKERS.PROCESS_POOL_SIZE or os.cpu_count())
+    return _process_pool
+
+
+async def run_in_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    在共享线程池中执行阻塞函数，不阻塞事件循环
+    @param: func 阻塞函数
+    @param: args 位置参数
+    @param: kwargs 关键字参数
+    @return: T 函数返回值
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_thread_pool(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """
+    关闭共享线程池和进程池
+    @param: wait 是否等待未完成的任务
+    """
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=wait)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=wait)
+        _process_pool = None
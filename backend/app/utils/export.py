@@ -0,0 +1,148 @@
+import csv
+import importlib.util
+import io
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+# 以这些字符开头的单元格会被表格软件当作公式执行
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class CsvEncoder:
+    """
+    增量 CSV 编码：每次只编码一批行，首批前输出表头
+    以公式字符开头的文本前加单引号，防止在表格软件中打开时执行公式(CSV 注入)
+    """
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns: Sequence[str]):
+        """
+        初始化编码器
+        @param: columns 列名
+        """
+        self.columns = list(columns)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow(self.columns)
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        编码一批行
+        @param: rows 行，列顺序与 columns 一致
+        @return: bytes 编码后的数据(第一次调用时包含表头)
+        """
+        cell = self._cell
+        self._writer.writerows([cell(value) for value in row] for row in rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        """
+        结束编码
+        @return: bytes 剩余数据，没有任何行时为表头
+        """
+        return self._drain()
+
+
+class _ChunkSink:
+    """
+    收集 ParquetWriter 写出的数据，每批行编码后取出，不在内存中保留整个文件
+    """
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """
+    增量 Parquet 编码：每批行写成一个行组(列式存储，zstd 压缩)，需要安装 pyarrow
+    pyarrow 在创建编码器时才导入，不导出 Parquet 的进程不加载
+    """
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns: Sequence[str], types: Dict[str, str]):
+        """
+        初始化编码器
+        @param: columns 列名
+        @param: types 列名 -> 类型(int/str/bool/datetime)
+        """
+        import pyarrow
+        import pyarrow.parquet
+        self._pyarrow = pyarrow
+        type_map = {
+            "int": pyarrow.int64(),
+            "str": pyarrow.string(),
+            "bool": pyarrow.bool_(),
+            "datetime": pyarrow.timestamp("us", tz="UTC"),
+        }
+        self.columns = list(columns)
+        self.schema = pyarrow.schema([(column, type_map[types[column]]) for column in self.columns])
+        self._sink = _ChunkSink()
+        self._writer: Optional[Any] = pyarrow.parquet.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        编码一批行
+        @param: rows 行，列顺序与 columns 一致
+        @return: bytes 编码后的数据
+        """
+        pyarrow = self._pyarrow
+        if rows:
+            arrays = [
+                pyarrow.array([row[index] for row in rows], type=field.type)
+                for index, field in enumerate(self.schema)
+            ]
+            self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        """
+        结束编码，写出文件尾(元数据)
+        @return: bytes 剩余数据
+        """
+        self._writer.close()
+        return self._sink.drain()
+
+
+def parquet_available() -> bool:
+    """
+    是否支持 Parquet 导出
+    @return: bool 是否已安装 pyarrow
+    """
+    return importlib.util.find_spec("pyarrow") is not None
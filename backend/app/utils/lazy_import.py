@@ -0,0 +1,44 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule(ModuleType):
+    """
+    延迟导入的模块代理
+    第一次访问属性时才真正导入目标模块，用于减少应用启动时的导入耗时
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> ModuleType:
+        """
+        导入目标模块
+        @return: ModuleType 真实模块对象
+        """
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, item: str):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    延迟导入模块
+    若模块已被导入则直接返回真实模块，否则返回延迟代理
+    @param: name 模块全名，如 "jose.jwt"
+    @return: ModuleType 模块或延迟代理
+    """
+    module: Optional[ModuleType] = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -1,31 +1,93 @@
+import atexit
 import logging
 import os
+import queue
 import sys
-import colorlog
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# 彩色控制台格式
+CONSOLE_FORMAT = '%(log_color)s%(asctime)s - %(levelname)s - [%(filename)s-%(lineno)s] - [%(funcName)s]  - %(message)s%(reset)s'
+# 文件日志格式
+FILE_FORMAT = '%(asctime)s - %(levelname)s - [%(filename)s-%(lineno)s] - [%(funcName)s] - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_COLORS = {
+    'DEBUG': 'cyan',
+    'INFO': 'green',
+    'WARNING': 'yellow',
+    'ERROR': 'red',
+    'CRITICAL': 'red,bg_white',
+}
+
+
+class LazyFileHandler(logging.FileHandler):
+    """
+    延迟创建的文件处理器
+    日志目录和文件在第一条日志写入时才创建，避免导入时的文件系统副作用
+    """
+    def __init__(self, filename: str, encoding: str = 'utf-8'):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        """
+        打开日志文件，必要时创建日志目录
+        @return: 文件流对象
+        """
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class LazyColoredFormatter(logging.Formatter):
+    """
+    延迟加载 colorlog 的彩色格式化器
+    colorlog 在第一次格式化日志时才导入
+    """
+    def __init__(self):
+        super().__init__(datefmt=DATE_FORMAT)
+        self._formatter = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        格式化日志记录
+        @param: record 日志记录
+        @return: str 格式化后的日志
+        """
+        if self._formatter is None:
+            import colorlog
+            self._formatter = colorlog.ColoredFormatter(
+                CONSOLE_FORMAT,
+                datefmt=DATE_FORMAT,
+                log_colors=LOG_COLORS
+            )
+        return self._formatter.format(record)
+
 
 class logServer:
     _instance = None
+    _initialized = False
+    _listeners = []
 
     def __init__(self):
+        # 单例只初始化一次，避免每个模块导入时重复计算路径
+        if self._initialized:
+            return
         # 如果是打包的可执行文件，获取当前可执行文件的路径
         if getattr(sys, 'frozen', False):
             # 打包后的路径
             executable_path = os.path.dirname(os.path.abspath(sys.executable))
         else:
             # 未打包时，获取当前脚本路径的上层文件夹
-            executable_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  
+            executable_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         # 将反斜杠替换为正斜杠
         executable_path = executable_path.replace('\\', '/')
-        # 定位到日志文件夹
-        logs_folder = os.path.join(executable_path, "logs")
-        if not os.path.exists(logs_folder):
-            os.makedirs(logs_folder)
+        # 定位到日志文件夹，目录在第一次写日志时创建
+        self.logs_folder = os.path.join(executable_path, "logs")
 
         current_time = datetime.now().strftime('%Y%m%d_%H%M')  # 获取当前时间
-        self.filename = os.path.join(logs_folder, f'日记记录_{current_time}.log')
-        if not os.path.exists(logs_folder):
-            os.makedirs(logs_folder)
+        self.filename = os.path.join(self.logs_folder, f'日记记录_{current_time}.log')
+        self.access_filename = os.path.join(self.logs_folder, f'访问日志_{current_time}.jsonl')
+        self.trace_filename = os.path.join(self.logs_folder, f'链路追踪_{current_time}.jsonl')
+        self.__class__._initialized = True
 
     def __new__(cls, *args, **kw):
         if cls._instance is None:
@@ -38,8 +100,8 @@ class logServer:
         logger.setLevel(logging.DEBUG)  # 设置日志级别
         # 检查是否已经有文件处理器和流处理器被添加
         if not logger.handlers:  # 如果没有处理器被添加
-            # 创建一个文件处理器，用于写入日志文件
-            file_handler = logging.FileHandler(self.filename, encoding='utf-8')
+            # 创建一个文件处理器，用于写入日志文件（首次写入时才创建文件）
+            file_handler = LazyFileHandler(self.filename, encoding='utf-8')
             file_handler.setLevel(logging.DEBUG)  # 修改为 DEBUG，记录所有级别的日志
 
             # 创建一个流处理器，用于输出到控制台
@@ -47,27 +109,74 @@ class logServer:
             console_handler.setLevel(logging.DEBUG)  # 控制台输出所有级别的日志
 
             # 创建日志格式
-            formatter = logging.Formatter(
-                f'%(asctime)s - %(levelname)s - [%(filename)s-%(lineno)s] - [%(funcName)s] - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S')
-            console_handler.setFormatter(colorlog.ColoredFormatter(
-                '%(log_color)s%(asctime)s - %(levelname)s - [%(filename)s-%(lineno)s] - [%(funcName)s]  - %(message)s%(reset)s',
-                datefmt='%Y-%m-%d %H:%M:%S',
-                log_colors={
-                    'DEBUG': 'cyan',
-                    'INFO': 'green',
-                    'WARNING': 'yellow',
-                    'ERROR': 'red',
-                    'CRITICAL': 'red,bg_white',
-                }
-            ))
+            formatter = logging.Formatter(FILE_FORMAT, datefmt=DATE_FORMAT)
+            console_handler.setFormatter(LazyColoredFormatter())
             file_handler.setFormatter(formatter)
 
-            # 将处理器添加到 logger
-            logger.addHandler(file_handler)
-            logger.addHandler(console_handler)
+            self._attach_queue(logger, file_handler, console_handler)
         return logger
 
+    def access(self):
+        """
+        访问日志 logger：每条日志是一行JSON，单独写入 访问日志_*.jsonl，不输出到控制台
+        @return: logging.Logger 访问日志 logger
+        """
+        return self._json_lines('访问日志', self.access_filename)
+
+    def trace(self):
+        """
+        链路追踪 logger：每个 span 是一行JSON，单独写入 链路追踪_*.jsonl，不输出到控制台
+        @return: logging.Logger 链路追踪 logger
+        """
+        return self._json_lines('链路追踪', self.trace_filename)
+
+    def _json_lines(self, name: str, filename: str) -> logging.Logger:
+        """
+        创建只写入 JSON Lines 文件的 logger，经队列写入
+        @param: name logger 名称
+        @param: filename 文件路径
+        @return: logging.Logger
+        """
+        logger = logging.getLogger(name)
+        if not logger.handlers:
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            file_handler = LazyFileHandler(filename, encoding='utf-8')
+            file_handler.setFormatter(logging.Formatter('%(message)s'))
+            self._attach_queue(logger, file_handler)
+        return logger
+
+    def _attach_queue(self, logger: logging.Logger, *handlers: logging.Handler) -> None:
+        """
+        日志先放入队列，由后台线程写入各处理器，记录日志不会阻塞事件循环
+        @param: logger 目标 logger
+        @param: handlers 实际写入的处理器
+        """
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        if not self.__class__._listeners:
+            # 进程退出时处理完队列中剩余的日志
+            atexit.register(self.stop)
+        self.__class__._listeners.append(listener)
+        logger.addHandler(QueueHandler(log_queue))
+
+    def stop(self):
+        """
+        停止后台日志线程，写完队列中剩余的日志
+        之后的日志不再经过队列，直接写入处理器；应用关闭时最后调用，重复调用无副作用
+        """
+        listeners, self.__class__._listeners = self.__class__._listeners, []
+        loggers = [item for item in logging.root.manager.loggerDict.values() if isinstance(item, logging.Logger)]
+        for listener in listeners:
+            listener.stop()
+            # 共用队列处理器的 logger(如 uvicorn)一并切换为直接写入
+            for item in loggers:
+                if any(isinstance(h, QueueHandler) and h.queue is listener.queue for h in item.handlers):
+                    item.handlers = [
+                        h for h in item.handlers if not (isinstance(h, QueueHandler) and h.queue is listener.queue)
+                    ] + list(listener.handlers)
+
 if __name__ == '__main__':
     logger = logServer().run()
     # 测试日志
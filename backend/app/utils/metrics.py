@@ -0,0 +1,67 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """
+    进程内指标收集器
+    计数器只增不减，汇总指标记录次数、总和和最大值
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, list] = {}
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        """
+        增加计数器
+        @param: name 指标名
+        @param: value 增量
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        设置瞬时值
+        @param: name 指标名
+        @param: value 当前值
+        """
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        记录一次观测值
+        @param: name 指标名
+        @param: value 观测值
+        """
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = [1, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                if value > summary[2]:
+                    summary[2] = value
+
+    def snapshot(self) -> dict:
+        """
+        获取所有指标的快照
+        @return: dict 指标数据
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {
+                    name: {"count": count, "sum": total, "max": maximum}
+                    for name, (count, total, maximum) in self._summaries.items()
+                }
+            }
+
+
+# 创建全局指标实例
+metrics = Metrics()
@@ -0,0 +1,226 @@
+import asyncio
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from app.utils.metrics import metrics
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# 事件循环延迟直方图的桶上界(毫秒)，最后一个桶为 +Inf
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+# 事件循环延迟的采样间隔(秒)
+LAG_SAMPLE_INTERVAL = 0.01
+# 任务快照中每个任务最多保留的栈帧数
+TASK_STACK_LIMIT = 10
+
+
+def _path_roots() -> List[str]:
+    """
+    用于缩短文件路径的前缀，较长的优先，site-packages 中的路径也尽量缩短
+    """
+    return sorted({p for p in sys.path if p and os.path.isdir(p)}, key=len, reverse=True)
+
+
+def _short_path(filename: str, roots: List[str]) -> str:
+    for root in roots:
+        if filename.startswith(root):
+            return filename[len(root):].lstrip(os.sep)
+    return filename
+
+
+class StackSampler:
+    """
+    采样分析器：后台线程按固定间隔读取各线程当前的调用栈，统计折叠栈
+    输出格式为 "线程;外层函数;...;内层函数 次数"，可直接交给 flamegraph.pl / speedscope
+    只读取栈帧，不修改解释器状态，不需要重启进程
+    """
+    def __init__(self, interval: float, all_threads: bool = True):
+        """
+        初始化采样分析器
+        @param: interval 采样间隔(秒)
+        @param: all_threads 是否采样所有线程，否则只采样事件循环线程
+        """
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._roots = _path_roots()
+        self._target_ident = threading.get_ident()
+        self._stop = threading.Event()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = _short_path(code.co_filename, self._roots)
+            label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int, thread_names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or (not self.all_threads and ident != self._target_ident):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            name = thread_names.get(ident) or f"thread-{ident}"
+            stack.append(name.replace(";", ":").replace(" ", "_"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> None:
+        """
+        在当前线程中采样，直到时间到或被停止
+        @param: seconds 采样时长(秒)
+        """
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample(own_ident, thread_names)
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def collapsed(self) -> str:
+        """
+        折叠栈文本，按次数降序
+        @return: str 每行 "栈 次数"
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class LagHistogram:
+    """
+    事件循环延迟直方图：协程按固定间隔休眠，实际唤醒比预期晚的时间计入直方图
+    """
+    def __init__(self, buckets=LAG_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.samples = 0
+
+    def observe(self, lag_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, lag_ms)] += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+        self.total_ms += lag_ms
+        self.samples += 1
+
+    async def run(self, seconds: float, interval: float = LAG_SAMPLE_INTERVAL) -> None:
+        """
+        采样事件循环延迟
+        @param: seconds 采样时长(秒)
+        @param: interval 采样间隔(秒)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while loop.time() < deadline:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.observe(max(0.0, (loop.time() - start - interval) * 1000))
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "samples": self.samples,
+            "max_ms": round(self.max_ms, 3),
+            "mean_ms": round(self.total_ms / self.samples, 3) if self.samples else 0.0,
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+
+def dump_tasks(limit: int = TASK_STACK_LIMIT) -> List[Dict[str, Any]]:
+    """
+    当前事件循环中所有任务的快照，需在事件循环中调用
+    @param: limit 每个任务最多保留的栈帧数
+    @return: List[Dict[str, Any]] 任务名、协程、状态和挂起位置(外层在前)
+    """
+    tasks = []
+    roots = _path_roots()
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        stack = [
+            f"{frame.f_code.co_name} ({_short_path(frame.f_code.co_filename, roots)}:{frame.f_lineno})"
+            for frame in task.get_stack(limit=limit)
+        ]
+        tasks.append({
+            "name": task.get_name(),
+            "coro": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "cancelled": task.cancelled(),
+            "stack": stack,
+        })
+    tasks.sort(key=lambda item: item["coro"])
+    return tasks
+
+
+class Profiler:
+    """
+    按需性能分析，同一进程同时只允许一次
+    在请求所在的 worker 进程中采样调用栈和事件循环延迟，结束时附带任务快照
+    """
+    def __init__(self):
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def profile(self, seconds: float, interval: float, all_threads: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        采样指定时长，需在事件循环中调用
+        采样线程为独立线程，不占用共享线程池
+        @param: seconds 采样时长(秒)
+        @param: interval 调用栈采样间隔(秒)
+        @param: all_threads 是否采样所有线程
+        @return: Optional[Dict[str, Any]] 分析结果，已有分析在进行时为None
+        """
+        if self._running:
+            return None
+        self._running = True
+        loop = asyncio.get_running_loop()
+        sampler = StackSampler(interval, all_threads=all_threads)
+        histogram = LagHistogram()
+        done = loop.create_future()
+
+        def target():
+            try:
+                sampler.run(seconds)
+            finally:
+                loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        thread = threading.Thread(target=target, name="profiler", daemon=True)
+        start = time.perf_counter()
+        logger.info(f"开始性能分析: 进程 {os.getpid()}, 时长 {seconds}s, 采样间隔 {interval * 1000:.1f}ms")
+        try:
+            thread.start()
+            await asyncio.gather(done, histogram.run(seconds))
+        finally:
+            sampler.stop()
+            self._running = False
+        elapsed = time.perf_counter() - start
+        metrics.inc("profiler.runs")
+        logger.info(f"性能分析完成: {sampler.samples} 次采样, 耗时 {elapsed:.2f}s")
+        return {
+            "pid": os.getpid(),
+            "duration_seconds": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "samples": sampler.samples,
+            "collapsed": sampler.collapsed(),
+            "loop_lag": histogram.to_dict(),
+            "tasks": dump_tasks(),
+        }
+
+
+# 创建性能分析实例
+profiler = Profiler()
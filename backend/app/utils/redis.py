@@ -1,7 +1,10 @@
-from typing import Optional, Any
+import asyncio
+from typing import Awaitable, Dict, List, Optional, Any, Set, Tuple
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.request_context import request_time_remaining
 from app.utils.log_server import logServer
+from app.utils.tracing import KIND_CLIENT, tracer
 
 logger = logServer().run()
 
@@ -28,12 +31,17 @@ class RedisClient:
         @exception: Exception Redis连接异常
         """
         try:
+            pool = settings.REDIS_POOL
             self._client = redis.Redis(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
                 password=settings.REDIS_PASSWORD,
-                decode_responses=True
+                decode_responses=True,
+                max_connections=pool.MAX_CONNECTIONS,
+                socket_timeout=pool.SOCKET_TIMEOUT,
+                socket_connect_timeout=pool.SOCKET_CONNECT_TIMEOUT,
+                health_check_interval=pool.HEALTH_CHECK_INTERVAL
             )
             await self._client.ping()
             logger.info("Redis连接成功")
@@ -50,17 +58,49 @@ class RedisClient:
             await self._client.close()
             logger.info("Redis连接已关闭")
 
-    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+    @staticmethod
+    async def _call(command: str, awaitable: Awaitable) -> Any:
+        """
+        执行Redis命令，不超过当前请求的剩余时间，采样的请求中记录 span
+        @param: command 命令名称，用于 span
+        @param: awaitable Redis命令
+        @return: Any 命令结果
+        @exception: asyncio.TimeoutError 请求截止时间已到
+        """
+        with tracer.span(f"redis.{command}", KIND_CLIENT) as span:
+            if span.recording:
+                span.set_attribute("db.system", "redis")
+                span.set_attribute("db.operation", command)
+            remaining = request_time_remaining()
+            if remaining is None:
+                return await awaitable
+            if remaining <= 0:
+                awaitable.close()
+                raise asyncio.TimeoutError("请求截止时间已到")
+            return await asyncio.wait_for(awaitable, remaining)
+
+    async def ping(self) -> bool:
+        """
+        检查连接，连接池中没有空闲连接时会新建连接
+        @return: bool 是否可用
+        """
+        try:
+            return bool(await self._call("PING", self._client.ping()))
+        except Exception as e:
+            logger.error(f"Redis PING失败: {str(e)}")
+            return False
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None, nx: bool = False) -> bool:
         """
         设置键值对
         @param: key 键
         @param: value 值
         @param: expire 过期时间(秒)
-        @return: bool 是否成功
+        @param: nx 仅在键不存在时设置
+        @return: bool 是否成功，nx 时键已存在返回False
         """
         try:
-            await self._client.set(key, value, ex=expire)
-            return True
+            return bool(await self._call("SET", self._client.set(key, value, ex=expire, nx=nx)))
         except Exception as e:
             logger.error(f"Redis设置键值对失败: {str(e)}")
             return False
@@ -72,19 +112,52 @@ class RedisClient:
         @return: Optional[str] 值
         """
         try:
-            return await self._client.get(key)
+            return await self._call("GET", self._client.get(key))
         except Exception as e:
             logger.error(f"Redis获取键值失败: {str(e)}")
             return None
 
-    async def delete(self, key: str) -> bool:
+    async def mget(self, *keys: str) -> List[Optional[str]]:
         """
-        删除键
-        @param: key 键
+        一次获取多个键值
+        @param: keys 键
+        @return: List[Optional[str]] 与键顺序一致的值，失败时全部为None
+        """
+        if not keys:
+            return []
+        try:
+            return await self._call("MGET", self._client.mget(keys))
+        except Exception as e:
+            logger.error(f"Redis批量获取键值失败: {str(e)}")
+            return [None] * len(keys)
+
+    def pipeline(self) -> redis.client.Pipeline:
+        """
+        创建管道(非事务)，命令在 execute_pipeline 时一次发送
+        @return: Pipeline 管道对象
+        """
+        return self._client.pipeline(transaction=False)
+
+    async def execute_pipeline(self, pipeline: redis.client.Pipeline) -> List[Any]:
+        """
+        执行管道中的命令，一次往返
+        @param: pipeline 管道对象
+        @return: List[Any] 与命令顺序一致的结果，失败时为空列表
+        """
+        try:
+            return await self._call("PIPELINE", pipeline.execute())
+        except Exception as e:
+            logger.error(f"Redis执行管道失败: {str(e)}")
+            return []
+
+    async def delete(self, *keys: str) -> bool:
+        """
+        删除键，支持一次删除多个
+        @param: keys 键
         @return: bool 是否成功
         """
         try:
-            await self._client.delete(key)
+            await self._call("DEL", self._client.delete(*keys))
             return True
         except Exception as e:
             logger.error(f"Redis删除键失败: {str(e)}")
@@ -97,7 +170,246 @@ class RedisClient:
         @return: bool 是否存在
         """
         try:
-            return bool(await self._client.exists(key))
+            return bool(await self._call("EXISTS", self._client.exists(key)))
         except Exception as e:
             logger.error(f"Redis检查键失败: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+    async def incr(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        自增计数器
+        @param: key 键
+        @param: amount 增量
+        @return: Optional[int] 自增后的值，失败时为None
+        """
+        try:
+            return await self._call("INCR", self._client.incr(key, amount))
+        except Exception as e:
+            logger.error(f"Redis自增失败: {str(e)}")
+            return None
+
+    async def sadd(self, key: str, *members: str) -> bool:
+        """
+        向集合添加成员
+        @param: key 键
+        @param: members 成员
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("SADD", self._client.sadd(key, *members))
+            return True
+        except Exception as e:
+            logger.error(f"Redis添加集合成员失败: {str(e)}")
+            return False
+
+    async def smembers(self, key: str) -> Set[str]:
+        """
+        获取集合全部成员
+        @param: key 键
+        @return: Set[str] 成员，失败时为空集合
+        """
+        try:
+            return await self._call("SMEMBERS", self._client.smembers(key))
+        except Exception as e:
+            logger.error(f"Redis获取集合成员失败: {str(e)}")
+            return set()
+
+    async def ttl(self, key: str) -> Optional[int]:
+        """
+        获取键的剩余过期时间
+        @param: key 键
+        @return: Optional[int] 剩余秒数，-1 表示不过期，-2 表示不存在，失败时为None
+        """
+        try:
+            return await self._call("TTL", self._client.ttl(key))
+        except Exception as e:
+            logger.error(f"Redis获取过期时间失败: {str(e)}")
+            return None
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """
+        设置键的过期时间
+        @param: key 键
+        @param: seconds 过期时间(秒)
+        @return: bool 是否成功
+        """
+        try:
+            return bool(await self._call("EXPIRE", self._client.expire(key, seconds)))
+        except Exception as e:
+            logger.error(f"Redis设置过期时间失败: {str(e)}")
+            return False
+
+    async def publish(self, channel: str, message: str) -> bool:
+        """
+        发布消息
+        @param: channel 频道
+        @param: message 消息
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("PUBLISH", self._client.publish(channel, message))
+            return True
+        except Exception as e:
+            logger.error(f"Redis发布消息失败: {str(e)}")
+            return False
+
+    def pubsub(self) -> redis.client.PubSub:
+        """
+        创建订阅对象，订阅期间独占连接池中的一个连接
+        @return: PubSub 订阅对象
+        """
+        return self._client.pubsub()
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        """
+        获取哈希全部字段
+        @param: key 键
+        @return: Dict[str, str] 字段 -> 值，键不存在时为空字典
+        @exception: Exception Redis不可用
+        """
+        return await self._call("HGETALL", self._client.hgetall(key))
+
+    async def hset(self, key: str, mapping: Dict[str, Any]) -> bool:
+        """
+        设置哈希字段
+        @param: key 键
+        @param: mapping 字段 -> 值
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("HSET", self._client.hset(key, mapping=mapping))
+            return True
+        except Exception as e:
+            logger.error(f"Redis设置哈希字段失败: {str(e)}")
+            return False
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """
+        哈希字段自增
+        @param: key 键
+        @param: field 字段
+        @param: amount 增量
+        @return: Optional[int] 自增后的值，失败时为None
+        """
+        try:
+            return await self._call("HINCRBY", self._client.hincrby(key, field, amount))
+        except Exception as e:
+            logger.error(f"Redis哈希字段自增失败: {str(e)}")
+            return None
+
+    async def hdel(self, key: str, *fields: str) -> bool:
+        """
+        删除哈希字段
+        @param: key 键
+        @param: fields 字段
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("HDEL", self._client.hdel(key, *fields))
+            return True
+        except Exception as e:
+            logger.error(f"Redis删除哈希字段失败: {str(e)}")
+            return False
+
+    async def rename(self, source: str, target: str) -> bool:
+        """
+        重命名键，目标键已存在时被原子替换
+        @param: source 原键
+        @param: target 新键
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("RENAME", self._client.rename(source, target))
+            return True
+        except Exception as e:
+            logger.error(f"Redis重命名键失败: {str(e)}")
+            return False
+
+    async def zadd(self, key: str, mapping: Dict[str, float]) -> bool:
+        """
+        向有序集合添加成员
+        @param: key 键
+        @param: mapping 成员 -> 分数
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("ZADD", self._client.zadd(key, mapping))
+            return True
+        except Exception as e:
+            logger.error(f"Redis添加有序集合成员失败: {str(e)}")
+            return False
+
+    async def zscore(self, key: str, member: str) -> Optional[float]:
+        """
+        获取有序集合成员的分数
+        @param: key 键
+        @param: member 成员
+        @return: Optional[float] 分数，成员不存在或失败时为None
+        """
+        try:
+            return await self._call("ZSCORE", self._client.zscore(key, member))
+        except Exception as e:
+            logger.error(f"Redis获取有序集合分数失败: {str(e)}")
+            return None
+
+    async def zrem(self, key: str, *members: str) -> bool:
+        """
+        删除有序集合成员
+        @param: key 键
+        @param: members 成员
+        @return: bool 是否成功
+        """
+        try:
+            await self._call("ZREM", self._client.zrem(key, *members))
+            return True
+        except Exception as e:
+            logger.error(f"Redis删除有序集合成员失败: {str(e)}")
+            return False
+
+    async def zremrangebyscore(self, key: str, minimum: float, maximum: float) -> int:
+        """
+        删除有序集合中分数在范围内的成员
+        @param: key 键
+        @param: minimum 最小分数
+        @param: maximum 最大分数
+        @return: int 删除的成员数，失败时为0
+        """
+        try:
+            return await self._call("ZREMRANGEBYSCORE", self._client.zremrangebyscore(key, minimum, maximum))
+        except Exception as e:
+            logger.error(f"Redis删除有序集合成员失败: {str(e)}")
+            return 0
+
+    async def scan(self, cursor: int = 0, match: Optional[str] = None, count: int = 1000) -> Tuple[int, List[str]]:
+        """
+        增量遍历键，不阻塞 Redis
+        @param: cursor 游标，从0开始
+        @param: match 键模式
+        @param: count 每次遍历的建议数量
+        @return: Tuple[int, List[str]] (下一个游标，遍历完成时为0, 键列表)
+        @exception: Exception Redis命令异常
+        """
+        return await self._call("SCAN", self._client.scan(cursor, match=match, count=count))
+
+    async def memory_usage(self, key: str) -> Optional[int]:
+        """
+        键占用的内存
+        @param: key 键
+        @return: Optional[int] 字节数，键不存在或不支持时为None
+        """
+        try:
+            return await self._call("MEMORY", self._client.memory_usage(key))
+        except Exception as e:
+            logger.debug(f"Redis获取键内存失败: {str(e)}")
+            return None
+
+    async def dbsize(self) -> Optional[int]:
+        """
+        当前数据库的键数量
+        @return: Optional[int] 键数量，失败时为None
+        """
+        try:
+            return await self._call("DBSIZE", self._client.dbsize())
+        except Exception as e:
+            logger.error(f"Redis获取键数量失败: {str(e)}")
+            return None
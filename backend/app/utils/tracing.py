@@ -0,0 +1,303 @@
+import asyncio
+import functools
+import json
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.utils.metrics import metrics
+from app.utils.log_server import logServer
+
+logger = logServer().run()
+
+# span 类型，与 OpenTelemetry SpanKind 对应
+KIND_SERVER = "SERVER"
+KIND_CLIENT = "CLIENT"
+KIND_INTERNAL = "INTERNAL"
+
+# span 状态，与 OpenTelemetry StatusCode 对应
+STATUS_UNSET = "UNSET"
+STATUS_ERROR = "ERROR"
+
+# W3C Trace Context: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# 当前 span，未采样时为空，子 span 直接返回不记录的 span
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    解析 W3C traceparent 请求头
+    @param: value 请求头的值
+    @return: Optional[Tuple[str, str, bool]] (trace_id, 上游 span_id, 是否采样)，无效时为None
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """
+    记录中的 span，字段与 OpenTelemetry 数据模型一致
+    作为上下文管理器使用时成为当前 span，退出时结束并导出；也可以不进入上下文，手动调用 end()
+    """
+    __slots__ = (
+        "tracer", "name", "kind", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "events", "status", "_token",
+    )
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, kind: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_UNSET
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        """
+        传给下游的 W3C traceparent
+        """
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """
+        记录异常事件并将状态设为错误
+        @param: exc 异常
+        """
+        self.status = STATUS_ERROR
+        self.events.append({
+            "name": "exception",
+            "timestamp": time.time_ns(),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def end(self) -> None:
+        """
+        结束并导出，重复调用无副作用
+        """
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出格式，与 OpenTelemetry ConsoleSpanExporter 的 JSON 一致，附加毫秒耗时
+        """
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "kind": self.kind,
+            "parent_id": self.parent_id,
+            "start_time": self.start_ns,
+            "end_time": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": {"status_code": self.status},
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+
+
+class NonRecordingSpan:
+    """
+    未采样时返回的 span，所有操作为空，全局共用一个实例
+    """
+    __slots__ = ()
+    recording = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "NonRecordingSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = NonRecordingSpan()
+
+
+class InMemorySpanExporter:
+    """
+    内存导出器，用于测试
+    """
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        return list(self.spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileSpanExporter:
+    """
+    文件导出器，每个 span 一行JSON，经日志队列写入 链路追踪_*.jsonl，不阻塞事件循环
+    """
+    def __init__(self):
+        self.logger = logServer().trace()
+
+    def export(self, span: Span) -> None:
+        self.logger.info(json.dumps(span.to_dict(), ensure_ascii=False, separators=(",", ":"), default=str))
+
+
+class Tracer:
+    """
+    链路追踪，入口处(头部)决定是否采样：
+    - 上游传入 traceparent 时沿用其 trace_id，来自可信代理时还沿用其采样标记
+    - 否则按采样率随机决定
+    未采样的请求中不创建 span，埋点只多一次 ContextVar 读取
+    """
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.exporter = None
+        self.random: Callable[[], float] = random.random
+
+    def configure(self, sample_rate: float, exporter=None, random_func: Callable[[], float] = random.random) -> None:
+        """
+        配置采样率和导出器，导出器为空时关闭追踪
+        @param: sample_rate 采样率 0~1
+        @param: exporter 导出器，需实现 export(span)
+        @param: random_func 随机数函数
+        """
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.random = random_func
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, kind: str = KIND_SERVER,
+                    attributes: Optional[Dict[str, Any]] = None, trust_sampled: bool = True):
+        """
+        开始一条链路的根 span，在请求入口调用
+        @param: name span 名称
+        @param: traceparent 上游传入的 traceparent
+        @param: kind span 类型
+        @param: attributes 属性
+        @param: trust_sampled 是否沿用 traceparent 的采样标记，否则按采样率决定
+        @return: Span 或 NonRecordingSpan
+        """
+        if self.exporter is None:
+            return NON_RECORDING_SPAN
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = None, None, None
+        if sampled is None or not trust_sampled:
+            sampled = self.sample_rate > 0 and (self.sample_rate >= 1 or self.random() < self.sample_rate)
+        if not sampled:
+            return NON_RECORDING_SPAN
+        metrics.inc("tracing.sampled")
+        return Span(self, name, kind, trace_id or _new_trace_id(), parent_id, attributes)
+
+    def span(self, name: str, kind: str = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        """
+        当前 span 的子 span，当前链路未采样时返回不记录的 span
+        @param: name span 名称
+        @param: kind span 类型
+        @param: attributes 属性
+        @return: Span 或 NonRecordingSpan
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return NON_RECORDING_SPAN
+        return Span(self, name, kind, parent.trace_id, parent.span_id, attributes)
+
+    def export(self, span: Span) -> None:
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(span)
+        except Exception as e:
+            metrics.inc("tracing.export_errors")
+            logger.warning(f"span 导出失败: {str(e)}")
+
+
+# 创建链路追踪实例，由 main 按配置启用
+tracer = Tracer()
+
+
+def current_span():
+    """
+    当前 span
+    @return: Span 或 NonRecordingSpan
+    """
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+def traced(name: str, kind: str = KIND_INTERNAL):
+    """
+    装饰器：函数调用包在 span 中，支持同步和异步函数
+    @param: name span 名称
+    @param: kind span 类型
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import pytest
+from tortoise import Tortoise
+from app.core.permission_cache import permission_cache
+from app.core.permission_registry import permission_registry
+from app.core.user_cache import user_response_cache
+from app.db_migrations.rbac_relations import ensure_relation_indexes
+from app.utils.cache import default_cache
+from app.utils.redis import RedisClient
+
+MODELS = ["app.models.user", "app.models.role", "app.models.permission"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis():
+    """
+    用 fakeredis 替换 Redis 客户端
+    """
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    RedisClient()._client = client
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def db(redis):
+    """
+    内存 SQLite 数据库，每个测试独立；清空上一个测试留下的进程内缓存
+    """
+    await Tortoise.init(config={
+        "connections": {"default": "sqlite://:memory:"},
+        "apps": {"models": {"models": MODELS, "default_connection": "default"}},
+    })
+    await Tortoise.generate_schemas()
+    await ensure_relation_indexes(Tortoise.get_connection("default"))
+    default_cache.local._data.clear()
+    default_cache.local._tags.clear()
+    user_response_cache._local.clear()
+    permission_cache._local.clear()
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.fixture
+async def users(db):
+    """
+    管理员 admin(admin 角色)和普通用户 alice，密码均为 secret1
+    """
+    from app.models.role import Role
+    from app.models.user import User
+    from app.services.auth_service import AuthService
+    hashed_password = AuthService.get_password_hash("secret1")
+    admin_role = await Role.create(name="管理员", code="admin")
+    admin = await User.create(username="admin", email="admin@example.com", hashed_password=hashed_password)
+    await admin.roles.add(admin_role)
+    alice = await User.create(username="alice", email="alice@example.com", hashed_password=hashed_password)
+    await permission_registry.load()
+    return admin, alice
+
+
+def asgi_client(app, client=("127.0.0.1", 1234)) -> httpx.AsyncClient:
+    """
+    直接调用 ASGI 应用(或单个中间件)的 HTTP 客户端
+    """
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=client), base_url="http://test")
+
+
+def auth_headers(username: str) -> dict:
+    from app.services.auth_service import AuthService
+    return {"Authorization": f"Bearer {AuthService.create_access_token({'sub': username})}"}
+
+
+@pytest.fixture
+async def client(users):
+    from app.main import app
+    async with asgi_client(app) as client:
+        yield client
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from conftest import asgi_client
+from app.core.request_context import request_time_remaining
+from app.middlewares.admission_middleware import AdmissionMiddleware, LoopLagMonitor, RequestTracker
+
+pytestmark = pytest.mark.anyio
+
+
+def make_app(gate: asyncio.Event = None):
+    async def app(scope, receive, send):
+        if gate is not None:
+            await gate.wait()
+        body = f"{request_time_remaining():.1f}".encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def admission(app, tracker=None, monitor=None, **kwargs) -> AdmissionMiddleware:
+    return AdmissionMiddleware(
+        app, lag_monitor=monitor or LoopLagMonitor(), tracker=tracker or RequestTracker(), **kwargs
+    )
+
+
+async def test_rejects_over_concurrency_limit():
+    gate = asyncio.Event()
+    tracker = RequestTracker()
+    app = admission(
+        make_app(gate), tracker=tracker, max_in_flight=2, reserved_ratio=0.5,
+        low_priority_paths=["/low"], high_priority_paths=["/high"],
+    )
+    async with asgi_client(app) as client:
+        # 普通请求最多占用 1 个并发，高优先级可用全部 2 个
+        pending = asyncio.ensure_future(client.get("/normal"))
+        while tracker.in_flight < 1:
+            await asyncio.sleep(0.01)
+        rejected = await client.get("/normal")
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "1"
+        assert (await client.get("/low")).status_code == 503
+        high = asyncio.ensure_future(client.get("/high"))
+        while tracker.in_flight < 2:
+            await asyncio.sleep(0.01)
+        gate.set()
+        assert (await pending).status_code == 200
+        assert (await high).status_code == 200
+    assert tracker.in_flight == 0
+
+
+async def test_rejects_on_loop_lag_except_high_priority():
+    monitor = LoopLagMonitor()
+    monitor.lag_ms = 1000
+    app = admission(make_app(), monitor=monitor, max_loop_lag_ms=250, high_priority_paths=["/high"])
+    async with asgi_client(app) as client:
+        assert (await client.get("/normal")).status_code == 503
+        assert (await client.get("/high")).status_code == 200
+
+
+async def test_draining_closes_connection():
+    tracker = RequestTracker()
+    tracker.start_draining()
+    app = admission(make_app(), tracker=tracker, enabled=False)
+    async with asgi_client(app) as client:
+        response = await client.get("/anything")
+    assert response.status_code == 503
+    assert response.headers["connection"] == "close"
+
+
+async def test_upstream_timeout_can_only_shorten_deadline():
+    app = admission(make_app(), request_timeout=30.0)
+    async with asgi_client(app) as client:
+        assert float((await client.get("/", headers={"X-Request-Timeout": "2"})).text) <= 2
+        assert float((await client.get("/", headers={"X-Request-Timeout": "60"})).text) > 29
+
+
+async def test_rejection_log_is_rate_limited():
+    monitor = LoopLagMonitor()
+    monitor.lag_ms = 1000
+    app = admission(make_app(), monitor=monitor, log_interval=60)
+    async with asgi_client(app) as client:
+        for _ in range(5):
+            assert (await client.get("/")).status_code == 503
+    # 第一次拒绝写日志，之后的只计数
+    assert app._suppressed == 4
+
+
+def test_draining_server_drains_before_exit(monkeypatch):
+    import signal
+    import uvicorn
+    from app.main import app
+    from app.middlewares.admission_middleware import request_tracker
+    from app.server import DrainingServer
+    monkeypatch.setattr(request_tracker, "draining", False)
+    monkeypatch.setattr(request_tracker, "drain_on_signal", False)
+    monkeypatch.setattr(app.state, "ready", True, raising=False)
+    server = DrainingServer(uvicorn.Config(app))
+    assert request_tracker.drain_on_signal
+    server.handle_exit(signal.SIGTERM, None)
+    assert request_tracker.draining
+    assert app.state.ready is False
+    assert server.should_exit
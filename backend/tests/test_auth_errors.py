@@ -0,0 +1,44 @@
+import pytest
+from conftest import auth_headers
+from app.core.blacklist import token_blacklist
+from app.core.exceptions import (
+    INVALID_CREDENTIALS, INVALID_LOGIN, INVALID_REFRESH_TOKEN, NOT_AUTHENTICATED, TOKEN_REVOKED
+)
+from app.services.auth_service import AuthService
+
+pytestmark = pytest.mark.anyio
+
+
+def assert_error(response, error):
+    assert response.status_code == error.status_code
+    # 响应体是预先序列化的同一份字节
+    assert response.content == error.body
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+async def test_missing_and_invalid_tokens(client):
+    assert_error(await client.get("/api/v1/users/me"), NOT_AUTHENTICATED)
+    assert_error(await client.get("/api/v1/users/me", headers={"Authorization": "Bearer bad"}), INVALID_CREDENTIALS)
+    assert_error(await client.get("/api/v1/users/me", headers=auth_headers("nobody")), INVALID_CREDENTIALS)
+
+
+async def test_login_failures(client):
+    response = await client.post("/api/v1/auth/login", data={"username": "alice", "password": "wrong1"})
+    assert_error(response, INVALID_LOGIN)
+    response = await client.post("/api/v1/auth/login", data={"username": "nobody", "password": "secret1"})
+    assert_error(response, INVALID_LOGIN)
+    response = await client.post("/api/v1/auth/login", data={"username": "alice", "password": "secret1"})
+    assert response.status_code == 200
+
+
+async def test_refresh_failures(client):
+    access_token = AuthService.create_access_token({"sub": "alice"})
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": access_token})
+    assert_error(response, INVALID_REFRESH_TOKEN)
+
+    refresh_token = AuthService.create_refresh_token({"sub": "alice"})
+    assert (await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})).status_code == 200
+    await token_blacklist.add_to_blacklist(refresh_token)
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert_error(response, TOKEN_REVOKED)
+
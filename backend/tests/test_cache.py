@@ -0,0 +1,135 @@
+import asyncio
+import json
+import pytest
+from app.utils.cache import LocalCache, RedisCache, SingleFlight, TieredCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(redis):
+    return TieredCache(LocalCache(ttl=60, max_entries=100), RedisCache(prefix="test:"), ttl=60, stale_ttl=60)
+
+
+class Loader:
+    """
+    计数的加载函数，gate 打开前一直阻塞
+    """
+    def __init__(self, value="v1"):
+        self.value = value
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        return self.value
+
+    async def started(self):
+        while not self.calls:
+            await asyncio.sleep(0)
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    loader = Loader()
+    loader.gate.clear()
+    tasks = [asyncio.ensure_future(flight.do("key", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    loader.gate.set()
+    assert await asyncio.gather(*tasks) == ["v1"] * 10
+    assert loader.calls == 1
+    assert "key" not in flight
+
+
+async def test_single_flight_survives_cancelled_caller():
+    flight = SingleFlight()
+    loader = Loader()
+    loader.gate.clear()
+    first = asyncio.ensure_future(flight.do("key", loader))
+    second = asyncio.ensure_future(flight.do("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    loader.gate.set()
+    assert await second == "v1"
+    assert loader.calls == 1
+
+
+async def test_get_or_load_coalesces_misses(cache):
+    loader = Loader()
+    loader.gate.clear()
+    tasks = [asyncio.ensure_future(cache.get_or_load("key", loader)) for _ in range(5)]
+    await loader.started()
+    loader.gate.set()
+    assert await asyncio.gather(*tasks) == ["v1"] * 5
+    assert loader.calls == 1
+    assert await cache.get_or_load("key", loader) == "v1"
+    assert loader.calls == 1
+
+
+async def test_stale_value_served_while_refreshing(cache):
+    loader = Loader()
+    # ttl=0：写入后立即过期，但在 stale 窗口内
+    assert await cache.get_or_load("key", loader, ttl=0) == "v1"
+    loader.value = "v2"
+    assert await cache.get_or_load("key", loader, ttl=0) == "v1"
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert loader.calls == 2
+    assert await cache.get("key") == "v2"
+
+
+async def test_invalidate_tags_removes_local_and_remote(cache):
+    await cache.set("user:1", {"id": 1}, tags=["user:1"])
+    await cache.set("user:2", {"id": 2}, tags=["user:2"])
+    await cache.invalidate_tags("user:1")
+    assert await cache.get("user:1") is None
+    assert await cache.remote.get("user:1") is None
+    assert await cache.get("user:2") == {"id": 2}
+
+
+async def test_l2_hit_fills_l1(cache):
+    await cache.set("key", "value")
+    cache.local._data.clear()
+    assert await cache.get("key") == "value"
+    assert cache.local.get_nowait("key").value == "value"
+
+
+async def test_invalidation_during_load_is_not_cached(cache):
+    loader = Loader("old")
+    loader.gate.clear()
+    task = asyncio.ensure_future(cache.get_or_load("user:1", loader, tags=["user:1"]))
+    await loader.started()
+    await cache.invalidate_tags("user:1")
+    loader.gate.set()
+    # 已在等待的调用方仍得到结果，但不写入缓存
+    assert await task == "old"
+    assert await cache.get("user:1") is None
+    loader.value = "new"
+    assert await cache.get_or_load("user:1", loader, tags=["user:1"]) == "new"
+    assert await cache.get("user:1") == "new"
+
+
+async def test_callers_after_delete_do_not_join_abandoned_load(cache):
+    old = Loader("old")
+    old.gate.clear()
+    first = asyncio.ensure_future(cache.get_or_load("key", old))
+    await old.started()
+    await cache.delete("key")
+    new = Loader("new")
+    assert await cache.get_or_load("key", new) == "new"
+    old.gate.set()
+    assert await first == "old"
+    # 被放弃的加载晚完成，也不会覆盖新值
+    assert await cache.get("key") == "new"
+
+
+async def test_invalidation_from_other_process_drops_l1(cache):
+    await cache.set("key", "value", tags=["tag"])
+    await cache._apply(json.dumps({"origin": "other", "keys": [], "tags": ["tag"]}))
+    assert cache.local.get_nowait("key") is None
+    # 自己发出的通知不处理
+    await cache.set("key", "value", tags=["tag"])
+    await cache._apply(json.dumps({"origin": cache.instance_id, "keys": ["key"], "tags": []}))
+    assert cache.local.get_nowait("key").value == "value"
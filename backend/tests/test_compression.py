@@ -0,0 +1,53 @@
+import gzip
+import pytest
+from conftest import asgi_client, auth_headers
+from app.middlewares.compression_middleware import CompressionMiddleware, choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+
+def plain_app(body: bytes):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def test_choose_encoding():
+    assert choose_encoding(b"gzip, deflate", brotli_enabled=False) == "gzip"
+    assert choose_encoding(b"gzip;q=0, identity") is None
+    assert choose_encoding(b"*", brotli_enabled=False) == "gzip"
+    assert choose_encoding(b"identity") is None
+
+
+async def test_gzip_above_minimum_size():
+    body = b"hello world " * 500
+    app = CompressionMiddleware(plain_app(body), minimum_size=1024, brotli_enabled=False)
+    async with asgi_client(app) as client:
+        async with client.stream("GET", "/", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(raw) < len(body)
+    assert gzip.decompress(raw) == body
+
+
+async def test_small_or_unaccepted_responses_pass_through():
+    async with asgi_client(CompressionMiddleware(plain_app(b"small"), minimum_size=1024)) as client:
+        response = await client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"small"
+    async with asgi_client(CompressionMiddleware(plain_app(b"x" * 4096), minimum_size=1024)) as client:
+        response = await client.get("/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+
+async def test_api_response_is_compressed(client):
+    from app.models.user import User
+    await User.bulk_create([
+        User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(50)
+    ])
+    response = await client.get("/api/v1/users/", headers={**auth_headers("admin"), "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["data"]) == 52
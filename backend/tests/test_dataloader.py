@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from conftest import auth_headers
+from app.utils.cache import LocalCache, RedisCache, TieredCache
+from app.utils.dataloader import DataLoader
+from app.utils.redis import RedisClient
+
+pytestmark = pytest.mark.anyio
+
+
+class BatchLoad:
+    """
+    记录每次批量加载的键，返回 键 -> 键*10，不存在的键(负数)不返回
+    """
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, keys):
+        self.batches.append(sorted(keys))
+        return {key: key * 10 for key in keys if key >= 0}
+
+
+async def test_loads_in_same_tick_are_batched():
+    batch_load = BatchLoad()
+    loader = DataLoader(batch_load)
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(-1)) == [10, 20, 10, None]
+    assert batch_load.batches == [[-1, 1, 2]]
+
+
+async def test_loads_from_concurrent_coroutines_share_a_batch():
+    batch_load = BatchLoad()
+    loader = DataLoader(batch_load)
+
+    async def fetch(key):
+        await asyncio.sleep(0)
+        return await loader.load(key)
+
+    assert await asyncio.gather(*(fetch(key) for key in range(5))) == [0, 10, 20, 30, 40]
+    assert batch_load.batches == [[0, 1, 2, 3, 4]]
+    # 已加载的键不再查询
+    assert await loader.load(3) == 30
+    assert len(batch_load.batches) == 1
+
+
+async def test_max_batch_size_splits_batches():
+    batch_load = BatchLoad()
+    loader = DataLoader(batch_load, max_batch_size=2)
+    assert await loader.load_many([1, 2, 3]) == [10, 20, 30]
+    assert batch_load.batches == [[1, 2], [3]]
+
+
+async def test_batch_error_is_raised_to_every_caller():
+    async def failing(keys):
+        raise RuntimeError("boom")
+
+    loader = DataLoader(failing)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert [str(result) for result in results] == ["boom", "boom"]
+
+
+async def test_cache_only_loads_missing_keys(redis):
+    cache = TieredCache(LocalCache(ttl=60, max_entries=100), None, ttl=60)
+    batch_load = BatchLoad()
+    await DataLoader(batch_load, cache=cache, cache_key=lambda key: f"n:{key}").load_many([1, 2])
+    assert await DataLoader(batch_load, cache=cache, cache_key=lambda key: f"n:{key}").load_many([1, 2, 3]) == [10, 20, 30]
+    assert batch_load.batches == [[1, 2], [3]]
+
+
+@pytest.fixture
+def redis_cache(redis):
+    return TieredCache(LocalCache(ttl=60, max_entries=100), RedisCache(prefix="test:"), ttl=60)
+
+
+def loader_for(cache, batch_load):
+    return DataLoader(batch_load, cache=cache, cache_key=lambda key: f"n:{key}", cache_tags=lambda key: [f"n:{key}"])
+
+
+async def test_redis_round_trips_do_not_grow_with_keys(redis, redis_cache, monkeypatch):
+    calls = []
+    client = RedisClient()
+    for name in ("get", "set", "mget", "execute_pipeline", "ttl", "sadd", "expire"):
+        method = getattr(client, name)
+
+        async def counted(*args, _name=name, _method=method, **kwargs):
+            calls.append(_name)
+            return await _method(*args, **kwargs)
+
+        monkeypatch.setattr(client, name, counted)
+    batch_load = BatchLoad()
+    assert await loader_for(redis_cache, batch_load).load_many(range(50)) == [key * 10 for key in range(50)]
+    # 一次 MGET 查缓存，写回最多两次管道(写入值和登记标签、延长标签集合的过期时间)
+    assert calls.count("mget") == 1
+    assert calls.count("execute_pipeline") <= 2
+    assert set(calls) <= {"mget", "execute_pipeline"}
+    assert 0 < await redis.ttl("test:tag:n:1") <= 60
+
+    redis_cache.local._data.clear()
+    calls.clear()
+    assert await loader_for(redis_cache, batch_load).load_many(range(50)) == [key * 10 for key in range(50)]
+    assert calls == ["mget"]
+    assert len(batch_load.batches) == 1
+    await redis_cache.invalidate_tags("n:1")
+    assert await redis_cache.remote.get("n:1") is None
+    assert await redis_cache.remote.get("n:2") is not None
+
+
+async def test_invalidation_during_batch_load_is_not_cached(redis_cache):
+    gate = asyncio.Event()
+
+    async def batch_load(keys):
+        await gate.wait()
+        return {key: key * 10 for key in keys}
+
+    task = asyncio.ensure_future(loader_for(redis_cache, batch_load).load_many([1, 2]))
+    while not redis_cache._loading:
+        await asyncio.sleep(0)
+    await redis_cache.invalidate_tags("n:1")
+    gate.set()
+    assert await task == [10, 20]
+    assert await redis_cache.get("n:1") is None
+    assert await redis_cache.get("n:2") == 20
+
+
+async def test_dispatched_batches_are_referenced_until_done():
+    gate = asyncio.Event()
+
+    async def batch_load(keys):
+        await gate.wait()
+        return {key: key for key in keys}
+
+    loader = DataLoader(batch_load, max_batch_size=1)
+    futures = [loader.load(1), loader.load(2)]
+    await asyncio.sleep(0)
+    assert len(loader._tasks) == 2
+    gate.set()
+    assert await asyncio.gather(*futures) == [1, 2]
+    await asyncio.sleep(0)
+    assert not loader._tasks
+
+
+async def test_users_by_ids_skips_missing(client):
+    response = await client.get("/api/v1/users/", params={"ids": "2,1,99"}, headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert sorted(user["username"] for user in response.json()["data"]) == ["admin", "alice"]
@@ -0,0 +1,59 @@
+import asyncio
+import time
+import pytest
+from conftest import auth_headers
+from app.core.exceptions import DatabaseTimeoutException
+from app.core.request_context import db_deadline
+from app.crud.role import get_all_roles
+from app.utils import db_monitor
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def instrumented(db):
+    db_monitor.instrument_connections()
+
+
+def test_query_timeout_uses_remaining_request_time():
+    assert db_monitor.query_timeout() == db_monitor.settings.DB_QUERY.TIMEOUT
+    token = db_deadline.set(time.monotonic() + 1)
+    try:
+        assert db_monitor.query_timeout() <= 1
+    finally:
+        db_deadline.reset(token)
+    token = db_deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DatabaseTimeoutException):
+            db_monitor.query_timeout()
+    finally:
+        db_deadline.reset(token)
+
+
+async def test_slow_query_raises_timeout(monkeypatch):
+    async def execute_query(self, query):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(db_monitor, "query_timeout", lambda: 0.01)
+    wrapped = db_monitor._instrument(execute_query)
+    with pytest.raises(DatabaseTimeoutException) as info:
+        await wrapped(None, "SELECT 1")
+    assert info.value.status_code == 504
+
+
+async def test_expired_deadline_is_not_swallowed_by_crud(instrumented):
+    token = db_deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DatabaseTimeoutException):
+            await get_all_roles()
+    finally:
+        db_deadline.reset(token)
+
+
+async def test_endpoint_returns_504(instrumented, client, monkeypatch):
+    headers = auth_headers("admin")
+    assert (await client.get("/api/v1/roles/", headers=headers)).status_code == 200
+    monkeypatch.setattr(db_monitor, "db_time_remaining", lambda: -1.0)
+    response = await client.get("/api/v1/roles/", headers=headers)
+    assert response.status_code == 504
+    assert response.json()["message"] == "数据库查询超时"
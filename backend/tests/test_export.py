@@ -0,0 +1,66 @@
+import csv
+import io
+import pytest
+from conftest import auth_headers
+from app.crud.user import export_users
+from app.models.user import User
+from app.utils.export import CsvEncoder, ParquetEncoder, parquet_available
+
+pytestmark = pytest.mark.anyio
+
+
+def test_csv_escapes_formulas():
+    encoder = CsvEncoder(["name", "count"])
+    data = encoder.encode([["=1+1", 1], ["@SUM(A1)", -1], ["-2", 2], ["alice", 3]]) + encoder.finish()
+    rows = list(csv.reader(io.StringIO(data.decode())))
+    assert rows == [["name", "count"], ["'=1+1", "1"], ["'@SUM(A1)", "-1"], ["'-2", "2"], ["alice", "3"]]
+
+
+async def test_export_streams_batches(users):
+    for index in range(5):
+        await User.create(username=f"user{index}", email=f"user{index}@example.com", hashed_password="x")
+    encoder = CsvEncoder(["id", "username"])
+    chunks = [chunk async for chunk in export_users(encoder, chunk_size=2)]
+    # 7 行分 4 批，每批输出一块，最后是空的结束块
+    assert len(chunks) == 5
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "username"]
+    assert [row[1] for row in rows[1:]] == ["admin", "alice", *(f"user{index}" for index in range(5))]
+
+
+async def test_export_endpoint_csv(client):
+    await User.create(username="mallory", email="mallory@example.com", full_name="=cmd()", hashed_password="x")
+    response = await client.get("/api/v1/users/export?columns=username,full_name&is_active=true", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="users-' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows == [["username", "full_name"], ["admin", ""], ["alice", ""], ["mallory", "'=cmd()"]]
+
+
+async def test_export_rejects_unknown_columns(client):
+    response = await client.get("/api/v1/users/export?columns=username,hashed_password", headers=auth_headers("admin"))
+    assert response.status_code == 400
+    assert (await client.get("/api/v1/users/export", headers=auth_headers("alice"))).status_code == 403
+
+
+@pytest.mark.skipif(not parquet_available(), reason="未安装 pyarrow")
+async def test_export_endpoint_parquet(client):
+    import pyarrow.parquet
+    response = await client.get("/api/v1/users/export?format=parquet&columns=id,username,is_active,created_at",
+                                headers=auth_headers("admin"))
+    assert response.status_code == 200
+    table = pyarrow.parquet.read_table(io.BytesIO(response.content))
+    assert table.column_names == ["id", "username", "is_active", "created_at"]
+    assert table.column("username").to_pylist() == ["admin", "alice"]
+    assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
+
+
+@pytest.mark.skipif(not parquet_available(), reason="未安装 pyarrow")
+def test_parquet_encoder_writes_row_group_per_batch():
+    import pyarrow.parquet
+    encoder = ParquetEncoder(["id"], {"id": "int"})
+    data = encoder.encode([[1], [2]]) + encoder.encode([]) + encoder.encode([[3]]) + encoder.finish()
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(data))
+    assert parquet_file.num_row_groups == 2
+    assert parquet_file.read().column("id").to_pylist() == [1, 2, 3]
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import Depends, FastAPI
+from conftest import asgi_client, auth_headers
+from app.core.deps import check_permissions
+from app.core.exceptions import ExpectedAuthError
+from app.core.handlers import expected_auth_error_handler
+from app.core.permission_cache import permission_cache
+from app.core.permission_registry import permission_registry
+from app.crud.permission import create_permission, delete_permission
+from app.crud.role import assign_permissions_to_roles, assign_roles_to_users, create_role
+from app.models.permission import Permission
+from app.schemas.permission import PermissionCreate
+from app.schemas.role import RoleCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_permissions(*codes):
+    return [await create_permission(PermissionCreate(name=code, code=code)) for code in codes]
+
+
+async def test_bits_are_dense_regardless_of_ids(users):
+    # 权限ID不连续且很大，位编号仍从 0 连续分配
+    await Permission.create(id=100000, name="a", code="a")
+    await Permission.create(id=200000, name="b", code="b")
+    await permission_registry.load()
+    assert permission_registry.required_mask(["a"]) == 0b01
+    assert permission_registry.required_mask(["a", "b"]) == 0b11
+    assert permission_registry.required_mask(["missing"]) is None
+
+
+async def test_bits_renumbered_after_delete(users):
+    a, b, c = await create_permissions("a", "b", "c")
+    role = await create_role(RoleCreate(name="编辑", code="editor"))
+    await assign_permissions_to_roles([role.id], [b.id, c.id])
+    await assign_roles_to_users([2], [role.id])
+    version = permission_registry.version
+    assert await permission_cache.get(2) == {"b", "c"}
+
+    await delete_permission(a.id)
+    assert permission_registry.version > version
+    assert permission_registry.required_mask(["c"]) == 0b10
+    assert await permission_cache.get(2) == {"b", "c"}
+
+
+async def test_reload_reads_again_if_version_changes(users, monkeypatch):
+    await create_permissions("a")
+    versions = iter([1, 2, 2])
+
+    async def remote_version():
+        return next(versions)
+
+    monkeypatch.setattr(permission_registry, "_remote_version", remote_version)
+    await permission_registry.load()
+    assert permission_registry.version == 2
+
+
+async def test_check_permissions_dependency(users):
+    await create_permissions("user:read", "user:write")
+    role = await create_role(RoleCreate(name="编辑", code="editor"))
+    app = FastAPI()
+    app.add_exception_handler(ExpectedAuthError, expected_auth_error_handler)
+
+    @app.get("/read", dependencies=[Depends(check_permissions(["user:read"]))])
+    async def read():
+        return {}
+
+    @app.get("/write", dependencies=[Depends(check_permissions(["user:read", "user:write"]))])
+    async def write():
+        return {}
+
+    @app.get("/unknown", dependencies=[Depends(check_permissions(["user:delete"]))])
+    async def unknown():
+        return {}
+
+    read_permission = await Permission.get(code="user:read")
+    await assign_permissions_to_roles([role.id], [read_permission.id])
+    await assign_roles_to_users([2], [role.id])
+    headers = auth_headers("alice")
+    async with asgi_client(app) as client:
+        assert (await client.get("/read", headers=headers)).status_code == 200
+        assert (await client.get("/write", headers=headers)).status_code == 403
+        assert (await client.get("/unknown", headers=headers)).status_code == 403
+
+
+async def test_admin_endpoint_requires_admin(client):
+    assert (await client.get("/api/v1/users/", headers=auth_headers("alice"))).status_code == 403
+    assert (await client.get("/api/v1/users/", headers=auth_headers("admin"))).status_code == 200
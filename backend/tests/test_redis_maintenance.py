@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+from app.core import blacklist as blacklist_module
+from app.core.blacklist import TokenBlacklist
+from app.core.redis_maintenance import OTHER_PREFIX, RedisMaintenance, key_prefix
+from app.services.auth_service import AuthService
+
+pytestmark = pytest.mark.anyio
+
+
+def token(seconds: int, subject: str = "alice") -> str:
+    return AuthService.create_access_token({"sub": subject}, expires_delta=timedelta(seconds=seconds))
+
+
+def test_key_prefix_buckets_unknown_keys():
+    assert key_prefix("cache:user:1") == "cache:"
+    assert key_prefix("no_colon") == OTHER_PREFIX
+    assert key_prefix(":leading") == OTHER_PREFIX
+    assert key_prefix("with space:1") == OTHER_PREFIX
+    assert key_prefix("x" * 40 + ":1") == OTHER_PREFIX
+
+
+async def test_scan_caps_number_of_prefixes(redis):
+    for index in range(10):
+        await redis.set(f"p{index}:key", "1")
+    await redis.set("loose", "1")
+    report = await RedisMaintenance().scan_prefixes(scan_count=100, max_keys=1000, sample_size=2, max_prefixes=3)
+    assert len(report) == 4
+    assert report[OTHER_PREFIX]["keys"] == 8
+    assert sum(item["keys"] for item in report.values()) == 11
+
+
+async def test_per_key_entry_expires_with_token(redis):
+    blacklist = TokenBlacklist()
+    value = token(120)
+    assert await blacklist.add_to_blacklist(value)
+    assert await blacklist.is_blacklisted(value)
+    key = f"{blacklist.prefix}{blacklist.fingerprint(value)}"
+    assert 118 <= await redis.ttl(key) <= 120
+    # 已过期的令牌不写入
+    assert await blacklist.add_to_blacklist(token(-10))
+    assert await redis.dbsize() == 1
+
+
+async def test_bucket_entry_expires_at_exp_and_is_purged(redis, monkeypatch):
+    blacklist = TokenBlacklist(buckets=4)
+    short, long = token(60, "alice"), token(3600, "admin")
+    assert await blacklist.add_to_blacklist(short)
+    assert await blacklist.add_to_blacklist(long)
+    assert await blacklist.is_blacklisted(short)
+
+    # 只让黑名单看到的时间前进，Redis 键本身的过期不受影响
+    later = time.time() + 120
+    monkeypatch.setattr(blacklist_module, "time", SimpleNamespace(time=lambda: later))
+    # 成员未清理前，检查时按分数判断已过期
+    assert not await blacklist.is_blacklisted(short)
+    assert await blacklist.is_blacklisted(long)
+    assert await blacklist.purge_expired() == 1
+    assert await blacklist.purge_expired() == 0
+    assert await blacklist.is_blacklisted(long)
@@ -0,0 +1,39 @@
+import pytest
+from tortoise.exceptions import IntegrityError
+from app.services.auth_service import unique_violation_field
+
+pytestmark = pytest.mark.anyio
+
+
+class PgError(Exception):
+    def __init__(self, message, constraint_name=None, detail=None):
+        super().__init__(message)
+        self.constraint_name = constraint_name
+        self.detail = detail
+
+
+@pytest.mark.parametrize("original, field", [
+    (PgError("duplicate", constraint_name="users_email_key"), "email"),
+    (PgError("duplicate", detail="Key (username)=(email) already exists."), "username"),
+    (Exception('duplicate key value violates unique constraint "users_username_key"'), "username"),
+    (Exception("UNIQUE constraint failed: users.email"), "email"),
+    (Exception("Duplicate entry 'a@b.c' for key 'users.email'"), "email"),
+    (Exception("Duplicate entry 'email' for key 'users.username'"), "username"),
+    (Exception('duplicate key value violates unique constraint "users_pkey"'), None),
+])
+def test_unique_violation_field(original, field):
+    assert unique_violation_field(IntegrityError(original)) == field
+
+
+async def test_register_reports_conflicting_field(client):
+    payload = {"username": "bob", "email": "bob@example.com", "password": "secret1"}
+    assert (await client.post("/api/v1/auth/register", json=payload)).status_code == 201
+
+    response = await client.post("/api/v1/auth/register", json={**payload, "email": "other@example.com"})
+    assert response.status_code == 400
+    assert "用户名已存在" in response.text
+
+    # 用户名中包含 "email" 也不会误判为邮箱冲突
+    response = await client.post("/api/v1/auth/register", json={**payload, "username": "email"})
+    assert response.status_code == 400
+    assert "邮箱已被注册" in response.text
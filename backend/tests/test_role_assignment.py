@@ -0,0 +1,78 @@
+import pytest
+from tortoise.transactions import in_transaction
+from conftest import auth_headers
+from app.core.permission_cache import permission_cache
+from app.crud.permission import create_permission
+from app.crud.role import (
+    assign_permissions_to_roles, assign_roles_to_users, create_role, link_many,
+    unassign_permissions_from_roles, unassign_roles_from_users
+)
+from app.models.role import Role
+from app.models.user import User
+from app.schemas.permission import PermissionCreate
+from app.schemas.role import RoleCreate
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def roles(users):
+    editor = await create_role(RoleCreate(name="编辑", code="editor"))
+    viewer = await create_role(RoleCreate(name="访客", code="viewer"))
+    return editor, viewer
+
+
+async def test_link_many_counts_only_inserted_rows(roles):
+    editor, _ = roles
+    field = User._meta.fields_map["roles"]
+    async with in_transaction() as connection:
+        # 同一批内的重复组合由 ON CONFLICT 忽略，不计入
+        assert await link_many(connection, field, [2, 2], [editor.id]) == 1
+        assert await link_many(connection, field, [1, 2], [editor.id]) == 1
+        assert await link_many(connection, field, [1, 2], [editor.id]) == 0
+
+
+async def test_assign_and_unassign_roles(roles):
+    editor, viewer = roles
+    assert await assign_roles_to_users([1, 2], [editor.id, viewer.id]) == 4
+    assert await assign_roles_to_users([2], [editor.id]) == 0
+    alice = await User.get(id=2)
+    assert sorted(await alice.roles.all().values_list("code", flat=True)) == ["editor", "viewer"]
+
+    assert await unassign_roles_from_users([2], [editor.id, viewer.id]) == 2
+    assert await unassign_roles_from_users([2], [editor.id]) == 0
+    assert await alice.roles.all().count() == 0
+
+
+async def test_assign_rejects_missing_ids_atomically(roles):
+    editor, _ = roles
+    from app.core.exceptions import NotFoundException
+    with pytest.raises(NotFoundException):
+        await assign_roles_to_users([2, 99], [editor.id])
+    assert await (await User.get(id=2)).roles.all().count() == 0
+
+
+async def test_permission_assignment_invalidates_cached_permissions(roles):
+    editor, _ = roles
+    permission = await create_permission(PermissionCreate(name="查看用户", code="user:read"))
+    await assign_roles_to_users([2], [editor.id])
+    assert await permission_cache.get(2) == frozenset()
+
+    assert await assign_permissions_to_roles([editor.id], [permission.id]) == 1
+    assert await permission_cache.get(2) == {"user:read"}
+    assert await (await Role.get(id=editor.id)).permissions.all().count() == 1
+
+    assert await unassign_permissions_from_roles([editor.id], [permission.id]) == 1
+    assert await permission_cache.get(2) == frozenset()
+
+
+async def test_assign_endpoint_requires_admin(client, roles):
+    editor, _ = roles
+    body = {"user_ids": [2], "role_ids": [editor.id]}
+    response = await client.post("/api/v1/roles/users/assign", json=body, headers=auth_headers("alice"))
+    assert response.status_code == 403
+    response = await client.post("/api/v1/roles/users/assign", json=body, headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert response.json()["data"]["affected"] == 1
+    response = await client.post("/api/v1/roles/users/assign", json=body, headers=auth_headers("admin"))
+    assert response.json()["data"]["affected"] == 0
@@ -0,0 +1,51 @@
+import pytest
+from conftest import asgi_client
+from app.middlewares.tracing_middleware import TracingMiddleware
+from app.utils.tracing import InMemorySpanExporter, Tracer
+
+pytestmark = pytest.mark.anyio
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.configure(sample_rate=0.0, exporter=InMemorySpanExporter())
+    return tracer
+
+
+async def test_untrusted_traceparent_cannot_force_sampling(tracer):
+    app = TracingMiddleware(ok_app, tracer=tracer, trusted_proxies=["10.0.0.0/8"])
+    async with asgi_client(app) as client:
+        await client.get("/unsampled")
+        await client.get("/untrusted", headers={"traceparent": TRACEPARENT})
+    assert tracer.exporter.spans == []
+
+
+async def test_trusted_traceparent_is_continued(tracer):
+    app = TracingMiddleware(ok_app, tracer=tracer, trusted_proxies=["10.0.0.0/8"])
+    async with asgi_client(app, client=("10.1.2.3", 1234)) as client:
+        await client.get("/trusted", headers={"traceparent": TRACEPARENT})
+    names = {span.name for span in tracer.exporter.spans}
+    assert names == {"GET /trusted", "http.response"}
+    root = next(span for span in tracer.exporter.spans if span.name == "GET /trusted")
+    assert root.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert root.parent_id == "b7ad6b7169203331"
+    assert root.attributes["http.response.status_code"] == 200
+
+
+async def test_sample_rate_one_records_every_request():
+    tracer = Tracer()
+    tracer.configure(sample_rate=1.0, exporter=InMemorySpanExporter())
+    async with asgi_client(TracingMiddleware(ok_app, tracer=tracer)) as client:
+        await client.get("/a")
+        await client.get("/b")
+    roots = [span for span in tracer.exporter.spans if span.parent_id is None]
+    assert sorted(span.name for span in roots) == ["GET /a", "GET /b"]
+    assert roots[0].trace_id != roots[1].trace_id
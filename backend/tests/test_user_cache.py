@@ -0,0 +1,45 @@
+import pytest
+from conftest import auth_headers
+from app.core.user_cache import etag_matches
+
+pytestmark = pytest.mark.anyio
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches(None, '"b"')
+    assert not etag_matches('"a"', '"b"')
+
+
+async def test_me_etag_returns_304_until_roles_change(client):
+    from app.crud.role import assign_roles_to_users, create_role
+    from app.schemas.role import RoleCreate
+    headers = auth_headers("alice")
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    role = await create_role(RoleCreate(name="编辑", code="editor"))
+    await assign_roles_to_users([2], [role.id])
+    response = await client.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["data"]["roles"] == ["editor"]
+
+
+async def test_me_rejects_disabled_user_even_if_cached(client, users):
+    _, alice = users
+    headers = auth_headers("alice")
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    # 绕过 crud，模拟失效通知丢失：缓存中仍是启用时的响应
+    alice.is_active = False
+    await alice.save()
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["message"] == "用户已被禁用"
@@ -0,0 +1,116 @@
+import io
+import json
+import time
+import pytest
+from conftest import auth_headers
+from app.core.request_context import request_deadline
+from app.core.user_stats import user_stats
+from app.models.user import User
+from app.services import user_import
+from app.services.user_import import ImportReport, import_users, read_rows
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "username,email,password\n"
+
+
+@pytest.fixture(autouse=True)
+def fake_hashing(monkeypatch):
+    # 测试中不启动进程池，也不计算 bcrypt
+    async def hash_in_pool(passwords):
+        return [f"hashed:{password}" for password in passwords]
+
+    monkeypatch.setattr(user_import, "hash_in_pool", hash_in_pool)
+
+
+def csv_rows(text: str):
+    return read_rows(io.StringIO(text), "csv")
+
+
+async def test_dedup_and_row_errors(users):
+    await user_stats.get()
+    text = HEADER + (
+        "bob,bob@example.com,secret1\n"
+        "alice,new@example.com,secret1\n"
+        "bob,bob2@example.com,secret1\n"
+        "carol,bob@example.com,secret1\n"
+        "dave,not-an-email,secret1\n"
+        "erin,erin@example.com,secret1\n"
+    )
+    report = await import_users(csv_rows(text), batch_size=2)
+    assert (report.total, report.created, report.failed) == (6, 2, 4)
+    assert [(error["line"], error["username"]) for error in report.errors] == [
+        (3, "alice"), (4, "bob"), (5, "carol"), (6, "dave")
+    ]
+    # 第一批已写入 bob，之后批次中的重复按已存在处理
+    assert report.errors[1]["error"] == "用户名已存在"
+    assert report.errors[2]["error"] == "邮箱已存在"
+    assert set(await User.all().values_list("username", flat=True)) == {"admin", "alice", "bob", "erin"}
+    assert (await user_stats.get())["total"] == 4
+
+
+async def test_duplicates_within_batch(users):
+    text = HEADER + "bob,bob@example.com,secret1\nbob,other@example.com,secret1\ncarol,bob@example.com,secret1\n"
+    report = await import_users(csv_rows(text))
+    assert report.created == 1
+    assert [error["error"] for error in report.errors] == ["用户名在文件中重复", "邮箱在文件中重复"]
+
+
+async def test_ndjson_invalid_lines(users):
+    text = '{"username": "bob", "email": "bob@example.com", "password": "secret1"}\n\nnot json\n[1]\n'
+    report = await import_users(read_rows(io.StringIO(text), "ndjson"))
+    assert (report.total, report.created, report.failed) == (3, 1, 2)
+    assert [error["line"] for error in report.errors] == [3, 4]
+
+
+async def test_csv_error_keeps_imported_rows(users):
+    text = HEADER + "bob,bob@example.com,secret1\n" + "carol,carol@example.com," + "x" * 200000 + "\n"
+    report = await import_users(csv_rows(text))
+    assert report.created == 1
+    assert report.errors[-1]["line"] == 3
+    assert report.errors[-1]["error"].startswith("CSV格式错误")
+
+
+async def test_error_cap(users):
+    text = HEADER + "".join(f"user{index},bad,secret1\n" for index in range(5))
+    report = ImportReport(max_errors=2)
+    for line in range(5):
+        report.error(line, None, "x")
+    assert (report.failed, len(report.errors)) == (5, 2)
+    report = await import_users(csv_rows(text), max_errors=None)
+    assert (report.failed, len(report.errors)) == (5, 5)
+
+
+async def test_deadlines_restored(users):
+    deadline = time.monotonic() + 30
+    token = request_deadline.set(deadline)
+    try:
+        await import_users(csv_rows(HEADER + "bob,bob@example.com,secret1\n"))
+        assert request_deadline.get() == deadline
+    finally:
+        request_deadline.reset(token)
+
+
+async def test_endpoint_reports_decode_error_after_partial_import(client):
+    await user_stats.get()
+    rows = "".join(f"user{index},user{index}@example.com,secret1\n" for index in range(50))
+    content = (HEADER + rows).encode() + b"bad\xff,bad@example.com,secret1\n"
+    response = await client.post(
+        "/api/v1/users/import", headers=auth_headers("admin"),
+        files={"file": ("users.csv", content, "text/csv")}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["created"] > 0
+    assert "UTF-8" in data["errors"][-1]["error"]
+    assert await User.all().count() == 2 + data["created"]
+    assert (await user_stats.get())["total"] == 2 + data["created"]
+
+
+async def test_endpoint_requires_admin(client):
+    content = json.dumps({"username": "bob", "email": "bob@example.com", "password": "secret1"}).encode()
+    response = await client.post(
+        "/api/v1/users/import", headers=auth_headers("alice"),
+        files={"file": ("users.ndjson", content, "application/x-ndjson")}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,55 @@
+import asyncio
+import time
+import pytest
+from app.core.exceptions import DatabaseTimeoutException
+from app.core.request_context import db_deadline, request_deadline
+from app.crud.user import _coalesce, find_user, is_admin_user
+from app.utils.cache import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_waiter_timeout_does_not_fail_shared_load():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+    seen = []
+
+    async def load():
+        seen.append((request_deadline.get(), db_deadline.get()))
+        await gate.wait()
+        return "user"
+
+    async def with_deadline(seconds):
+        db_deadline.set(time.monotonic() + seconds)
+        return await _coalesce(flight, "key", load)
+
+    first = asyncio.ensure_future(with_deadline(0.05))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(_coalesce(flight, "key", load))
+    with pytest.raises(DatabaseTimeoutException):
+        await first
+    gate.set()
+    assert await second == "user"
+    # 共用的查询不继承发起方的截止时间
+    assert seen == [(None, None)]
+
+
+async def test_expired_deadline_fails_fast():
+    async def load():
+        raise AssertionError("不应执行查询")
+
+    token = db_deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DatabaseTimeoutException):
+            await _coalesce(SingleFlight(), "key", load)
+    finally:
+        db_deadline.reset(token)
+
+
+async def test_find_user_returns_independent_copies(users):
+    first, second = await asyncio.gather(find_user("alice"), find_user("alice"))
+    assert first.username == second.username == "alice"
+    assert first is not second
+    assert await find_user("nobody") is None
+    assert await is_admin_user(1)
+    assert not await is_admin_user(2)
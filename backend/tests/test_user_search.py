@@ -0,0 +1,90 @@
+import pytest
+from conftest import auth_headers
+from tortoise import Tortoise
+from app.crud.user import _build_search_sql, search_users
+from app.db_migrations import user_search_indexes
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def people(users):
+    from app.models.user import User
+    await User.bulk_create([
+        User(username="Bob", email="bob@example.com", full_name="Robert Smith", hashed_password="x"),
+        User(username="bobby", email="bobby@example.com", full_name=None, hashed_password="x"),
+        User(username="carol", email="carol@bob.org", full_name="Carol Bobson", hashed_password="x"),
+        User(username="dave_1", email="dave@example.com", full_name="Dave", hashed_password="x"),
+        User(username="dave%1", email="dave2@example.com", full_name="Dave", hashed_password="x"),
+    ])
+    await user_search_indexes.upgrade(Tortoise.get_connection("default"))
+
+
+async def test_prefix_search_is_case_insensitive(people):
+    rows, next_after_id = await search_users("BOB")
+    assert [row["username"] for row in rows] == ["Bob", "bobby"]
+    assert next_after_id is None
+    rows, _ = await search_users("bob", fields=("full_name",))
+    assert rows == []
+    rows, _ = await search_users("rob", fields=("full_name",))
+    assert [row["username"] for row in rows] == ["Bob"]
+
+
+async def test_contains_search(people):
+    rows, _ = await search_users("bob", prefix=False)
+    assert [row["username"] for row in rows] == ["Bob", "bobby", "carol"]
+
+
+async def test_like_wildcards_are_escaped(people):
+    rows, _ = await search_users("dave_", fields=("username",))
+    assert [row["username"] for row in rows] == ["dave_1"]
+    rows, _ = await search_users("dave%", fields=("username",))
+    assert [row["username"] for row in rows] == ["dave%1"]
+
+
+async def test_keyset_pagination(people):
+    rows, after_id = await search_users("bob", prefix=False, limit=2)
+    assert [row["username"] for row in rows] == ["Bob", "bobby"]
+    assert after_id == rows[-1]["id"]
+    rows, after_id = await search_users("bob", prefix=False, limit=2, after_id=after_id)
+    assert [row["username"] for row in rows] == ["carol"]
+    assert after_id is None
+
+
+@pytest.mark.parametrize("name, field", user_search_indexes.EXPRESSION_INDEXES)
+async def test_sqlite_prefix_search_uses_expression_index(people, name, field):
+    connection = Tortoise.get_connection("default")
+    sql, values = _build_search_sql("sqlite", "bob", (field,), True, 10, None)
+    plan = await connection.execute_query_dict(f"EXPLAIN QUERY PLAN {sql}", values)
+    assert any(name in row["detail"] for row in plan)
+
+
+def test_postgres_sql_uses_positional_parameters():
+    sql, values = _build_search_sql("postgres", "Bo_b", ("username", "email"), True, 21, 5)
+    assert "lower(username) LIKE $1 ESCAPE '!'" in sql
+    assert "id > $3" in sql and "LIMIT $4" in sql
+    assert values == ["bo!_b%", "bo!_b%", 5, 21]
+
+
+def test_index_migration_covers_every_default_field():
+    indexed = {column for _, column in user_search_indexes.EXPRESSION_INDEXES}
+    assert {"username", "email", "full_name"} <= indexed
+
+
+async def test_search_endpoint(people, client):
+    response = await client.get("/api/v1/users/search", params={"q": "bob", "limit": 1}, headers=auth_headers("admin"))
+    assert response.status_code == 200
+    page = response.json()["data"]
+    assert [item["username"] for item in page["items"]] == ["Bob"]
+    assert page["next_after_id"] == page["items"][0]["id"]
+    response = await client.get("/api/v1/users/search", params={"q": "bob"}, headers=auth_headers("alice"))
+    assert response.status_code == 403
+
+
+async def test_sqlite_non_ascii_letters_keep_their_case(people):
+    from app.models.user import User
+    await User.create(username="Émile", email="emile@example.com", hashed_password="x")
+    rows, _ = await search_users("ÉMI", fields=("username",))
+    assert [row["username"] for row in rows] == ["Émile"]
+    rows, _ = await search_users("émi", fields=("username",))
+    assert rows == []
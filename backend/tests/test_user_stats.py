@@ -0,0 +1,61 @@
+import pytest
+from conftest import auth_headers
+from app.core.user_stats import STATS_KEY, user_stats
+from app.crud.role import assign_roles_to_users, create_role
+from app.crud.user import activate_user, deactivate_user
+from app.schemas.role import RoleCreate
+from app.utils.metrics import metrics
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_reconciles_when_hash_missing(users):
+    stats = await user_stats.get()
+    assert stats["total"] == 2
+    assert stats["active"] == 2
+    assert stats["inactive"] == 0
+    assert stats["roles"] == {"admin": 1}
+
+
+async def test_incremental_counters(users, client):
+    await user_stats.get()
+    payload = {"username": "bob", "email": "bob@example.com", "password": "secret1"}
+    assert (await client.post("/api/v1/auth/register", json=payload)).status_code == 201
+    assert (await user_stats.get())["total"] == 3
+
+    await deactivate_user(2)
+    # 状态未变化时不重复计数
+    await deactivate_user(2)
+    stats = await user_stats.get()
+    assert stats["active"] == 2
+    assert stats["inactive"] == 1
+    await activate_user(2)
+    assert (await user_stats.get())["active"] == 3
+
+
+async def test_role_counts_refreshed_on_assignment(users):
+    await user_stats.get()
+    role = await create_role(RoleCreate(name="编辑", code="editor"))
+    assert (await user_stats.get())["roles"]["editor"] == 0
+    await assign_roles_to_users([1, 2], [role.id])
+    assert (await user_stats.get())["roles"] == {"admin": 1, "editor": 2}
+
+
+async def test_reconcile_fixes_drift(users):
+    await user_stats.get()
+    await user_stats.redis.hset(STATS_KEY, {"total": 10, "role:admin": 3})
+    drift = metrics.snapshot()["counters"].get("user_stats.drift", 0)
+
+    fields = await user_stats.reconcile()
+    assert fields["total"] == "2"
+    assert metrics.snapshot()["counters"]["user_stats.drift"] - drift == 10
+    stats = await user_stats.get()
+    assert stats["total"] == 2
+    assert stats["roles"] == {"admin": 1}
+
+
+async def test_stats_endpoint_requires_admin(client):
+    assert (await client.get("/api/v1/users/stats", headers=auth_headers("alice"))).status_code == 403
+    response = await client.get("/api/v1/users/stats", headers=auth_headers("admin"))
+    assert response.status_code == 200
+    assert response.json()["data"]["total"] == 2
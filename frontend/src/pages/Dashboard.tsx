@@ -1,7 +1,48 @@
-import React from 'react'
+import React, { useEffect, useState } from 'react'
+import { Card, Col, Row, Spin, Statistic } from 'antd'
+import { getUserStats } from '@/services/user'
+import type { UserStats } from '@/services/user'
 
 const Dashboard: React.FC = () => {
-    return <div>仪表盘页面</div>
+    const [stats, setStats] = useState<UserStats | null>(null)
+    const [loading, setLoading] = useState(true)
+
+    useEffect(() => {
+        getUserStats()
+            .then(setStats)
+            .catch((error) => console.error('Load user stats failed:', error))
+            .finally(() => setLoading(false))
+    }, [])
+
+    if (loading) {
+        return <Spin />
+    }
+    if (!stats) {
+        return <div>仪表盘页面</div>
+    }
+
+    return (
+        <div style={{ padding: 24 }}>
+            <Row gutter={16}>
+                <Col span={8}>
+                    <Card><Statistic title="用户总数" value={stats.total} /></Card>
+                </Col>
+                <Col span={8}>
+                    <Card><Statistic title="激活用户" value={stats.active} /></Card>
+                </Col>
+                <Col span={8}>
+                    <Card><Statistic title="禁用用户" value={stats.inactive} /></Card>
+                </Col>
+            </Row>
+            <Row gutter={16} style={{ marginTop: 16 }}>
+                {Object.entries(stats.roles).map(([code, count]) => (
+                    <Col span={6} key={code}>
+                        <Card><Statistic title={`角色 ${code}`} value={count} /></Card>
+                    </Col>
+                ))}
+            </Row>
+        </div>
+    )
 }
 
-export default Dashboard 
\ No newline at end of file
+export default Dashboard
@@ -0,0 +1,33 @@
+import axios from 'axios'
+import request from '@/utils/request'
+
+export interface UserStats {
+    total: number
+    active: number
+    inactive: number
+    roles: Record<string, number>
+    reconciled_at: string
+}
+
+interface ResponseModel<T> {
+    code: number
+    message: string
+    data: T
+}
+
+/**
+ * 获取仪表盘用户统计(仅管理员)
+ * @return: Promise<UserStats | null> 用户总数、激活/禁用数和各角色用户数，非管理员返回 null
+ * @exception: Error 获取统计失败时抛出错误
+ */
+export async function getUserStats(): Promise<UserStats | null> {
+    try {
+        const response = await request.get<ResponseModel<UserStats>>('/users/stats', { silentForbidden: true })
+        return (response as unknown as ResponseModel<UserStats>).data
+    } catch (error) {
+        if (axios.isAxiosError(error) && error.response?.status === 403) {
+            return null
+        }
+        throw error
+    }
+}
@@ -3,6 +3,13 @@ import type { AxiosInstance, AxiosRequestConfig, AxiosResponse } from 'axios'
 import { message } from 'antd'
 import { refreshToken } from '@/services/auth'
 
+declare module 'axios' {
+    interface AxiosRequestConfig {
+        // 403 时不跳转到无权访问页面，由调用方处理
+        silentForbidden?: boolean
+    }
+}
+
 // 创建 axios 实例
 const request: AxiosInstance = axios.create({
     baseURL: '/api/v1',
@@ -62,7 +69,9 @@ request.interceptors.response.use(
                     }
                     break
                 case 403:
-                    window.location.href = '/403'
+                    if (!error.config?.silentForbidden) {
+                        window.location.href = '/403'
+                    }
                     break
                 case 500:
                     message.error('服务器错误')